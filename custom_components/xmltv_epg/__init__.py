@@ -7,51 +7,166 @@ https://github.com/shadow578/homeassistant_xmltv-epg
 
 from __future__ import annotations
 
+import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, Platform
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.exceptions import ConfigEntryError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
-from .api import XMLTVClient
+from .api import XMLTVClient, XMLTVClientSourceNotAllowedError
 from .const import (
+    CONF_ALLOWED_COMMANDS,
+    DEFAULT_ALIGN_TO_PUBLISH_TIME,
+    DEFAULT_CALENDAR_CHANNELS,
+    DEFAULT_COMMAND_TIMEOUT,
+    DEFAULT_COVERAGE_HORIZON,
+    DEFAULT_ENABLE_CALENDAR,
     DEFAULT_ENABLE_CHANNEL_ICONS,
     DEFAULT_ENABLE_CURRENT_SENSOR,
+    DEFAULT_ENABLE_FAST_PARSER,
+    DEFAULT_ENABLE_PRIORITY_WINDOW_PARSE,
+    DEFAULT_ENABLE_PROGRESSIVE_LOADING,
+    DEFAULT_ENABLE_PROFILING,
     DEFAULT_ENABLE_PRIMETIME_SENSOR,
     DEFAULT_ENABLE_PROGRAM_IMAGES,
+    DEFAULT_ENABLE_PROGRAM_LIST_SENSOR,
     DEFAULT_ENABLE_UPCOMING_SENSOR,
+    DEFAULT_HTTP_READ_TIMEOUT,
+    DEFAULT_HTTP_TIMEOUT,
+    DEFAULT_MAX_STALENESS,
+    DEFAULT_DECOMPRESS_WORKERS,
+    DEFAULT_PARSER_WORKERS,
     DEFAULT_PRIMETIME_TIME,
+    DEFAULT_PROGRAM_LIST_SIZE,
+    DEFAULT_PROFILING_DUMP_STATS,
     DEFAULT_PROGRAM_LOOKAHEAD,
+    DEFAULT_PUBLISH_TIME,
+    DEFAULT_SPOOL_THRESHOLD,
+    DEFAULT_RECORD_PROGRAM_DETAILS,
     DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_WATCH_SOURCE_FILE,
     DOMAIN,
     LOGGER,
+    OPT_ALIGN_TO_PUBLISH_TIME,
+    OPT_CALENDAR_CHANNELS,
+    OPT_COVERAGE_HORIZON,
+    OPT_ENABLE_CALENDAR,
     OPT_ENABLE_CHANNEL_ICONS,
     OPT_ENABLE_CURRENT_SENSOR,
+    OPT_ENABLE_FAST_PARSER,
+    OPT_ENABLE_PRIORITY_WINDOW_PARSE,
+    OPT_ENABLE_PROGRESSIVE_LOADING,
+    OPT_ENABLE_PROFILING,
     OPT_ENABLE_PRIMETIME_SENSOR,
     OPT_ENABLE_PROGRAM_IMAGES,
+    OPT_ENABLE_PROGRAM_LIST_SENSOR,
     OPT_ENABLE_UPCOMING_SENSOR,
+    OPT_COMMAND_TIMEOUT,
+    OPT_HTTP_READ_TIMEOUT,
+    OPT_HTTP_TIMEOUT,
+    OPT_MAX_STALENESS,
+    OPT_DECOMPRESS_WORKERS,
+    OPT_PARSER_WORKERS,
     OPT_PRIMETIME_TIME,
+    OPT_PROGRAM_LIST_SIZE,
+    OPT_PROFILING_DUMP_STATS,
     OPT_PROGRAM_LOOKAHEAD,
+    OPT_PUBLISH_TIME,
+    OPT_SPOOL_THRESHOLD,
+    OPT_RECORD_PROGRAM_DETAILS,
     OPT_UPDATE_INTERVAL,
+    OPT_WATCH_SOURCE_FILE,
+    PROFILING_DUMP_DIR,
 )
 from .coordinator import XMLTVDataUpdateCoordinator
+from .http_client import async_get_limiter, async_get_session, get_timeout
+from .profiling import XMLTVProfiler
+from .services import async_setup_services
+from .source_access import async_check_source_allowed, set_allowed_commands
 
 PLATFORMS: list[Platform] = [
     Platform.SENSOR,
     Platform.IMAGE,
+    Platform.CALENDAR,
 ]
 
+# guides are configured in the UI, configuration.yaml only lists the commands exec: sources may run
+CONFIG_SCHEMA = vol.Schema(
+    {
+        vol.Optional(DOMAIN): vol.Schema(
+            {
+                vol.Optional(CONF_ALLOWED_COMMANDS, default=[]): vol.All(
+                    cv.ensure_list, [cv.string]
+                ),
+            }
+        )
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the integration services."""
+    set_allowed_commands(hass, config.get(DOMAIN, {}).get(CONF_ALLOWED_COMMANDS, []))
+    async_setup_services(hass)
+    return True
+
 
 # https://developers.home-assistant.io/docs/config_entries_index/#setting-up-an-entry
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up this integration using UI."""
     hass.data.setdefault(DOMAIN, {})
+
+    # the source may have been removed from the allowlists since the entry was created
+    try:
+        await async_check_source_allowed(hass, entry.data[CONF_HOST])
+    except XMLTVClientSourceNotAllowedError as exception:
+        raise ConfigEntryError(str(exception)) from exception
+
+    profiler = XMLTVProfiler(
+        logger=LOGGER,
+        enabled=entry.options.get(OPT_ENABLE_PROFILING, DEFAULT_ENABLE_PROFILING),
+        dump_stats=entry.options.get(
+            OPT_PROFILING_DUMP_STATS, DEFAULT_PROFILING_DUMP_STATS
+        ),
+        dump_dir=hass.config.path(PROFILING_DUMP_DIR),
+    )
+
+    spool_threshold_mb = entry.options.get(OPT_SPOOL_THRESHOLD, DEFAULT_SPOOL_THRESHOLD)
+
     hass.data[DOMAIN][entry.entry_id] = coordinator = XMLTVDataUpdateCoordinator(
         hass=hass,
         config_entry=entry,
         client=XMLTVClient(
-            session=async_get_clientsession(hass),
+            session=async_get_session(hass),
             url=entry.data[CONF_HOST],
             logger=LOGGER,
+            profiler=profiler,
+            fast_parser=entry.options.get(
+                OPT_ENABLE_FAST_PARSER, DEFAULT_ENABLE_FAST_PARSER
+            ),
+            parser_workers=int(
+                entry.options.get(OPT_PARSER_WORKERS, DEFAULT_PARSER_WORKERS)
+            ),
+            spool_threshold=(
+                int(spool_threshold_mb * 1024 * 1024) if spool_threshold_mb else None
+            ),
+            decompress_workers=int(
+                entry.options.get(OPT_DECOMPRESS_WORKERS, DEFAULT_DECOMPRESS_WORKERS)
+            ),
+            timeout=get_timeout(
+                total=entry.options.get(OPT_HTTP_TIMEOUT, DEFAULT_HTTP_TIMEOUT),
+                read=entry.options.get(
+                    OPT_HTTP_READ_TIMEOUT, DEFAULT_HTTP_READ_TIMEOUT
+                ),
+            ),
+            limiter=async_get_limiter(hass),
+            command_timeout=entry.options.get(
+                OPT_COMMAND_TIMEOUT, DEFAULT_COMMAND_TIMEOUT
+            )
+            or None,
         ),
         update_interval=entry.options.get(OPT_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL),
         lookahead=entry.options.get(OPT_PROGRAM_LOOKAHEAD, DEFAULT_PROGRAM_LOOKAHEAD),
@@ -71,6 +186,37 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             OPT_ENABLE_PROGRAM_IMAGES, DEFAULT_ENABLE_PROGRAM_IMAGES
         ),
         primetime_time=entry.options.get(OPT_PRIMETIME_TIME, DEFAULT_PRIMETIME_TIME),
+        enable_program_list_sensor=entry.options.get(
+            OPT_ENABLE_PROGRAM_LIST_SENSOR, DEFAULT_ENABLE_PROGRAM_LIST_SENSOR
+        ),
+        program_list_size=entry.options.get(
+            OPT_PROGRAM_LIST_SIZE, DEFAULT_PROGRAM_LIST_SIZE
+        ),
+        record_program_details=entry.options.get(
+            OPT_RECORD_PROGRAM_DETAILS, DEFAULT_RECORD_PROGRAM_DETAILS
+        ),
+        enable_calendar=entry.options.get(OPT_ENABLE_CALENDAR, DEFAULT_ENABLE_CALENDAR),
+        calendar_channels=entry.options.get(
+            OPT_CALENDAR_CHANNELS, DEFAULT_CALENDAR_CHANNELS
+        ),
+        profiler=profiler,
+        max_staleness=entry.options.get(OPT_MAX_STALENESS, DEFAULT_MAX_STALENESS),
+        align_to_publish_time=entry.options.get(
+            OPT_ALIGN_TO_PUBLISH_TIME, DEFAULT_ALIGN_TO_PUBLISH_TIME
+        ),
+        publish_time=entry.options.get(OPT_PUBLISH_TIME, DEFAULT_PUBLISH_TIME) or None,
+        coverage_horizon=entry.options.get(
+            OPT_COVERAGE_HORIZON, DEFAULT_COVERAGE_HORIZON
+        ),
+        watch_source_file=entry.options.get(
+            OPT_WATCH_SOURCE_FILE, DEFAULT_WATCH_SOURCE_FILE
+        ),
+        progressive_loading=entry.options.get(
+            OPT_ENABLE_PROGRESSIVE_LOADING, DEFAULT_ENABLE_PROGRESSIVE_LOADING
+        ),
+        priority_window_parse=entry.options.get(
+            OPT_ENABLE_PRIORITY_WINDOW_PARSE, DEFAULT_ENABLE_PRIORITY_WINDOW_PARSE
+        ),
     )
 
     # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
@@ -3,17 +3,107 @@
 from __future__ import annotations
 
 import asyncio
+import bz2
+import contextvars
 import gzip
 import io
 import lzma
+import os
+import re
+import shlex
+import shutil
 import socket
+import struct
+import sys
+import tempfile
+import time
 import zipfile
+import zlib
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from contextlib import AbstractContextManager, ExitStack, nullcontext
+from dataclasses import dataclass
+from datetime import datetime
+from email.utils import parsedate_to_datetime
 from logging import Logger
+from typing import IO, Any
+from urllib.parse import urlparse
+from urllib.request import url2pathname
 
 import aiohttp
 from pydantic import ValidationError
+from pydantic_xml.element.native import etree
 
-from .model import TVGuide
+from .model import TVChannel, TVGuide, TVProgram
+from .model.fast_parser import parse_guide
+from .model.parallel_parser import parse_guide_parallel
+from .model.parse_stats import ParseStats, collect_parse_stats
+from .model.progressive_parser import ProgressiveGuideParser
+from .parallel_decompress import PARALLEL_FORMATS, decompress_parallel
+from .profiling import XMLTVProfiler
+from .request_limiter import RequestLimiter
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on windows
+    resource = None
+
+try:
+    from compression import zstd
+except ImportError:  # pragma: no cover - python built without zstd support
+    zstd = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional, installed with aiohttp[speedups]
+    brotli = None
+
+
+# Size of the chunks downloads are spooled and decompressed in.
+SPOOL_CHUNK_SIZE = 64 * 1024  # bytes
+
+# Limits of XMLTVClient.async_probe, the probe stops at whichever is reached first
+PROBE_MAX_XML_BYTES = 4 * 1024 * 1024  # bytes
+PROBE_TIMEOUT = 20  # seconds
+
+# Default maximum time the guide command may run, before it is killed
+COMMAND_TIMEOUT = 60 * 60  # seconds
+
+# Prefix of source urls that run a command printing the guide to stdout, e.g. "exec:tv_grab_fi --days 3"
+COMMAND_URL_PREFIX = "exec:"
+
+# Maximum number of bytes to read to detect the format of content
+SNIFF_MAX_BYTES = 1024  # bytes
+
+# Suffixes of guide files picked from a directory source
+GUIDE_FILE_SUFFIXES = (
+    ".xml",
+    ".xml.gz",
+    ".xml.xz",
+    ".xml.bz2",
+    ".xml.zst",
+    ".xml.br",
+    ".xml.zip",
+)
+
+# Magic bytes at the start of compressed content
+_MAGIC_BYTES = (
+    (b"\x1f\x8b", "gzip"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"PK\x03\x04", "zip"),
+    (b"PK\x05\x06", "zip"),  # empty archive
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+    (b"BZh", "bzip2"),
+)
+
+# Suffix of brotli-compressed content, which has no magic bytes
+_BROTLI_SUFFIX = ".br"
+
+# Byte order marks of XML text (UTF-8, UTF-16 LE and BE)
+_XML_BOMS = (b"\xef\xbb\xbf", b"\xff\xfe", b"\xfe\xff")
+
+_ZIP_LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+_ZIP_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
 
 
 class XMLTVClientError(Exception):
@@ -24,6 +114,536 @@ class XMLTVClientCommunicationError(XMLTVClientError):
     """Exception to indicate a communication error."""
 
 
+class XMLTVClientSourceNotAllowedError(XMLTVClientError):
+    """Exception to indicate a local guide file or command that may not be used."""
+
+
+@dataclass
+class XMLTVFetchStats:
+    """Timings and sizes of a single guide fetch."""
+
+    fetched_at: datetime
+    """Time the fetch was started."""
+
+    download_time: float = 0.0
+    """Time spent downloading the guide, in seconds."""
+
+    transfer_bytes: int | None = None
+    """Number of bytes transferred on the wire, if known (Content-Length)."""
+
+    download_bytes: int = 0
+    """Number of bytes downloaded, after transfer decoding."""
+
+    xml_bytes: int = 0
+    """Number of bytes of XML data, after decompression."""
+
+    decompress_time: float = 0.0
+    """Time spent decompressing the downloaded data, in seconds."""
+
+    parse_time: float = 0.0
+    """Time spent parsing the XML data (excluding linking), in seconds."""
+
+    link_time: float = 0.0
+    """Time spent cross-linking channels and programs, in seconds."""
+
+    channel_count: int = 0
+    """Number of channels in the guide."""
+
+    program_count: int = 0
+    """Number of programs in the guide."""
+
+    dropped_channel_count: int = 0
+    """Number of channels omitted because they failed validation."""
+
+    dropped_program_count: int = 0
+    """Number of programs omitted because they failed validation."""
+
+    peak_memory_delta: int | None = None
+    """Increase of the process' peak memory usage during the fetch, in bytes, if known."""
+
+    resumed_bytes: int = 0
+    """Number of bytes reused from a previously interrupted download."""
+
+    last_modified: datetime | None = None
+    """Last modification time of the guide reported by the server (local time), if known."""
+
+    command_runtime: float | None = None
+    """Time the guide command ran, in seconds, if the guide is produced by a command.
+    download_bytes is the number of bytes it printed."""
+
+
+@dataclass
+class XMLTVProbeResult:
+    """Information about a guide, read from the start of the document."""
+
+    compression: str
+    """Format of the content, "xml", "zip" or a compression format ("gzip", "xz", "bzip2", "zstd" or "brotli")."""
+
+    content_length: int | None = None
+    """Size of the content on the wire, if known (Content-Length)."""
+
+    generator_name: str | None = None
+    """Name of the program that generated the guide."""
+
+    source_name: str | None = None
+    """Name of the source of the guide data."""
+
+    channel_count: int = 0
+    """Number of channels in the probed part of the guide."""
+
+    channels_complete: bool = False
+    """Whether all channels were probed, i.e. channel_count is exact."""
+
+    probed_bytes: int = 0
+    """Number of bytes downloaded before the probe stopped."""
+
+    xml_bytes: int = 0
+    """Number of bytes of XML data probed, after decompression."""
+
+    @property
+    def name(self) -> str | None:
+        """Name of the guide, like TVGuide.name."""
+        return self.generator_name or self.source_name
+
+    @property
+    def estimated_xml_bytes(self) -> int | None:
+        """Approximate size of the whole XML document, extrapolated from the compression ratio of the probed part."""
+        if self.content_length is None or self.probed_bytes == 0:
+            return None
+
+        return self.content_length * self.xml_bytes // self.probed_bytes
+
+
+@dataclass
+class _PartialDownload:
+    """Spooled content of an interrupted download, that can be resumed using a range request."""
+
+    spool: IO[bytes]
+    """Spooled content received so far, positioned at its end."""
+
+    validator: str
+    """ETag or Last-Modified of the content, to ensure the resumed content is the same version."""
+
+
+@dataclass(frozen=True)
+class _SourceFileState:
+    """Identity of a version of a local guide file, to detect changes without reading it."""
+
+    path: str
+    """Path of the file. For directory sources, this is the newest guide file in the directory."""
+
+    mtime_ns: int
+    """Modification time of the file, in nanoseconds."""
+
+    size: int
+    """Size of the file, in bytes."""
+
+    @classmethod
+    def from_stat(cls, path: str, stat: os.stat_result) -> _SourceFileState:
+        """Create the state from the result of os.stat."""
+        return cls(path=path, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+
+
+class _BrotliDecompressor:
+    """Adapts the brotli decompressor to the interface of the standard library decompressors."""
+
+    def __init__(self) -> None:
+        """Create a decompressor for a single brotli stream."""
+        self.__decompressor = brotli.Decompressor()
+        self.unused_data = b""
+
+    @property
+    def eof(self) -> bool:
+        """Whether the end of the stream was reached."""
+        return self.__decompressor.is_finished()
+
+    def decompress(self, data: bytes) -> bytes:
+        """Decompress the next chunk of the stream."""
+        return self.__decompressor.process(data)
+
+
+def _get_decompressor_factories() -> dict[str, Callable[[], Any]]:
+    """Get the incremental decompressors of the supported compression formats, by content format."""
+    factories: dict[str, Callable[[], Any]] = {
+        "gzip": lambda: zlib.decompressobj(wbits=zlib.MAX_WBITS | 16),
+        "xz": lzma.LZMADecompressor,
+        "bzip2": bz2.BZ2Decompressor,
+    }
+    if zstd is not None:
+        factories["zstd"] = zstd.ZstdDecompressor
+    if brotli is not None:
+        factories["brotli"] = _BrotliDecompressor
+
+    return factories
+
+
+def _get_decompress_functions() -> dict[str, Callable[[bytes], bytes]]:
+    """Get the one-shot decompression functions of the supported compression formats, by content format."""
+    functions: dict[str, Callable[[bytes], bytes]] = {
+        "gzip": gzip.decompress,
+        "xz": lzma.decompress,
+        "bzip2": bz2.decompress,
+    }
+    if zstd is not None:
+        functions["zstd"] = zstd.decompress
+    if brotli is not None:
+        functions["brotli"] = brotli.decompress
+
+    return functions
+
+
+_DECOMPRESSOR_FACTORIES = _get_decompressor_factories()
+_DECOMPRESS_FUNCTIONS = _get_decompress_functions()
+
+
+class _StreamDecompressor:
+    """
+    Incrementally decompresses content, detecting its format from the first bytes.
+
+    Concatenated streams (multi-member gzip, multi-stream bzip2 and xz, multi-frame zstd)
+    are decompressed one after the other, like the one-shot decompression functions do.
+    Zip archives are read from the first local file header, using the first XML member.
+    """
+
+    def __init__(self, name: str | None = None) -> None:
+        """
+        Create a decompressor, the format is detected from the first chunks.
+
+        :param name: URL or path of the content, to detect formats without magic bytes.
+        """
+        self.content_format: str | None = None
+        self.__name = name
+        self.__head = b""
+        self.__buffer = b""
+        self.__skip = 0
+        self.__decompressor: Any = None
+        self.__stream_started = False
+
+    def decompress(self, chunk: bytes) -> bytes:
+        """Decompress the next chunk of content, returning the data available so far."""
+        if self.content_format is None:
+            self.__head += chunk
+            content_format = _sniff_content_format(self.__head, self.__name)
+            if content_format is None:
+                if len(self.__head) >= SNIFF_MAX_BYTES:
+                    raise _unrecognized_content_error(self.__head)
+                return b""
+
+            self.__start(content_format)
+            chunk, self.__head = self.__head, b""
+
+        if self.content_format == "xml":
+            return chunk
+
+        if self.content_format == "zip":
+            return self.__decompress_zip(chunk)
+
+        return self.__decompress_streams(chunk)
+
+    def finish(self) -> None:
+        """Check the format of the content was detected, once all content was decompressed."""
+        if self.content_format is None and self.__head:
+            raise _unrecognized_content_error(self.__head)
+
+    def __start(self, content_format: str) -> None:
+        """Set up decompressing the detected content format."""
+        if content_format not in ("xml", "zip"):
+            factory = _DECOMPRESSOR_FACTORIES.get(content_format)
+            if factory is None:
+                raise XMLTVClientError(
+                    f"Unsupported compression format '{content_format}'"
+                )
+            self.__decompressor = factory()
+
+        self.content_format = content_format
+
+    def __decompress_streams(self, data: bytes) -> bytes:
+        """Decompress the next chunk of concatenated compressed streams."""
+        output = []
+        while data:
+            if not self.__stream_started:
+                # streams may be padded with NUL bytes
+                data = data.lstrip(b"\x00")
+                if not data:
+                    break
+                self.__stream_started = True
+
+            output.append(self.__decompressor.decompress(data))
+            if not self.__decompressor.eof:
+                break
+
+            # start the next stream
+            data = self.__decompressor.unused_data
+            self.__decompressor = _DECOMPRESSOR_FACTORIES[self.content_format or ""]()
+            self.__stream_started = False
+
+        return b"".join(output)
+
+    def __decompress_zip(self, chunk: bytes) -> bytes:
+        """Decompress the next chunk of a zip archive."""
+        if self.__decompressor is not None:
+            return self.__decompressor.decompress(chunk)
+
+        self.__buffer += chunk
+        while self.__decompressor is None:
+            if self.__skip:
+                skipped = min(self.__skip, len(self.__buffer))
+                self.__buffer = self.__buffer[skipped:]
+                self.__skip -= skipped
+
+            if len(self.__buffer) < _ZIP_LOCAL_HEADER.size:
+                return b""
+
+            (
+                signature,
+                _version,
+                flags,
+                method,
+                _time,
+                _date,
+                _crc,
+                compressed_size,
+                _size,
+                name_length,
+                extra_length,
+            ) = _ZIP_LOCAL_HEADER.unpack_from(self.__buffer)
+            if signature != _ZIP_LOCAL_HEADER_SIGNATURE:
+                raise XMLTVClientError("zip archive contains no XML file")
+
+            header_length = _ZIP_LOCAL_HEADER.size + name_length + extra_length
+            if len(self.__buffer) < header_length:
+                return b""
+
+            name = self.__buffer[
+                _ZIP_LOCAL_HEADER.size : _ZIP_LOCAL_HEADER.size + name_length
+            ]
+            self.__buffer = self.__buffer[header_length:]
+
+            # skip members that are not XML, if their size is known in advance
+            if not name.endswith(b".xml") and not flags & 0x08:
+                self.__skip = compressed_size
+                continue
+
+            if method == zipfile.ZIP_STORED:
+                self.__decompressor = _PassThrough(
+                    None if flags & 0x08 else compressed_size
+                )
+            elif method == zipfile.ZIP_DEFLATED:
+                self.__decompressor = zlib.decompressobj(wbits=-zlib.MAX_WBITS)
+            else:
+                raise XMLTVClientError(f"Unsupported zip compression method {method}")
+
+        data, self.__buffer = self.__buffer, b""
+        return self.__decompressor.decompress(data)
+
+
+class _PassThrough:
+    """Decompressor for stored (uncompressed) zip members."""
+
+    def __init__(self, size: int | None) -> None:
+        """Create a decompressor passing through up to size bytes, or everything if the size is unknown."""
+        self.__remaining = size
+
+    def decompress(self, data: bytes) -> bytes:
+        """Return the data as-is, up to the end of the member."""
+        if self.__remaining is None:
+            return data
+
+        data = data[: self.__remaining]
+        self.__remaining -= len(data)
+        return data
+
+
+def get_source_path(url: str) -> str | None:
+    """
+    Get the local path of a file:// url.
+
+    :return: The path, or None if the url is not a file:// url.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme != "file":
+        return None
+
+    return url2pathname(parsed.path)
+
+
+def get_source_command(url: str) -> list[str] | None:
+    """
+    Get the command line of an exec: url.
+
+    :return: The command and its arguments, or None if the url is not an exec: url.
+    """
+    if not url.startswith(COMMAND_URL_PREFIX):
+        return None
+
+    return shlex.split(url.removeprefix(COMMAND_URL_PREFIX))
+
+
+def _sniff_content_format(head: bytes, name: str | None = None) -> str | None:
+    """
+    Detect the format of content from its first bytes.
+
+    :param head: First bytes of the content.
+    :param name: URL or path of the content. Brotli has no magic bytes, so it is detected by the ".br" suffix.
+    :return: One of "xml", "gzip", "xz", "zip", "zstd", "bzip2" or "brotli",
+             or None if the bytes are not recognized (yet).
+    """
+    for magic, content_format in _MAGIC_BYTES:
+        if head.startswith(magic):
+            return content_format
+
+    for bom in _XML_BOMS:
+        if head.startswith(bom):
+            head = head.removeprefix(bom)
+            break
+
+    # whitespace before the prolog, NUL bytes of UTF-16 text without BOM
+    if head.lstrip(b" \t\r\n\x00").startswith(b"<"):
+        return "xml"
+
+    if name is not None and urlparse(name).path.endswith(_BROTLI_SUFFIX):
+        return "brotli"
+
+    return None
+
+
+def _unrecognized_content_error(head: bytes) -> XMLTVClientError:
+    """Create the error raised for content that is neither XML nor in a supported compression format."""
+    return XMLTVClientError(
+        f"Don't know how to handle content starting with {head[:16]!r}"
+    )
+
+
+async def _async_read_chunks(file: IO[bytes]) -> AsyncIterator[bytes]:
+    """Read a file in chunks, in the executor."""
+    loop = asyncio.get_running_loop()
+    while chunk := await loop.run_in_executor(None, file.read, SPOOL_CHUNK_SIZE):
+        yield chunk
+
+
+class _GuideCommand:
+    """A run of the guide command, streaming its output."""
+
+    def __init__(self, process: asyncio.subprocess.Process) -> None:
+        """Wrap the started process, collecting the tail of its error output."""
+        self.__process = process
+        self.__stderr_tail: deque[str] = deque(maxlen=5)
+        self.__stderr_task = asyncio.create_task(self.__async_drain_stderr())
+
+    @classmethod
+    async def async_start(cls, args: list[str]) -> _GuideCommand:
+        """Start the guide command, without a shell."""
+        if not args:
+            raise XMLTVClientError("Guide command is empty")
+
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        return cls(process)
+
+    async def iter_output(self) -> AsyncIterator[bytes]:
+        """
+        Read the output of the command in chunks, as it is printed.
+
+        Once the output ends, the command must exit successfully, so its failures are reported
+        instead of the incomplete output it left behind.
+        """
+        stdout = self.__process.stdout
+        if stdout is None:
+            raise XMLTVClientError("Guide command output is not captured")
+
+        while chunk := await stdout.read(SPOOL_CHUNK_SIZE):
+            yield chunk
+
+        returncode = await self.__process.wait()
+        await self.__stderr_task
+        if returncode != 0:
+            raise XMLTVClientCommunicationError(
+                f"Guide command exited with status {returncode}: {' '.join(self.__stderr_tail)}"
+            )
+
+    async def async_close(self) -> None:
+        """Kill the command if it is still running, e.g. after a timeout or cancellation."""
+        if self.__process.returncode is None:
+            try:
+                self.__process.kill()
+            except ProcessLookupError:
+                pass
+
+        await self.__process.wait()
+        self.__stderr_task.cancel()
+
+    async def __async_drain_stderr(self) -> None:
+        """Read the error output, so the command never blocks on it, keeping its last lines."""
+        stderr = self.__process.stderr
+        if stderr is None:
+            return
+
+        while line := await stderr.readline():
+            if text := line.decode(errors="replace").strip():
+                self.__stderr_tail.append(text)
+
+
+def _get_peak_memory() -> int | None:
+    """Get the peak memory usage of the process, in bytes, if known."""
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # ru_maxrss is in bytes on macOS, but in kilobytes on linux
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _get_range_validator(response: aiohttp.ClientResponse) -> str | None:
+    """
+    Get the validator to send as If-Range when resuming the response content.
+
+    :return: The strong ETag or the Last-Modified date, or None if the content cannot be resumed.
+    """
+    # ranges refer to the encoded content, but aiohttp transparently decodes it
+    if response.headers.get("Content-Encoding", None) not in (None, "identity"):
+        return None
+
+    etag = response.headers.get("ETag", None)
+    if etag is not None and not etag.startswith("W/"):
+        return etag
+
+    return response.headers.get("Last-Modified", None)
+
+
+def _get_last_modified(response: aiohttp.ClientResponse) -> datetime | None:
+    """
+    Get the Last-Modified date of the response.
+
+    :return: The Last-Modified date, as naive local time, or None if missing or invalid.
+    """
+    value = response.headers.get("Last-Modified", None)
+    if value is None:
+        return None
+
+    try:
+        return parsedate_to_datetime(value).astimezone().replace(tzinfo=None)
+    except TypeError, ValueError:
+        return None
+
+
+def _get_range_start(response: aiohttp.ClientResponse) -> int | None:
+    """
+    Get the start of the range contained in a partial content (206) response.
+
+    :return: The first byte position, or None if the response is not partial content.
+    """
+    if response.status != 206:
+        return None
+
+    match = re.match(r"bytes (\d+)-", response.headers.get("Content-Range", None) or "")
+    return int(match.group(1)) if match else None
+
+
 class XMLTVClient:
     """XMLTV Client."""
 
@@ -32,27 +652,143 @@ class XMLTVClient:
         session: aiohttp.ClientSession,
         url: str,
         logger: Logger | None = None,
+        profiler: XMLTVProfiler | None = None,
+        fast_parser: bool = False,
+        parser_workers: int = 1,
+        spool_threshold: int | None = None,
+        decompress_workers: int = 1,
+        timeout: aiohttp.ClientTimeout | None = None,
+        limiter: RequestLimiter | None = None,
+        command_timeout: float | None = COMMAND_TIMEOUT,
     ) -> None:
-        """XMLTV Client."""
+        """
+        XMLTV Client.
+
+        :param url: URL of the guide. file:// urls refer to a local guide file,
+                    or a directory containing guide files, of which the newest is used.
+                    exec: urls run a command (without a shell) that prints the guide to stdout.
+        :param fast_parser: Parse guides using the fast parser instead of pydantic-xml.
+        :param parser_workers: Number of processes to parse guides with. 1 to parse in-process.
+        :param spool_threshold: Spool downloads to temporary files, keeping up to this many bytes in memory.
+                                None to download into memory.
+        :param decompress_workers: Number of processes to decompress multi-member gzip and multi-block xz content with.
+                                   1 to decompress in-process. Not used when decompressing while downloading.
+        :param timeout: Timeouts of guide downloads. None to use the timeouts of the session.
+        :param limiter: Limits the rate and concurrency of requests to the guide's host. None for no limit.
+        :param command_timeout: Maximum time in seconds the command of exec: urls may run, also when probing.
+                                None for no limit.
+        """
         self._session = session
         self._url = url
         self.__logger = logger
+        self.__profiler = profiler
+        self.__fast_parser = fast_parser
+        self.__parser_workers = parser_workers
+        self.__spool_threshold = spool_threshold
+        self.__decompress_workers = decompress_workers
+        self.__timeout = timeout
+        self.__limiter = limiter
+        self.__command_timeout = command_timeout
+        self.__partial_download: _PartialDownload | None = None
+        self.__last_fetch_stats: XMLTVFetchStats | None = None
+        self.__source_path = get_source_path(url)
+        self.__source_command = get_source_command(url)
+        self.__source_file_guide: tuple[_SourceFileState, TVGuide] | None = None
+        self.__last_seen_file_state: _SourceFileState | None = None
+        self.__last_reported_file_state: _SourceFileState | None = None
+
+    @property
+    def last_fetch_stats(self) -> XMLTVFetchStats | None:
+        """Statistics of the last successful fetch, if any."""
+        return self.__last_fetch_stats
 
-    async def async_get_data(self) -> TVGuide:
+    @property
+    def is_file_source(self) -> bool:
+        """Whether the guide is read from a local file or directory."""
+        return self.__source_path is not None
+
+    def __span(self, name: str) -> AbstractContextManager[None]:
+        """Profiling span, if a profiler is set."""
+        if self.__profiler is None:
+            return nullcontext()
+
+        return self.__profiler.span(name)
+
+    async def async_get_data(
+        self,
+        on_channels: Callable[[TVGuide], None] | None = None,
+        priority_window: tuple[datetime, datetime] | None = None,
+        on_priority_guide: Callable[[TVGuide], None] | None = None,
+    ) -> TVGuide:
+        """
+        Fetch XMLTV Guide data.
+
+        :param on_channels: Load the guide progressively, calling this with a channels-only guide
+                            as soon as all channels are parsed, while the programs are still loading.
+                            The guide is then parsed while downloading, using the fast parser.
+        :param priority_window: Parse in two phases, first only the programs airing in this (start, end) window.
+                                Both phases run in the executor. Not used for exec: sources,
+                                whose output is always parsed while the command runs.
+        :param on_priority_guide: Called with the guide containing only the priority window programs,
+                                  before the full guide is parsed.
+        """
+        with self.__span("XMLTVClient.async_get_data"):
+            return await self.__async_get_data(
+                on_channels, priority_window, on_priority_guide
+            )
+
+    async def __async_get_data(
+        self,
+        on_channels: Callable[[TVGuide], None] | None,
+        priority_window: tuple[datetime, datetime] | None,
+        on_priority_guide: Callable[[TVGuide], None] | None,
+    ) -> TVGuide:
         """Fetch XMLTV Guide data."""
         try:
-            # fetch data
-            response = await self._session.get(url=self._url)
-            response.raise_for_status()
+            stats = XMLTVFetchStats(fetched_at=datetime.now())
+            peak_memory_before = _get_peak_memory()
 
-            xml_bytes = await self.__decode_response(response)
-
-            guide = TVGuide.from_xml(xml_bytes)
+            if self.__source_path is not None:
+                result = await self.__async_get_data_file(
+                    stats, on_channels, priority_window, on_priority_guide
+                )
+                if result is None:
+                    return self.__get_unchanged_file_guide()
+                guide, parse_stats = result
+            elif self.__source_command is not None:
+                with collect_parse_stats() as parse_stats:
+                    guide = await self.__async_get_data_command(
+                        self.__source_command, stats, on_channels
+                    )
+            elif on_channels is not None:
+                with collect_parse_stats() as parse_stats:
+                    guide = await self.__async_get_data_progressive(stats, on_channels)
+            else:
+                guide, parse_stats = await self.__async_get_data_complete(
+                    stats, priority_window, on_priority_guide
+                )
             if guide is None:
                 raise XMLTVClientError(
                     "Failed to parse TV Guide data",
                 )
 
+            stats.link_time = parse_stats.link_time
+            if self.__profiler is not None:
+                self.__profiler.record("TVGuide linking", stats.link_time)
+            stats.parse_time -= stats.link_time
+            stats.channel_count = len(guide.channels)
+            stats.program_count = len(guide.programs)
+            stats.dropped_channel_count = parse_stats.omitted.get("channel", 0)
+            stats.dropped_program_count = parse_stats.omitted.get("programme", 0)
+
+            peak_memory_after = _get_peak_memory()
+            if peak_memory_before is not None and peak_memory_after is not None:
+                stats.peak_memory_delta = peak_memory_after - peak_memory_before
+
+            if self.__logger:
+                self.__logger.debug("Fetched xmltv data from %s: %s", self._url, stats)
+
+            self.__last_fetch_stats = stats
             return guide
         except XMLTVClientError as exception:
             raise exception
@@ -64,6 +800,10 @@ class XMLTVClient:
             raise XMLTVClientCommunicationError(
                 "Error fetching xmltv data: " + exception.__str__(),
             ) from exception
+        except OSError as exception:
+            raise XMLTVClientCommunicationError(
+                "Error reading xmltv data: " + exception.__str__(),
+            ) from exception
         except ValidationError as exception:
             raise XMLTVClientError(
                 "Error parsing xmltv data: " + exception.__str__()
@@ -73,90 +813,798 @@ class XMLTVClient:
                 "Unknown error fetching xmltv data: " + exception.__str__()
             ) from exception
 
-    async def __decode_response(self, response: aiohttp.ClientResponse) -> bytes:
-        """Attempt to decode the response content to XML text."""
-        content_type = response.content_type
-        content_encoding = response.headers.get("Content-Encoding", None)
+    async def async_probe(
+        self, max_xml_bytes: int = PROBE_MAX_XML_BYTES
+    ) -> XMLTVProbeResult:
+        """
+        Probe the guide, reading only the start of the document.
+
+        The content is streamed and decompressed incrementally, until the root element and
+        all channels are read, or max_xml_bytes of XML data were probed. The transfer is then aborted.
+
+        :param max_xml_bytes: Maximum number of bytes of XML data to probe.
+        :return: Information about the guide.
+        """
+        with self.__span("XMLTVClient.async_probe"):
+            try:
+                # most guide commands only print the guide once they are done
+                timeout = (
+                    PROBE_TIMEOUT
+                    if self.__source_command is None
+                    else self.__command_timeout
+                )
+                async with asyncio.timeout(timeout):
+                    return await self.__async_probe(max_xml_bytes)
+            except XMLTVClientError as exception:
+                raise exception
+            except asyncio.TimeoutError as exception:
+                raise XMLTVClientCommunicationError(
+                    "Timeout probing xmltv data: " + exception.__str__(),
+                ) from exception
+            except (aiohttp.ClientError, socket.gaierror) as exception:
+                raise XMLTVClientCommunicationError(
+                    "Error probing xmltv data: " + exception.__str__(),
+                ) from exception
+            except OSError as exception:
+                raise XMLTVClientCommunicationError(
+                    "Error reading xmltv data: " + exception.__str__(),
+                ) from exception
+            except Exception as exception:  # pylint: disable=broad-except
+                raise XMLTVClientError(
+                    "Unknown error probing xmltv data: " + exception.__str__()
+                ) from exception
+
+    async def __async_probe(self, max_xml_bytes: int) -> XMLTVProbeResult:
+        """Probe the guide, reading only the start of the document."""
+        if self.__source_path is not None:
+            file, state = await asyncio.get_running_loop().run_in_executor(
+                None, self.__open_source_file
+            )
+            with file:
+                result = await self.__async_probe_chunks(
+                    _async_read_chunks(file), state.size, max_xml_bytes, state.path
+                )
+        elif self.__source_command is not None:
+            command = await _GuideCommand.async_start(self.__source_command)
+            try:
+                result = await self.__async_probe_chunks(
+                    command.iter_output(), None, max_xml_bytes
+                )
+            finally:
+                # the remaining output is not needed
+                await command.async_close()
+        else:
+            response = await self.__async_request()
+            try:
+                response.raise_for_status()
+                self.__log_response(response)
+                result = await self.__async_probe_chunks(
+                    response.content.iter_chunked(SPOOL_CHUNK_SIZE),
+                    response.content_length,
+                    max_xml_bytes,
+                    str(response.url),
+                )
+            finally:
+                # abort the transfer of the remaining content
+                response.close()
+
+        if self.__logger:
+            self.__logger.debug("Probed xmltv data from %s: %s", self._url, result)
+
+        return result
+
+    async def __async_probe_chunks(
+        self,
+        chunks: AsyncIterator[bytes],
+        content_length: int | None,
+        max_xml_bytes: int,
+        name: str | None = None,
+    ) -> XMLTVProbeResult:
+        """
+        Probe the content, read in chunks, until enough is known about the guide.
+
+        :param name: URL or path of the content, to detect its format.
+        """
+        decompressor = _StreamDecompressor(name)
+        parser = etree.XMLPullParser(events=("start", "end"))
+        # compression is set once it is detected
+        result = XMLTVProbeResult(compression="xml", content_length=content_length)
+
+        root_seen = done = False
+        async for chunk in chunks:
+            result.probed_bytes += len(chunk)
+            xml = decompressor.decompress(chunk)
+            result.xml_bytes += len(xml)
+
+            parser.feed(xml)
+            root_seen, done = self.__read_probe_events(parser, result, root_seen)
+            if done or result.xml_bytes >= max_xml_bytes:
+                break
+
+        decompressor.finish()
+        if result.xml_bytes == 0 or decompressor.content_format is None:
+            raise XMLTVClientCommunicationError("No data received")
+        result.compression = decompressor.content_format
+        if not root_seen or (not done and result.xml_bytes < max_xml_bytes):
+            raise XMLTVClientError("Incomplete xmltv data")
+
+        return result
+
+    def __read_probe_events(
+        self, parser: Any, result: XMLTVProbeResult, root_seen: bool
+    ) -> tuple[bool, bool]:
+        """
+        Read the pending parser events into the probe result.
+
+        :param root_seen: Whether the root element was read already.
+        :return: (root_seen, done) tuple. done is True once all channels were read.
+        """
+        for event, element in parser.read_events():
+            tag = element.tag
+            if not root_seen:
+                if tag != TVGuide.__xml_tag__:
+                    raise XMLTVClientError(
+                        f"root element not found (actual: {tag}, expected: {TVGuide.__xml_tag__})"
+                    )
+
+                root_seen = True
+                result.generator_name = element.get("generator-info-name")
+                result.source_name = element.get("source-info-name")
+            elif event == "start" and tag == TVProgram.__xml_tag__:
+                # channels are listed before programs
+                result.channels_complete = True
+                return root_seen, True
+            elif event == "end" and tag == TVChannel.__xml_tag__:
+                result.channel_count += 1
+                element.clear()
+            elif event == "end" and tag == TVGuide.__xml_tag__:
+                result.channels_complete = True
+                return root_seen, True
+
+        return root_seen, False
+
+    async def __async_get_data_complete(
+        self,
+        stats: XMLTVFetchStats,
+        priority_window: tuple[datetime, datetime] | None,
+        on_priority_guide: Callable[[TVGuide], None] | None,
+    ) -> tuple[TVGuide, ParseStats]:
+        """Download and decode the whole content, then parse it using the configured parser."""
+        with ExitStack() as spools:
+            # fetch data
+            t = time.perf_counter()
+            with self.__span("download"):
+                if self.__spool_threshold is None:
+                    response = await self.__async_request()
+                    response.raise_for_status()
+                    data = await response.read()
+                    stats.download_bytes = len(data)
+                else:
+                    response, spool = await self.__async_download_spooled(stats)
+                    spools.enter_context(spool)
+                    stats.download_bytes = spool.tell()
+            stats.download_time = time.perf_counter() - t
+            stats.transfer_bytes = response.content_length
+            stats.last_modified = _get_last_modified(response)
+            self.__log_response(response)
+
+            # decompressing is CPU-bound, like parsing, so it must not block the event loop either
+            loop = asyncio.get_running_loop()
+            t = time.perf_counter()
+            with self.__span("XMLTVClient.__decode_response"):
+                xml: bytes | IO[bytes]
+                if self.__spool_threshold is None:
+                    xml = await loop.run_in_executor(
+                        None, self.__decode_response, data, str(response.url)
+                    )
+                    stats.xml_bytes = len(xml)
+                else:
+                    xml = spools.enter_context(
+                        await loop.run_in_executor(
+                            None, self.__decode_spooled, spool, str(response.url)
+                        )
+                    )
+                    stats.xml_bytes = xml.seek(0, io.SEEK_END)
+                    xml.seek(0)
+            stats.decompress_time = time.perf_counter() - t
+
+            t = time.perf_counter()
+            with collect_parse_stats() as parse_stats:
+                if priority_window is not None and on_priority_guide is not None:
+                    guide = await self.__async_parse_guide_prioritized(
+                        xml, priority_window, on_priority_guide
+                    )
+                else:
+                    # contexts are copied, so parse statistics are collected in the executor too
+                    guide = await loop.run_in_executor(
+                        None, contextvars.copy_context().run, self.__parse_guide, xml
+                    )
+            stats.parse_time = time.perf_counter() - t
+
+        return guide, parse_stats
+
+    async def __async_get_data_progressive(
+        self, stats: XMLTVFetchStats, on_channels: Callable[[TVGuide], None]
+    ) -> TVGuide:
+        """
+        Download the content, decompressing and parsing it while it is received.
+
+        :param on_channels: Called with a channels-only guide, as soon as all channels are parsed.
+        """
+        t = time.perf_counter()
+        response = await self.__async_request()
+        try:
+            response.raise_for_status()
+            stats.transfer_bytes = response.content_length
+            stats.last_modified = _get_last_modified(response)
+            self.__log_response(response)
+
+            with self.__span("download_progressive"):
+                guide = await self.__async_parse_progressive(
+                    response.content.iter_chunked(SPOOL_CHUNK_SIZE),
+                    stats,
+                    on_channels,
+                    str(response.url),
+                )
+        finally:
+            response.close()
+
+        stats.download_time = (
+            time.perf_counter() - t - stats.decompress_time - stats.parse_time
+        )
+        return guide
+
+    async def __async_parse_progressive(
+        self,
+        chunks: AsyncIterator[bytes],
+        stats: XMLTVFetchStats,
+        on_channels: Callable[[TVGuide], None] | None,
+        name: str | None = None,
+    ) -> TVGuide:
+        """
+        Decompress and parse the content while it is read in chunks.
+
+        Each chunk is decompressed and parsed in the executor, as is building the guide at the end,
+        so only reading the chunks and publishing the channels run on the event loop.
+
+        :param on_channels: Called with a channels-only guide, as soon as all channels are parsed. May be None.
+        :param name: URL or path of the content, to detect its format.
+        """
+        loop = asyncio.get_running_loop()
+        # a single copy of the context, so parse statistics of all chunks are collected together
+        context = contextvars.copy_context()
+        decompressor = _StreamDecompressor(name)
+        parser = ProgressiveGuideParser()
+        channels_published = False
+        async for chunk in chunks:
+            stats.download_bytes += len(chunk)
+
+            xml_bytes, decompress_time, parse_time = await loop.run_in_executor(
+                None,
+                context.run,
+                self.__feed_progressive,
+                decompressor,
+                parser,
+                chunk,
+            )
+            stats.xml_bytes += xml_bytes
+            stats.decompress_time += decompress_time
+            stats.parse_time += parse_time
+
+            if (
+                on_channels is not None
+                and not channels_published
+                and parser.channels_complete
+            ):
+                channels_published = True
+                t_parse = time.perf_counter()
+                on_channels(parser.get_channels_guide())
+                stats.parse_time += time.perf_counter() - t_parse
+
+        guide, parse_time = await loop.run_in_executor(
+            None, context.run, self.__close_progressive, decompressor, parser
+        )
+        stats.parse_time += parse_time
+        return guide
+
+    @staticmethod
+    def __feed_progressive(
+        decompressor: _StreamDecompressor,
+        parser: ProgressiveGuideParser,
+        chunk: bytes,
+    ) -> tuple[int, float, float]:
+        """
+        Decompress the next chunk of content and feed it into the progressive parser.
+
+        Runs in the executor.
+
+        :return: (XML bytes, decompress time, parse time) tuple.
+        """
+        t_decompress = time.perf_counter()
+        xml = decompressor.decompress(chunk)
+
+        t_parse = time.perf_counter()
+        parser.feed(xml)
+        return len(xml), t_parse - t_decompress, time.perf_counter() - t_parse
+
+    @staticmethod
+    def __close_progressive(
+        decompressor: _StreamDecompressor, parser: ProgressiveGuideParser
+    ) -> tuple[TVGuide, float]:
+        """
+        Finish decompressing and parsing the content, building the guide.
+
+        Runs in the executor.
+
+        :return: (guide, parse time) tuple.
+        """
+        decompressor.finish()
+
+        t_parse = time.perf_counter()
+        guide = parser.close()
+        return guide, time.perf_counter() - t_parse
+
+    async def __async_get_data_command(
+        self,
+        args: list[str],
+        stats: XMLTVFetchStats,
+        on_channels: Callable[[TVGuide], None] | None,
+    ) -> TVGuide:
+        """
+        Run the guide command, parsing its output while it is printed.
+
+        The output is streamed into the progressive parser, so it is neither buffered as a whole nor spooled.
+        The command is killed if it exceeds the timeout, or the fetch is cancelled.
+
+        :param on_channels: Called with a channels-only guide, as soon as all channels are parsed. May be None.
+        """
+        t = time.perf_counter()
+        command = await _GuideCommand.async_start(args)
+        try:
+            async with asyncio.timeout(self.__command_timeout):
+                with self.__span("run_command"):
+                    guide = await self.__async_parse_progressive(
+                        command.iter_output(), stats, on_channels
+                    )
+        finally:
+            await command.async_close()
+
+        stats.command_runtime = time.perf_counter() - t
+        stats.download_time = (
+            stats.command_runtime - stats.decompress_time - stats.parse_time
+        )
+        return guide
+
+    async def __async_get_data_file(
+        self,
+        stats: XMLTVFetchStats,
+        on_channels: Callable[[TVGuide], None] | None,
+        priority_window: tuple[datetime, datetime] | None,
+        on_priority_guide: Callable[[TVGuide], None] | None,
+    ) -> tuple[TVGuide, ParseStats] | None:
+        """
+        Read and parse the local guide file, unless it is unchanged since it was last parsed.
+
+        The file is read in place, streaming it into the parser, so it is never copied as a whole.
+        Compressed files are decompressed into a spooled temporary file first, like downloads.
+
+        :return: (guide, parse_stats) tuple, or None if the file is unchanged.
+        """
+        loop = asyncio.get_running_loop()
+
+        t = time.perf_counter()
+        file, state = await loop.run_in_executor(None, self.__open_source_file)
+        with ExitStack() as files:
+            files.enter_context(file)
+            if (
+                self.__source_file_guide is not None
+                and self.__source_file_guide[0] == state
+            ):
+                return None
+
+            stats.transfer_bytes = state.size
+            stats.last_modified = datetime.fromtimestamp(state.mtime_ns / 1e9)
+
+            if on_channels is not None:
+                with (
+                    self.__span("read_progressive"),
+                    collect_parse_stats() as parse_stats,
+                ):
+                    guide = await self.__async_parse_progressive(
+                        _async_read_chunks(file), stats, on_channels, state.path
+                    )
+                stats.download_time = (
+                    time.perf_counter() - t - stats.decompress_time - stats.parse_time
+                )
+            else:
+                stats.download_bytes = state.size
+                stats.download_time = time.perf_counter() - t
+
+                t = time.perf_counter()
+                with self.__span("XMLTVClient.__decode_spooled"):
+                    xml = files.enter_context(
+                        await loop.run_in_executor(
+                            None, self.__decode_spooled, file, state.path
+                        )
+                    )
+                    stats.xml_bytes = xml.seek(0, io.SEEK_END)
+                    xml.seek(0)
+                stats.decompress_time = time.perf_counter() - t
+
+                t = time.perf_counter()
+                with collect_parse_stats() as parse_stats:
+                    if priority_window is not None and on_priority_guide is not None:
+                        guide = await self.__async_parse_guide_prioritized(
+                            xml, priority_window, on_priority_guide
+                        )
+                    else:
+                        # contexts are copied, so parse statistics are collected in the executor too
+                        guide = await loop.run_in_executor(
+                            None,
+                            contextvars.copy_context().run,
+                            self.__parse_guide,
+                            xml,
+                        )
+                stats.parse_time = time.perf_counter() - t
+
+        self.__source_file_guide = (state, guide)
+        return guide, parse_stats
+
+    def __get_unchanged_file_guide(self) -> TVGuide:
+        """Get the guide parsed from the local guide file, when the file is unchanged."""
+        if self.__source_file_guide is None:
+            raise XMLTVClientError("No guide parsed from the guide file yet")
 
         if self.__logger:
             self.__logger.debug(
-                "Decoding response from %s: content-type=%s, content-encoding=%s",
-                response.url,
-                content_type,
-                content_encoding,
+                "Guide file %s is unchanged, skipping parsing",
+                self.__source_file_guide[0].path,
             )
 
-        # figure out how to decode the XML data
-        decode_fn = None
-        if content_type in ["text/xml", "application/xml"]:
-            # raw XML text
-            async def decode_plain() -> bytes:
-                return await response.read()
-
-            decode_fn = decode_plain
-
-        elif content_type in [
-            "application/gzip",
-            "application/x-gzip",
-        ] or "xml.gz" in str(response.url):
-            # xml.gz, XML compressed with gzip
-            async def decode_gzip() -> bytes:
-                d = await response.read()
-                return gzip.decompress(d)
-
-            decode_fn = decode_gzip
-
-        elif content_type in ["application/x-xz"] or "xml.xz" in str(response.url):
-            # xm.xz, XML compressed with xz
-            async def decode_xz() -> bytes:
-                d = await response.read()
-                return lzma.decompress(d)
-
-            decode_fn = decode_xz
-
-        elif content_type in ["application/zip"] or "xml.zip" in str(response.url):
-            # xml.zip, XML file inside a zip archive
-            async def decode_zip() -> bytes:
-                d = await response.read()
-                with io.BytesIO(d) as iofile, zipfile.ZipFile(iofile, "r") as zip:
-                    namelist = zip.namelist()
-                    i = 0
-
-                    if len(namelist) == 0:
-                        raise XMLTVClientError("zip archive is empty")
-                    if len(namelist) > 1:
-                        for ix, name in enumerate(namelist):
-                            if name.endswith(".xml"):
-                                i = ix
-                                break
-
-                        if self.__logger:
-                            self.__logger.warning(
-                                "zip archive contains multiple files (%s), using i=%d",
-                                namelist,
-                                i,
-                            )
-
-                    with zip.open(namelist[i]) as xml_file:
-                        return xml_file.read()
-
-            decode_fn = decode_zip
-        else:
+        return self.__source_file_guide[1]
+
+    def __resolve_source_file(self) -> str:
+        """
+        Get the path of the local guide file to read. Runs in the executor.
+
+        For directory sources, this is the most recently modified guide file in the directory.
+        """
+        if self.__source_path is None:
+            raise XMLTVClientError("Not a local guide file source")
+
+        if not os.path.isdir(self.__source_path):
+            return self.__source_path
+
+        candidates = [
+            entry
+            for entry in os.scandir(self.__source_path)
+            if entry.is_file() and entry.name.endswith(GUIDE_FILE_SUFFIXES)
+        ]
+        if not candidates:
             raise XMLTVClientError(
-                f"Don't know how to handle content type '{response.content_type}' (from {response.url})",
+                f"No guide file found in directory {self.__source_path}"
             )
 
+        return max(candidates, key=lambda entry: entry.stat().st_mtime_ns).path
+
+    def __open_source_file(self) -> tuple[IO[bytes], _SourceFileState]:
+        """
+        Open the local guide file. Runs in the executor.
+
+        The state is taken from the opened file, so it matches the content read, even if the file is replaced meanwhile.
+
+        :return: (file, state) tuple.
+        """
+        path = self.__resolve_source_file()
+        file = open(path, "rb")
         try:
-            return await decode_fn()
-        except Exception as decode_exception:
-            # workaround for elres.de [gzipped xml, gzip transfer (wrong content-type)]
+            return file, _SourceFileState.from_stat(path, os.fstat(file.fileno()))
+        except BaseException:
+            file.close()
+            raise
+
+    async def async_check_source_changed(self) -> bool:
+        """
+        Check if the local guide file has a new version, that was completely written.
+
+        A new version is complete once its size and modification time did not change since the previous check.
+        Each new version is reported only once, even if parsing it fails.
+
+        :return: True if the guide should be re-fetched. Always False for remote sources.
+        """
+        if self.__source_path is None:
+            return False
+
+        def get_state() -> _SourceFileState:
+            path = self.__resolve_source_file()
+            return _SourceFileState.from_stat(path, os.stat(path))
+
+        try:
+            state = await asyncio.get_running_loop().run_in_executor(None, get_state)
+        except OSError, XMLTVClientError:
+            return False
+
+        previous_state, self.__last_seen_file_state = (
+            self.__last_seen_file_state,
+            state,
+        )
+        if state != previous_state or state == self.__last_reported_file_state:
+            return False
+
+        self.__last_reported_file_state = state
+        return self.__source_file_guide is None or self.__source_file_guide[0] != state
+
+    async def __async_parse_guide_prioritized(
+        self,
+        xml: bytes | IO[bytes],
+        priority_window: tuple[datetime, datetime],
+        on_priority_guide: Callable[[TVGuide], None],
+    ) -> TVGuide:
+        """
+        Parse the XML data in two phases, in the executor.
+
+        The first phase parses only the programs in the priority window, using the fast parser,
+        and hands that guide to on_priority_guide. The second phase parses the full guide.
+        """
+        loop = asyncio.get_running_loop()
+
+        def parse_priority_guide() -> TVGuide:
+            # programs omitted in this phase are counted when parsing the full guide
+            with self.__span("parse_guide_priority_window"), collect_parse_stats():
+                guide = parse_guide(xml, window=priority_window)
+
+            if not isinstance(xml, bytes):
+                xml.seek(0)
+            return guide
+
+        # contexts are copied, so parse statistics are collected in the executor too
+        on_priority_guide(
+            await loop.run_in_executor(
+                None, contextvars.copy_context().run, parse_priority_guide
+            )
+        )
+
+        return await loop.run_in_executor(
+            None, contextvars.copy_context().run, self.__parse_guide, xml
+        )
+
+    def __parse_guide(self, xml: bytes | IO[bytes]) -> TVGuide:
+        """
+        Parse the XML data (or a file containing it) using the configured parser. Runs in the executor.
+
+        Parallel parsing starts a new process pool for every parse, instead of keeping one alive across refetches.
+        Guides are only fetched every few hours, so starting the workers costs little in comparison, while idle
+        workers would keep the memory of the shards they parsed until the next refetch.
+        """
+        if self.__parser_workers > 1:
+            with self.__span("parse_guide_parallel"):
+                # shards are split from the whole document, so it has to be in memory
+                return parse_guide_parallel(
+                    xml if isinstance(xml, bytes) else xml.read(),
+                    self.__parser_workers,
+                    fast_parser=self.__fast_parser,
+                )
+
+        if self.__fast_parser:
+            with self.__span("parse_guide"):
+                return parse_guide(xml)
+
+        with self.__span("TVGuide.from_xml"):
+            if isinstance(xml, bytes):
+                return TVGuide.from_xml(xml)
+
+            return TVGuide.from_xml_tree(etree.parse(xml).getroot())
+
+    async def __async_request(
+        self, headers: dict[str, str] | None = None
+    ) -> aiohttp.ClientResponse:
+        """
+        Send the request for the guide, using the configured timeouts and limiter.
+
+        The limiter's slot is held until the response headers are received, the content is read afterwards.
+        Guide requests are not coalesced, as every response is read by a single client.
+
+        :param headers: Additional request headers.
+        """
+        kwargs: dict[str, Any] = {}
+        if headers is not None:
+            kwargs["headers"] = headers
+        if self.__timeout is not None:
+            kwargs["timeout"] = self.__timeout
+
+        if self.__limiter is None:
+            return await self._session.get(url=self._url, **kwargs)
+
+        async with self.__limiter.async_slot(self._url):
+            return await self._session.get(url=self._url, **kwargs)
+
+    async def __async_download_spooled(
+        self, stats: XMLTVFetchStats
+    ) -> tuple[aiohttp.ClientResponse, IO[bytes]]:
+        """
+        Download the content into a spooled temporary file.
+
+        Content up to the spool threshold is kept in memory, larger content is written to disk.
+        If the previous download was interrupted, it is resumed using a range request.
+        If-Range ensures that the server sends the whole content instead if it changed in the meantime.
+
+        :return: (response, spool) tuple. The spool is positioned at the end of the content.
+        """
+        partial, self.__partial_download = self.__partial_download, None
+
+        headers = {}
+        if partial is not None:
+            headers["Range"] = f"bytes={partial.spool.tell()}-"
+            headers["If-Range"] = partial.validator
+            # the spool contains the content after transfer decoding, so the range has to refer to that
+            headers["Accept-Encoding"] = "identity"
+
+        try:
+            response = await self.__async_request(headers)
+            response.raise_for_status()
+        except BaseException:
+            if partial is not None:
+                partial.spool.close()
+            raise
+
+        range_start = _get_range_start(response)
+        if partial is not None and range_start == partial.spool.tell():
+            spool = partial.spool
+            stats.resumed_bytes = spool.tell()
             if self.__logger:
                 self.__logger.debug(
-                    "Failed to decode xml data using expected method, attempting to decode as text. Error: %s",
-                    decode_exception,
+                    "Resuming download of %s at %d bytes", self._url, spool.tell()
+                )
+        else:
+            if partial is not None:
+                partial.spool.close()
+            if range_start is not None:
+                raise XMLTVClientCommunicationError(
+                    f"Server sent unexpected range starting at {range_start}"
                 )
 
-            try:
-                return await response.read()
-            except Exception as text_exception:
-                raise text_exception from decode_exception
+            spool = tempfile.SpooledTemporaryFile(max_size=self.__spool_threshold or 0)
+
+        try:
+            async for chunk in response.content.iter_chunked(SPOOL_CHUNK_SIZE):
+                spool.write(chunk)
+        except aiohttp.ClientError, asyncio.TimeoutError:
+            # keep what was received so far, to resume on the next attempt
+            validator = _get_range_validator(response)
+            if validator is None and partial is not None and spool is partial.spool:
+                validator = partial.validator
+
+            if validator is not None and spool.tell() > 0:
+                self.__partial_download = _PartialDownload(spool, validator)
+            else:
+                spool.close()
+            raise
+        except BaseException:
+            spool.close()
+            raise
+
+        return response, spool
+
+    def __log_response(self, response: aiohttp.ClientResponse) -> None:
+        """Log the headers describing the response content. Its format is detected from the content itself."""
+        if self.__logger:
+            self.__logger.debug(
+                "Decoding response from %s: content-type=%s, content-encoding=%s",
+                response.url,
+                response.content_type,
+                response.headers.get("Content-Encoding", None),
+            )
+
+    def __detect_content_format(self, head: bytes, name: str | None = None) -> str:
+        """
+        Detect the format of the content from its first bytes.
+
+        Transfer encodings were already decoded by aiohttp, so this is the format of the content itself,
+        regardless of what the content type claims.
+
+        :param name: URL or path of the content, to detect formats without magic bytes.
+        :return: "xml", "zip" or one of the supported compression formats.
+        """
+        content_format = _sniff_content_format(head, name)
+        if content_format is None:
+            raise _unrecognized_content_error(head)
+        if content_format not in ("xml", "zip", *_DECOMPRESS_FUNCTIONS):
+            raise XMLTVClientError(f"Unsupported compression format '{content_format}'")
+
+        if self.__logger:
+            self.__logger.debug("Detected %s content", content_format)
+
+        return content_format
+
+    def __get_zip_member(self, zip: zipfile.ZipFile) -> str:
+        """Get the name of the XML file inside a zip archive."""
+        namelist = zip.namelist()
+        i = 0
+
+        if len(namelist) == 0:
+            raise XMLTVClientError("zip archive is empty")
+        if len(namelist) > 1:
+            for ix, name in enumerate(namelist):
+                if name.endswith(".xml"):
+                    i = ix
+                    break
+
+            if self.__logger:
+                self.__logger.warning(
+                    "zip archive contains multiple files (%s), using i=%d",
+                    namelist,
+                    i,
+                )
+
+        return namelist[i]
+
+    def __decode_spooled(self, spool: IO[bytes], name: str | None = None) -> IO[bytes]:
+        """
+        Decode the spooled content to XML text.
+
+        Compressed content is decompressed in chunks into another spooled temporary file,
+        zip archives are read in place, so the content is never held in memory as a whole.
+        Content is only decompressed in parallel if it fits within the spool threshold,
+        as its segments are split from the whole content in memory.
+
+        :param name: URL or path of the content, to detect formats without magic bytes.
+        :return: File containing the XML text. May be the input spool, if the content is not compressed.
+        """
+        size = spool.seek(0, io.SEEK_END)
+        spool.seek(0)
+        content_format = self.__detect_content_format(spool.read(SNIFF_MAX_BYTES), name)
+        spool.seek(0)
+        if content_format == "xml":
+            return spool
+
+        xml = tempfile.SpooledTemporaryFile(max_size=self.__spool_threshold or 0)
+        try:
+            if content_format == "zip":
+                with (
+                    zipfile.ZipFile(spool, "r") as zip,
+                    zip.open(self.__get_zip_member(zip)) as src,
+                ):
+                    shutil.copyfileobj(src, xml, SPOOL_CHUNK_SIZE)
+            elif (
+                content_format in PARALLEL_FORMATS
+                and self.__decompress_workers > 1
+                and (self.__spool_threshold is None or size <= self.__spool_threshold)
+            ):
+                with self.__span("decompress_parallel"):
+                    for part in decompress_parallel(
+                        spool.read(), content_format, self.__decompress_workers
+                    ):
+                        xml.write(part)
+            else:
+                decompressor = _StreamDecompressor(name)
+                while chunk := spool.read(SPOOL_CHUNK_SIZE):
+                    xml.write(decompressor.decompress(chunk))
+        except BaseException:
+            xml.close()
+            raise
+
+        return xml
+
+    def __decode_response(self, data: bytes, name: str | None = None) -> bytes:
+        """
+        Decode the (already downloaded) content to XML text.
+
+        :param name: URL or path of the content, to detect formats without magic bytes.
+        """
+        content_format = self.__detect_content_format(data[:SNIFF_MAX_BYTES], name)
+
+        if content_format in PARALLEL_FORMATS and self.__decompress_workers > 1:
+            with self.__span("decompress_parallel"):
+                return b"".join(
+                    decompress_parallel(data, content_format, self.__decompress_workers)
+                )
+
+        if content_format in _DECOMPRESS_FUNCTIONS:
+            return _DECOMPRESS_FUNCTIONS[content_format](data)
+
+        if content_format == "zip":
+            with io.BytesIO(data) as iofile, zipfile.ZipFile(iofile, "r") as zip:
+                with zip.open(self.__get_zip_member(zip)) as xml_file:
+                    return xml_file.read()
+
+        return data
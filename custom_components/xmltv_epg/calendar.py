@@ -0,0 +1,138 @@
+"""Calendar platform for XMLTV."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+
+from homeassistant.components.calendar import (
+    CalendarEntity,
+    CalendarEntityDescription,
+    CalendarEvent,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN, LOGGER, ChannelSensorMode
+from .coordinator import XMLTVDataUpdateCoordinator
+from .entity import XMLTVEntity
+from .helper import program_get_normalized_identification
+from .model import TVChannel, TVGuide, TVProgram
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+):
+    """Set up the calendar platform."""
+    coordinator: XMLTVDataUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+    guide: TVGuide = coordinator.data
+
+    if not coordinator.enable_calendar:
+        return
+
+    channels = guide.channels
+    if coordinator.calendar_channels:
+        channels = [c for c in channels if c.id in coordinator.calendar_channels]
+
+    LOGGER.debug(f"Setting up calendar entities for {len(channels)} channels.")
+
+    async_add_entities(
+        XMLTVChannelCalendar(coordinator, channel) for channel in channels
+    )
+
+
+class XMLTVChannelCalendar(XMLTVEntity, CalendarEntity):
+    """XMLTV Channel Calendar class."""
+
+    coordinator: XMLTVDataUpdateCoordinator
+
+    __channel: TVChannel
+    __events: dict[int, CalendarEvent]
+
+    def __init__(
+        self, coordinator: XMLTVDataUpdateCoordinator, channel: TVChannel
+    ) -> None:
+        """Initialize the calendar class."""
+        super().__init__(coordinator, channel)
+
+        translation_key, entity_id = program_get_normalized_identification(
+            channel, ChannelSensorMode.NONE, "channel_calendar"
+        )
+
+        self.entity_id = entity_id
+        self._attr_unique_id = str(uuid.uuid5(uuid.NAMESPACE_X500, self.entity_id))
+
+        self._attr_has_entity_name = True
+        self.entity_description = CalendarEntityDescription(
+            key=translation_key,
+            translation_key=translation_key,
+        )
+
+        self.__channel = channel
+        self.__events = {}
+
+        LOGGER.debug(f"Setup calendar '{self.entity_id}' for channel '{channel.id}'.")
+
+    def __get_event(self, program: TVProgram) -> CalendarEvent:
+        """
+        Get the calendar event for a program.
+
+        Events are created lazily and cached per program, so repeated
+        queries over the same time window don't re-create them.
+        The cache is reset whenever the channel data is replaced.
+
+        :param program: The program to get the event for.
+        :return: Calendar event for the program.
+        """
+        key = id(program)
+        event = self.__events.get(key)
+        if event is None:
+            start = program.start.astimezone()
+            event = CalendarEvent(
+                start=start,
+                end=program.end.astimezone(),
+                summary=program.full_title,
+                description=program.description,
+                location=self.__channel.display_name,
+                uid=f"{self.__channel.id}_{int(start.timestamp())}",
+            )
+            self.__events[key] = event
+
+        return event
+
+    @property
+    def event(self) -> CalendarEvent | None:
+        """Return the currently airing program."""
+        program = self.__channel.get_current_program(self.coordinator.actual_now)
+        if program is None:
+            return None
+
+        return self.__get_event(program)
+
+    async def async_get_events(
+        self,
+        hass: HomeAssistant,
+        start_date: datetime,
+        end_date: datetime,
+    ) -> list[CalendarEvent]:
+        """Return the programs airing in the given time window."""
+        return [
+            self.__get_event(p)
+            for p in self.__channel.get_programs(start_date, end_date)
+        ]
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        guide: TVGuide = self.coordinator.data
+
+        channel = guide.get_channel(self.__channel.id)
+        if channel is not None and channel is not self.__channel:
+            # new guide data, cached events are no longer valid
+            self.__channel = channel
+            self.__events = {}
+
+        super()._handle_coordinator_update()
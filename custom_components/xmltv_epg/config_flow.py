@@ -2,37 +2,85 @@
 
 from __future__ import annotations
 
+import os
+import shutil
+
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_HOST
 from homeassistant.helpers import selector
-from homeassistant.helpers.aiohttp_client import async_create_clientsession
 
 from .api import (
     XMLTVClient,
     XMLTVClientCommunicationError,
     XMLTVClientError,
+    XMLTVClientSourceNotAllowedError,
+    get_source_command,
 )
 from .const import (
+    DEFAULT_ALIGN_TO_PUBLISH_TIME,
+    DEFAULT_CALENDAR_CHANNELS,
+    DEFAULT_COMMAND_TIMEOUT,
+    DEFAULT_COVERAGE_HORIZON,
+    DEFAULT_ENABLE_CALENDAR,
     DEFAULT_ENABLE_CHANNEL_ICONS,
     DEFAULT_ENABLE_CURRENT_SENSOR,
+    DEFAULT_ENABLE_FAST_PARSER,
+    DEFAULT_ENABLE_PRIORITY_WINDOW_PARSE,
+    DEFAULT_ENABLE_PROGRESSIVE_LOADING,
+    DEFAULT_ENABLE_PROFILING,
     DEFAULT_ENABLE_PRIMETIME_SENSOR,
     DEFAULT_ENABLE_PROGRAM_IMAGES,
+    DEFAULT_ENABLE_PROGRAM_LIST_SENSOR,
     DEFAULT_ENABLE_UPCOMING_SENSOR,
+    DEFAULT_HTTP_READ_TIMEOUT,
+    DEFAULT_HTTP_TIMEOUT,
+    DEFAULT_MAX_STALENESS,
+    DEFAULT_DECOMPRESS_WORKERS,
+    DEFAULT_PARSER_WORKERS,
     DEFAULT_PRIMETIME_TIME,
+    DEFAULT_PROGRAM_LIST_SIZE,
+    DEFAULT_PROFILING_DUMP_STATS,
     DEFAULT_PROGRAM_LOOKAHEAD,
+    DEFAULT_PUBLISH_TIME,
+    DEFAULT_SPOOL_THRESHOLD,
+    DEFAULT_RECORD_PROGRAM_DETAILS,
     DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_WATCH_SOURCE_FILE,
     DOMAIN,
     LOGGER,
+    OPT_ALIGN_TO_PUBLISH_TIME,
+    OPT_CALENDAR_CHANNELS,
+    OPT_COVERAGE_HORIZON,
+    OPT_ENABLE_CALENDAR,
     OPT_ENABLE_CHANNEL_ICONS,
     OPT_ENABLE_CURRENT_SENSOR,
+    OPT_ENABLE_FAST_PARSER,
+    OPT_ENABLE_PRIORITY_WINDOW_PARSE,
+    OPT_ENABLE_PROGRESSIVE_LOADING,
+    OPT_ENABLE_PROFILING,
     OPT_ENABLE_PRIMETIME_SENSOR,
     OPT_ENABLE_PROGRAM_IMAGES,
+    OPT_ENABLE_PROGRAM_LIST_SENSOR,
     OPT_ENABLE_UPCOMING_SENSOR,
+    OPT_COMMAND_TIMEOUT,
+    OPT_HTTP_READ_TIMEOUT,
+    OPT_HTTP_TIMEOUT,
+    OPT_MAX_STALENESS,
+    OPT_DECOMPRESS_WORKERS,
+    OPT_PARSER_WORKERS,
     OPT_PRIMETIME_TIME,
+    OPT_PROGRAM_LIST_SIZE,
+    OPT_PROFILING_DUMP_STATS,
     OPT_PROGRAM_LOOKAHEAD,
+    OPT_PUBLISH_TIME,
+    OPT_SPOOL_THRESHOLD,
+    OPT_RECORD_PROGRAM_DETAILS,
     OPT_UPDATE_INTERVAL,
+    OPT_WATCH_SOURCE_FILE,
 )
+from .http_client import async_get_limiter, async_get_session
+from .source_access import async_check_source_allowed
 
 
 class XMLTVFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
@@ -51,6 +99,9 @@ class XMLTVFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                 generator_name = await self._test_connection(
                     url=user_input[CONF_HOST],
                 )
+            except XMLTVClientSourceNotAllowedError as exception:
+                LOGGER.error(exception)
+                _errors["base"] = "source_not_allowed"
             except XMLTVClientCommunicationError as exception:
                 LOGGER.error(exception)
                 _errors["base"] = "connection"
@@ -81,17 +132,35 @@ class XMLTVFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
     async def _test_connection(self, url: str) -> str:
-        """Validate connection."""
+        """
+        Validate connection, probing only the start of the guide.
+
+        Guide commands are not run, as most only print the guide once they are done,
+        which may take much longer than the config flow should wait.
+        """
+        await async_check_source_allowed(self.hass, url)
+
+        args = get_source_command(url)
+        if args is not None:
+            if await self.hass.async_add_executor_job(shutil.which, args[0]) is None:
+                raise XMLTVClientCommunicationError(
+                    f"Guide command '{args[0]}' not found"
+                )
+
+            return os.path.basename(args[0])
+
         client = XMLTVClient(
-            session=async_create_clientsession(self.hass),
+            session=async_get_session(self.hass),
             url=url,
+            limiter=async_get_limiter(self.hass),
             logger=LOGGER,
         )
-        guide = await client.async_get_data()
-        if not guide:
-            raise XMLTVClientCommunicationError("No data received")
+        probe = await client.async_probe()
+        LOGGER.debug(
+            f"Probed guide at {url}: {probe.compression}, {probe.channel_count} channels, ~{probe.estimated_xml_bytes} bytes of XML"
+        )
 
-        return guide.name or ""
+        return probe.name or ""
 
     @staticmethod
     def async_get_options_flow(config_entry: config_entries.ConfigEntry):
@@ -139,6 +208,89 @@ class XMLTVOptionsFlowHandler(config_entries.OptionsFlow):
                             mode=selector.NumberSelectorMode.BOX,
                         )
                     ),
+                    vol.Required(
+                        OPT_MAX_STALENESS,
+                        default=self.config_entry.options.get(
+                            OPT_MAX_STALENESS, DEFAULT_MAX_STALENESS
+                        ),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=0,
+                            step=1,
+                            mode=selector.NumberSelectorMode.BOX,
+                        )
+                    ),
+                    vol.Required(
+                        OPT_ALIGN_TO_PUBLISH_TIME,
+                        default=self.config_entry.options.get(
+                            OPT_ALIGN_TO_PUBLISH_TIME, DEFAULT_ALIGN_TO_PUBLISH_TIME
+                        ),
+                    ): selector.BooleanSelector(),
+                    vol.Optional(
+                        OPT_PUBLISH_TIME,
+                        description={
+                            "suggested_value": self.config_entry.options.get(
+                                OPT_PUBLISH_TIME, DEFAULT_PUBLISH_TIME
+                            )
+                        },
+                    ): selector.TimeSelector(),
+                    vol.Required(
+                        OPT_COVERAGE_HORIZON,
+                        default=self.config_entry.options.get(
+                            OPT_COVERAGE_HORIZON, DEFAULT_COVERAGE_HORIZON
+                        ),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=0,
+                            step=1,
+                            mode=selector.NumberSelectorMode.BOX,
+                        )
+                    ),
+                    vol.Required(
+                        OPT_WATCH_SOURCE_FILE,
+                        default=self.config_entry.options.get(
+                            OPT_WATCH_SOURCE_FILE, DEFAULT_WATCH_SOURCE_FILE
+                        ),
+                    ): selector.BooleanSelector(),
+                    vol.Required(
+                        OPT_HTTP_TIMEOUT,
+                        default=self.config_entry.options.get(
+                            OPT_HTTP_TIMEOUT, DEFAULT_HTTP_TIMEOUT
+                        ),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=0,
+                            step=1,
+                            mode=selector.NumberSelectorMode.BOX,
+                            unit_of_measurement="s",
+                        )
+                    ),
+                    vol.Required(
+                        OPT_HTTP_READ_TIMEOUT,
+                        default=self.config_entry.options.get(
+                            OPT_HTTP_READ_TIMEOUT, DEFAULT_HTTP_READ_TIMEOUT
+                        ),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=0,
+                            step=1,
+                            mode=selector.NumberSelectorMode.BOX,
+                            unit_of_measurement="s",
+                        )
+                    ),
+                    vol.Required(
+                        OPT_COMMAND_TIMEOUT,
+                        default=self.config_entry.options.get(
+                            OPT_COMMAND_TIMEOUT, DEFAULT_COMMAND_TIMEOUT
+                        ),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=0,
+                            step=1,
+                            mode=selector.NumberSelectorMode.BOX,
+                            unit_of_measurement="s",
+                        )
+                    ),
                     vol.Required(
                         OPT_ENABLE_CURRENT_SENSOR,
                         default=self.config_entry.options.get(
@@ -168,12 +320,38 @@ class XMLTVOptionsFlowHandler(config_entries.OptionsFlow):
                             OPT_ENABLE_PRIMETIME_SENSOR, DEFAULT_ENABLE_PRIMETIME_SENSOR
                         ),
                     ): selector.BooleanSelector(),
+                    vol.Required(
+                        OPT_ENABLE_PROGRAM_LIST_SENSOR,
+                        default=self.config_entry.options.get(
+                            OPT_ENABLE_PROGRAM_LIST_SENSOR,
+                            DEFAULT_ENABLE_PROGRAM_LIST_SENSOR,
+                        ),
+                    ): selector.BooleanSelector(),
+                    vol.Required(
+                        OPT_PROGRAM_LIST_SIZE,
+                        default=self.config_entry.options.get(
+                            OPT_PROGRAM_LIST_SIZE, DEFAULT_PROGRAM_LIST_SIZE
+                        ),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=1,
+                            max=20,
+                            step=1,
+                            mode=selector.NumberSelectorMode.BOX,
+                        )
+                    ),
                     vol.Required(
                         OPT_PRIMETIME_TIME,
                         default=self.config_entry.options.get(
                             OPT_PRIMETIME_TIME, DEFAULT_PRIMETIME_TIME
                         ),
                     ): selector.TimeSelector(),
+                    vol.Required(
+                        OPT_RECORD_PROGRAM_DETAILS,
+                        default=self.config_entry.options.get(
+                            OPT_RECORD_PROGRAM_DETAILS, DEFAULT_RECORD_PROGRAM_DETAILS
+                        ),
+                    ): selector.BooleanSelector(),
                     vol.Required(
                         OPT_ENABLE_CHANNEL_ICONS,
                         default=self.config_entry.options.get(
@@ -186,6 +364,94 @@ class XMLTVOptionsFlowHandler(config_entries.OptionsFlow):
                             OPT_ENABLE_PROGRAM_IMAGES, DEFAULT_ENABLE_PROGRAM_IMAGES
                         ),
                     ): selector.BooleanSelector(),
+                    vol.Required(
+                        OPT_ENABLE_CALENDAR,
+                        default=self.config_entry.options.get(
+                            OPT_ENABLE_CALENDAR, DEFAULT_ENABLE_CALENDAR
+                        ),
+                    ): selector.BooleanSelector(),
+                    vol.Optional(
+                        OPT_CALENDAR_CHANNELS,
+                        default=self.config_entry.options.get(
+                            OPT_CALENDAR_CHANNELS, DEFAULT_CALENDAR_CHANNELS
+                        ),
+                    ): selector.TextSelector(
+                        selector.TextSelectorConfig(
+                            type=selector.TextSelectorType.TEXT,
+                            multiple=True,
+                        )
+                    ),
+                    vol.Required(
+                        OPT_ENABLE_FAST_PARSER,
+                        default=self.config_entry.options.get(
+                            OPT_ENABLE_FAST_PARSER, DEFAULT_ENABLE_FAST_PARSER
+                        ),
+                    ): selector.BooleanSelector(),
+                    vol.Required(
+                        OPT_ENABLE_PROGRESSIVE_LOADING,
+                        default=self.config_entry.options.get(
+                            OPT_ENABLE_PROGRESSIVE_LOADING,
+                            DEFAULT_ENABLE_PROGRESSIVE_LOADING,
+                        ),
+                    ): selector.BooleanSelector(),
+                    vol.Required(
+                        OPT_ENABLE_PRIORITY_WINDOW_PARSE,
+                        default=self.config_entry.options.get(
+                            OPT_ENABLE_PRIORITY_WINDOW_PARSE,
+                            DEFAULT_ENABLE_PRIORITY_WINDOW_PARSE,
+                        ),
+                    ): selector.BooleanSelector(),
+                    vol.Required(
+                        OPT_SPOOL_THRESHOLD,
+                        default=self.config_entry.options.get(
+                            OPT_SPOOL_THRESHOLD, DEFAULT_SPOOL_THRESHOLD
+                        ),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=0,
+                            step=1,
+                            mode=selector.NumberSelectorMode.BOX,
+                            unit_of_measurement="MiB",
+                        )
+                    ),
+                    vol.Required(
+                        OPT_PARSER_WORKERS,
+                        default=self.config_entry.options.get(
+                            OPT_PARSER_WORKERS, DEFAULT_PARSER_WORKERS
+                        ),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=1,
+                            max=32,
+                            step=1,
+                            mode=selector.NumberSelectorMode.BOX,
+                        )
+                    ),
+                    vol.Required(
+                        OPT_DECOMPRESS_WORKERS,
+                        default=self.config_entry.options.get(
+                            OPT_DECOMPRESS_WORKERS, DEFAULT_DECOMPRESS_WORKERS
+                        ),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=1,
+                            max=32,
+                            step=1,
+                            mode=selector.NumberSelectorMode.BOX,
+                        )
+                    ),
+                    vol.Required(
+                        OPT_ENABLE_PROFILING,
+                        default=self.config_entry.options.get(
+                            OPT_ENABLE_PROFILING, DEFAULT_ENABLE_PROFILING
+                        ),
+                    ): selector.BooleanSelector(),
+                    vol.Required(
+                        OPT_PROFILING_DUMP_STATS,
+                        default=self.config_entry.options.get(
+                            OPT_PROFILING_DUMP_STATS, DEFAULT_PROFILING_DUMP_STATS
+                        ),
+                    ): selector.BooleanSelector(),
                 }
             ),
         )
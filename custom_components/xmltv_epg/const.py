@@ -32,10 +32,129 @@ DEFAULT_ENABLE_CHANNEL_ICONS = False
 OPT_ENABLE_PROGRAM_IMAGES = "enable_program_images"
 DEFAULT_ENABLE_PROGRAM_IMAGES = False
 
+OPT_ENABLE_PROGRAM_LIST_SENSOR = "enable_program_list_sensor"
+DEFAULT_ENABLE_PROGRAM_LIST_SENSOR = False
+
+OPT_PROGRAM_LIST_SIZE = "program_list_size"
+DEFAULT_PROGRAM_LIST_SIZE = 5  # programs
+
+OPT_ENABLE_CALENDAR = "enable_calendar"
+DEFAULT_ENABLE_CALENDAR = False
+
+OPT_CALENDAR_CHANNELS = "calendar_channels"
+DEFAULT_CALENDAR_CHANNELS: list[str] = []  # empty for all channels
+
+OPT_RECORD_PROGRAM_DETAILS = "record_program_details"
+DEFAULT_RECORD_PROGRAM_DETAILS = False
+
+# Attributes of program sensors that are excluded from the recorder, unless OPT_RECORD_PROGRAM_DETAILS is enabled.
+# These may be large and are stored again on every state change, quickly growing the database.
+PROGRAM_SENSOR_UNRECORDED_ATTRIBUTES = frozenset(
+    {
+        "description",
+        "category",
+        "release_date",
+        "language",
+        "episode",
+        "subtitle",
+        "channel_program_known_until",
+    }
+)
+
+# Attributes of program list sensors that are excluded from the recorder.
+# The program list is several KB, and changes with every program that ends.
+PROGRAM_LIST_SENSOR_UNRECORDED_ATTRIBUTES = frozenset({"programs"})
+
+OPT_MAX_STALENESS = "max_staleness_hours"
+DEFAULT_MAX_STALENESS = 48  # hours, 0 to serve stale data indefinitely
+
+OPT_ALIGN_TO_PUBLISH_TIME = "align_to_publish_time"
+DEFAULT_ALIGN_TO_PUBLISH_TIME = False
+
+OPT_PUBLISH_TIME = "publish_time"
+DEFAULT_PUBLISH_TIME = ""  # empty to learn from the Last-Modified header
+
+OPT_COVERAGE_HORIZON = "coverage_horizon_hours"
+DEFAULT_COVERAGE_HORIZON = 0  # hours, 0 to disable
+
+OPT_WATCH_SOURCE_FILE = "watch_source_file"
+DEFAULT_WATCH_SOURCE_FILE = False
+
+OPT_HTTP_TIMEOUT = "http_timeout_seconds"
+DEFAULT_HTTP_TIMEOUT = 300  # seconds, 0 for no limit
+
+OPT_HTTP_READ_TIMEOUT = "http_read_timeout_seconds"
+DEFAULT_HTTP_READ_TIMEOUT = 60  # seconds, 0 for no limit
+
+OPT_COMMAND_TIMEOUT = "command_timeout_seconds"
+DEFAULT_COMMAND_TIMEOUT = 60 * 60  # seconds, 0 for no limit
+
+# configuration.yaml key listing the command lines exec: guide sources may run
+CONF_ALLOWED_COMMANDS = "allowed_commands"
+
+OPT_ENABLE_FAST_PARSER = "enable_fast_parser"
+DEFAULT_ENABLE_FAST_PARSER = False
+
+OPT_ENABLE_PROGRESSIVE_LOADING = "enable_progressive_loading"
+DEFAULT_ENABLE_PROGRESSIVE_LOADING = False
+
+OPT_ENABLE_PRIORITY_WINDOW_PARSE = "enable_priority_window_parse"
+DEFAULT_ENABLE_PRIORITY_WINDOW_PARSE = False
+
+OPT_PARSER_WORKERS = "parser_workers"
+DEFAULT_PARSER_WORKERS = 1  # processes, 1 to parse in-process
+
+OPT_DECOMPRESS_WORKERS = "decompress_workers"
+DEFAULT_DECOMPRESS_WORKERS = 1  # processes, 1 to decompress in-process
+
+OPT_SPOOL_THRESHOLD = "spool_threshold_mb"
+DEFAULT_SPOOL_THRESHOLD = 0  # MiB, 0 to download into memory
+
+OPT_ENABLE_PROFILING = "enable_profiling"
+DEFAULT_ENABLE_PROFILING = False
+
+OPT_PROFILING_DUMP_STATS = "profiling_dump_stats"
+DEFAULT_PROFILING_DUMP_STATS = False
+
+# Directory (relative to the config directory) cProfile statistics are written to.
+PROFILING_DUMP_DIR = f"{DOMAIN}/profiles"
+
+# Maximum time to fetch an image of an image entity.
+IMAGE_FETCH_TIMEOUT = 10  # seconds
+
 # Interval that sensors are updated.
 # This is only updating sensors from cached data, fetching new data interval is defined by OPT_UPDATE_INTERVAL.
 SENSOR_REFRESH_INTERVAL = 60  # seconds
 
+# Delays between attempts to refetch the guide after a failed refetch.
+# The delay doubles with every consecutive failure, up to the maximum.
+REFETCH_RETRY_INITIAL_DELAY = 5 * 60  # seconds
+REFETCH_RETRY_MAX_DELAY = 6 * 60 * 60  # seconds
+
+# Delay after the provider's publish time before refetching the guide, and the maximum
+# random delay added to it, so not all clients refetch at the same time.
+PUBLISH_REFETCH_DELAY = 15 * 60  # seconds
+PUBLISH_REFETCH_JITTER = 30 * 60  # seconds
+
+# Minimum time between refetches triggered by the guide coverage dropping below the horizon.
+COVERAGE_REFETCH_MIN_INTERVAL = 60 * 60  # seconds
+
+# Interval that local guide files are checked for changes, when watching them.
+# A changed file is re-fetched once it is unchanged for one interval, i.e. the grabber finished writing it.
+SOURCE_FILE_WATCH_INTERVAL = 30  # seconds
+
+# Time window of programs parsed first, when parsing the priority window first.
+# It starts this long before now, and covers at least the given length from now.
+PRIORITY_WINDOW_SLACK = 60 * 60  # seconds
+PRIORITY_WINDOW_MIN_LENGTH = 6 * 60 * 60  # seconds
+
+# Maximum size of the program list attribute of program list sensors.
+# The recorder refuses to store state attributes larger than 16 KiB, so stay well below that.
+PROGRAM_LIST_MAX_BYTES = 12 * 1024
+
+# Maximum length of program titles in the program list attribute.
+PROGRAM_LIST_MAX_TITLE_LENGTH = 100
+
 
 class ChannelSensorMode(StrEnum):
     """Modes for XMLTV Channel Program Sensor to operate in."""
@@ -43,5 +162,6 @@ class ChannelSensorMode(StrEnum):
     CURRENT = "current"
     NEXT = "upcoming"
     PRIMETIME = "primetime"
+    PROGRAM_LIST = "list"
 
     NONE = "none"  # fallback if no mode is applicable
@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
+import asyncio
+import random
+from collections.abc import Callable
 from datetime import datetime, time, timedelta
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HassJob, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
@@ -16,8 +20,31 @@ from custom_components.xmltv_epg.model.guide import TVGuide
 from .api import (
     XMLTVClient,
     XMLTVClientError,
+    XMLTVFetchStats,
+)
+from .const import (
+    COVERAGE_REFETCH_MIN_INTERVAL,
+    DEFAULT_COVERAGE_HORIZON,
+    DEFAULT_MAX_STALENESS,
+    DEFAULT_PROGRAM_LIST_SIZE,
+    DOMAIN,
+    LOGGER,
+    PRIORITY_WINDOW_MIN_LENGTH,
+    PRIORITY_WINDOW_SLACK,
+    PUBLISH_REFETCH_DELAY,
+    PUBLISH_REFETCH_JITTER,
+    REFETCH_RETRY_INITIAL_DELAY,
+    REFETCH_RETRY_MAX_DELAY,
+    SENSOR_REFRESH_INTERVAL,
+    SOURCE_FILE_WATCH_INTERVAL,
+)
+from .profiling import XMLTVProfiler
+from .scheduling import (
+    ExponentialBackoff,
+    PublishTimeEstimator,
+    get_next_publish_time,
+    parse_time_of_day,
 )
-from .const import DOMAIN, LOGGER, SENSOR_REFRESH_INTERVAL
 
 
 # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
@@ -27,6 +54,7 @@ class XMLTVDataUpdateCoordinator(DataUpdateCoordinator[TVGuide]):
     config_entry: ConfigEntry
 
     __client: XMLTVClient
+    __profiler: XMLTVProfiler
     __lookahead: timedelta
     __enable_current_sensor: bool
     __enable_upcoming_sensor: bool
@@ -34,10 +62,35 @@ class XMLTVDataUpdateCoordinator(DataUpdateCoordinator[TVGuide]):
     __enable_channel_icon: bool
     __enable_program_image: bool
     __primetime_time: time
+    __enable_program_list_sensor: bool
+    __program_list_size: int
+    __record_program_details: bool
+    __enable_calendar: bool
+    __calendar_channels: list[str]
 
     __guide: TVGuide
     __last_refetch_time: datetime | None
+    __last_fetch_stats: XMLTVFetchStats | None
     __refetch_interval: timedelta
+    __max_staleness: timedelta | None
+    __refetch_backoff: ExponentialBackoff
+    __next_retry_time: datetime | None
+    __refetch_task: asyncio.Task | None
+    __align_to_publish_time: bool
+    __publish_time: time | None
+    __publish_time_estimator: PublishTimeEstimator
+    __coverage_horizon: timedelta | None
+    __random: random.Random
+    __refetch_jitter: timedelta
+    __progressive_loading: bool
+    __guide_partial: (
+        bool  # channels-only or priority window guide, while the full guide is loading
+    )
+    __channels_loaded: asyncio.Event
+    __priority_window_parse: bool
+    __watch_source_file: bool
+    __unsub_refetch_timer: CALLBACK_TYPE | None
+    __unsub_source_file_watch: CALLBACK_TYPE | None
 
     def __init__(
         self,
@@ -52,33 +105,62 @@ class XMLTVDataUpdateCoordinator(DataUpdateCoordinator[TVGuide]):
         enable_channel_icon: bool,
         enable_program_image: bool,
         primetime_time: str,  # HH:MM:SS format
+        enable_program_list_sensor: bool = False,
+        program_list_size: int = DEFAULT_PROGRAM_LIST_SIZE,
+        record_program_details: bool = False,
+        enable_calendar: bool = False,
+        calendar_channels: list[str] | None = None,
+        profiler: XMLTVProfiler | None = None,
+        max_staleness: int = DEFAULT_MAX_STALENESS,  # hours, 0 to disable
+        align_to_publish_time: bool = False,
+        publish_time: str
+        | None = None,  # HH:MM:SS format, None to learn from Last-Modified
+        coverage_horizon: int = DEFAULT_COVERAGE_HORIZON,  # hours, 0 to disable
+        progressive_loading: bool = False,
+        priority_window_parse: bool = False,
+        watch_source_file: bool = False,
     ) -> None:
         """Initialize."""
         self.__client = client
+        self.__profiler = profiler or XMLTVProfiler(LOGGER)
         self.__lookahead = timedelta(minutes=lookahead)
         self.__enable_current_sensor = enable_current_sensor
         self.__enable_upcoming_sensor = enable_upcoming_sensor
         self.__enable_primetime_sensor = enable_primetime_sensor
         self.__enable_channel_icon = enable_channel_icon
         self.__enable_program_image = enable_program_image
+        self.__enable_program_list_sensor = enable_program_list_sensor
+        self.__program_list_size = max(1, int(program_list_size))
+        self.__record_program_details = record_program_details
+        self.__enable_calendar = enable_calendar
+        self.__calendar_channels = calendar_channels or []
 
-        try:
-            try:
-                # attempt hh:mm:ss format first
-                self.__primetime_time = datetime.strptime(
-                    primetime_time, "%H:%M:%S"
-                ).time()
-            except ValueError:
-                # fallback to hh:mm format
-                self.__primetime_time = datetime.strptime(
-                    primetime_time, "%H:%M"
-                ).time()
-        except ValueError:
+        parsed_primetime_time = parse_time_of_day(primetime_time)
+        if parsed_primetime_time is None:
             # fallback to fixed time
             LOGGER.warning(
                 f"Invalid primetime_time format: {primetime_time}, fallback to 20:00:00"
             )
-            self.__primetime_time = time(hour=20, minute=0, second=0)
+            parsed_primetime_time = time(hour=20, minute=0, second=0)
+        self.__primetime_time = parsed_primetime_time
+
+        self.__align_to_publish_time = align_to_publish_time
+        self.__publish_time = None
+        if publish_time:
+            self.__publish_time = parse_time_of_day(publish_time)
+            if self.__publish_time is None:
+                LOGGER.warning(
+                    f"Invalid publish_time format: {publish_time}, learning it from the provider instead"
+                )
+        self.__publish_time_estimator = PublishTimeEstimator()
+        self.__coverage_horizon = (
+            timedelta(hours=coverage_horizon) if coverage_horizon > 0 else None
+        )
+        self.__random = random.Random()  # noqa: S311
+        self.__refetch_jitter = self.__draw_refetch_jitter()
+        self.__progressive_loading = progressive_loading
+        self.__priority_window_parse = priority_window_parse
+        self.__watch_source_file = watch_source_file
 
         super().__init__(
             hass=hass,
@@ -90,35 +172,402 @@ class XMLTVDataUpdateCoordinator(DataUpdateCoordinator[TVGuide]):
 
         self.__guide = TVGuide()
         self.__last_refetch_time = None
+        self.__last_fetch_stats = None
         self.__refetch_interval = timedelta(hours=update_interval)
+        # data is never considered too stale before it is due for a refetch
+        self.__max_staleness = (
+            max(timedelta(hours=max_staleness), self.__refetch_interval)
+            if max_staleness > 0
+            else None
+        )
+        self.__refetch_backoff = ExponentialBackoff(
+            initial_delay=timedelta(seconds=REFETCH_RETRY_INITIAL_DELAY),
+            max_delay=min(
+                timedelta(seconds=REFETCH_RETRY_MAX_DELAY), self.__refetch_interval
+            ),
+        )
+        self.__next_retry_time = None
+        self.__refetch_task = None
+        self.__unsub_refetch_timer = None
+        self.__unsub_source_file_watch = None
+        self.__guide_partial = False
+        self.__channels_loaded = asyncio.Event()
 
-    async def _refetch_tv_guide(self):
-        """Re-fetch TV guide data."""
+    async def _refetch_tv_guide(
+        self, on_channels: Callable[[TVGuide], None] | None = None
+    ):
+        """
+        Re-fetch TV guide data.
+
+        The new guide is swapped in only once it is fully fetched and parsed,
+        so readers never see a partially updated guide.
+
+        When parsing the priority window first, its guide is published before the full guide is parsed.
+        If the re-fetch fails after that, the previous guide is restored and listeners are notified.
+
+        :param on_channels: Load progressively, calling this with a channels-only guide before the programs are loaded.
+        """
+        previous_guide = self.__guide
         try:
-            guide = await self.__client.async_get_data()
+            async with self.__profiler.session("refetch"):
+                if self.__priority_window_parse:
+                    guide = await self.__client.async_get_data(
+                        on_channels=on_channels,
+                        priority_window=self._get_priority_window(),
+                        on_priority_guide=self._async_on_priority_guide,
+                    )
+                else:
+                    guide = await self.__client.async_get_data(on_channels=on_channels)
             LOGGER.debug(
                 f"Updated XMLTV guide /w {len(guide.channels)} channels and {len(guide.programs)} programs."
             )
 
             self.__guide = guide
+            self.__guide_partial = False
             self.__last_refetch_time = self.actual_now
+            self.__last_fetch_stats = self.__client.last_fetch_stats
+            self.__refetch_backoff.reset()
+            self.__next_retry_time = None
+            self.__refetch_jitter = self.__draw_refetch_jitter()
+            if (
+                self.__last_fetch_stats is not None
+                and self.__last_fetch_stats.last_modified is not None
+            ):
+                self.__publish_time_estimator.record(
+                    self.__last_fetch_stats.last_modified
+                )
         except XMLTVClientError as exception:
+            partial_published = self.__guide is not previous_guide
+            self.__guide = previous_guide
+            self.__guide_partial = False
+
+            # entities must not keep showing the partial guide
+            if partial_published and previous_guide is not None:
+                self.data = previous_guide
+                self.async_update_listeners()
             raise UpdateFailed(exception) from exception
 
+    async def async_profile_refetch(self) -> None:
+        """
+        Re-fetch TV guide data once with profiling and statistics dump enabled, then update all entities.
+
+        A running background re-fetch is waited for first, and the profiled re-fetch takes its place
+        while running, so the client and profiler are never used by two re-fetches at once.
+        """
+        while self.__refetch_task is not None:
+            await asyncio.wait({self.__refetch_task})
+
+        task = self.config_entry.async_create_background_task(
+            self.hass,
+            self._async_profiled_refetch(),
+            name=f"{DOMAIN} profiled refetch {self.config_entry.entry_id}",
+        )
+
+        # the task starts eagerly, and may have completed already
+        if not task.done():
+            self.__refetch_task = task
+        try:
+            await task
+        finally:
+            if self.__refetch_task is task:
+                self.__refetch_task = None
+            self._async_schedule_refetch_timer()
+
+    async def _async_profiled_refetch(self) -> None:
+        """Re-fetch TV guide data with profiling and statistics dump enabled, then notify listeners."""
+        enabled = self.__profiler.enabled
+        dump_stats = self.__profiler.dump_stats
+        self.__profiler.enabled = True
+        self.__profiler.dump_stats = True
+        try:
+            await self._refetch_tv_guide()
+            self.async_set_updated_data(self.__guide)
+        finally:
+            self.__profiler.enabled = enabled
+            self.__profiler.dump_stats = dump_stats
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all registered listeners, measuring the entity fan-out."""
+        with self.__profiler.span("update_listeners"):
+            super().async_update_listeners()
+
+    def __draw_refetch_jitter(self) -> timedelta:
+        """Draw a random delay to add to refetches aligned to the publish time, spreading load on the provider."""
+        return timedelta(seconds=PUBLISH_REFETCH_JITTER * self.__random.random())
+
+    def _get_next_refetch_time(self) -> datetime | None:
+        """
+        Get the time the guide should be refetched next.
+
+        This is the earliest of:
+        - the end of the refetch interval
+        - shortly after the provider publishes a new guide, if aligning to the publish time
+        - when the guide coverage drops below the coverage horizon, if enabled
+
+        :return: Next refetch time, or None if the guide should be fetched right away.
+        """
+        # waiting to retry a failed refetch ?
+        if self.__next_retry_time is not None:
+            return self.__next_retry_time
+
+        # no guide data yet ?
+        if not self.__guide or not self.__last_refetch_time:
+            return None
+
+        next_refetch_time = self.__last_refetch_time + self.__refetch_interval
+
+        publish_time = self.publish_time
+        if self.__align_to_publish_time and publish_time is not None:
+            next_publish_time = get_next_publish_time(
+                self.__last_refetch_time, publish_time
+            )
+            next_refetch_time = min(
+                next_refetch_time,
+                next_publish_time
+                + timedelta(seconds=PUBLISH_REFETCH_DELAY)
+                + self.__refetch_jitter,
+            )
+
+        known_until = self.guide_known_until
+        if self.__coverage_horizon is not None and known_until is not None:
+            # do not refetch more often than the minimum interval, in case the provider has no newer data
+            next_refetch_time = min(
+                next_refetch_time,
+                max(
+                    known_until - self.__coverage_horizon,
+                    self.__last_refetch_time
+                    + timedelta(seconds=COVERAGE_REFETCH_MIN_INTERVAL),
+                ),
+            )
+
+        return next_refetch_time
+
     def _should_refetch(self) -> bool:
         """Check if data should be refetched?."""
-        # no guide data yet ?
+        next_refetch_time = self._get_next_refetch_time()
+        return next_refetch_time is None or self.actual_now >= next_refetch_time
+
+    async def _async_setup(self) -> None:
+        """
+        Fetch the initial TV guide data, during the first refresh.
+
+        When loading progressively, this returns as soon as the channels are loaded,
+        so entities can be set up while the programs continue loading in the background.
+        """
+        if not self.__progressive_loading:
+            await self._refetch_tv_guide()
+            self._async_schedule_refetch_timer()
+            self._async_start_source_file_watch()
+            return
+
+        refetch_task = self._async_start_refetch()
+
+        # wait for the channels, or for the refetch to fail before that
+        channels_loaded = asyncio.ensure_future(self.__channels_loaded.wait())
+        try:
+            await asyncio.wait(
+                {refetch_task, channels_loaded}, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            channels_loaded.cancel()
+
+        if not self._is_guide_usable():
+            await self.async_shutdown()
+            raise UpdateFailed("Failed to load the initial guide data")
+
+        self._async_start_source_file_watch()
+
+    @callback
+    def _async_on_channels_loaded(self, guide: TVGuide) -> None:
+        """Publish the channels-only guide of a progressive load, while the programs are still loading."""
+        LOGGER.debug(
+            f"Loaded {len(guide.channels)} channels, programs are still loading."
+        )
+        self.__guide = guide
+        self.__guide_partial = True
+        self.__channels_loaded.set()
+        self.async_set_updated_data(guide)
+
+    def _get_priority_window(self) -> tuple[datetime, datetime]:
+        """
+        Get the time window of programs to parse first, when parsing the priority window first.
+
+        The window covers the current, upcoming and primetime programs:
+        from shortly before now until the end of today, but at least for a few hours.
+        """
+        start = self.actual_now - timedelta(seconds=PRIORITY_WINDOW_SLACK)
+        end_of_today = datetime.combine(
+            self.actual_now.date() + timedelta(days=1), time.min
+        )
+        end = max(
+            end_of_today,
+            self.current_time + timedelta(seconds=PRIORITY_WINDOW_MIN_LENGTH),
+        )
+        return start, end
+
+    @callback
+    def _async_on_priority_guide(self, guide: TVGuide) -> None:
+        """Publish the guide containing only the priority window programs, while the full guide is parsed."""
+        LOGGER.debug(
+            f"Parsed {len(guide.programs)} programs in the priority window, parsing the full guide."
+        )
+        self.__guide = guide
+        self.__guide_partial = True
+        self.async_set_updated_data(guide)
+
+    async def _async_background_refetch(self, progressive: bool = False) -> None:
+        """
+        Re-fetch TV guide data in the background, then notify listeners once.
+
+        If the re-fetch fails, it is retried with exponential backoff,
+        serving the cached data in the meantime, unless it is too stale.
+
+        :param progressive: Load progressively, publishing the channels before the programs are loaded.
+        """
+        try:
+            await self._refetch_tv_guide(
+                self._async_on_channels_loaded if progressive else None
+            )
+        except UpdateFailed as exception:
+            delay = self.__refetch_backoff.next_delay()
+            self.__next_retry_time = self.actual_now + delay
+            LOGGER.warning(
+                f"Failed to refetch guide ({self.__refetch_backoff.failures} consecutive failures), retrying in {delay}: {exception}"
+            )
+
+            if not self._is_guide_usable():
+                self.async_set_update_error(exception)
+        else:
+            self.async_set_updated_data(self.__guide)
+        finally:
+            self.__refetch_task = None
+            self._async_schedule_refetch_timer()
+
+    @callback
+    def _async_start_refetch(self) -> asyncio.Task:
+        """
+        Start a background re-fetch of the TV guide data, unless one is already running.
+
+        :return: The running re-fetch task.
+        """
+        if self.__refetch_task is not None:
+            return self.__refetch_task
+
+        # without any guide data yet, load progressively so entities are available early
+        progressive = self.__progressive_loading and self.__last_refetch_time is None
+        task = self.config_entry.async_create_background_task(
+            self.hass,
+            self._async_background_refetch(progressive),
+            name=f"{DOMAIN} refetch {self.config_entry.entry_id}",
+        )
+
+        # the task starts eagerly, and may have completed already
+        if not task.done():
+            self.__refetch_task = task
+        return task
+
+    @callback
+    def _async_schedule_refetch_timer(self) -> None:
+        """Schedule the next background re-fetch, independent of the entity refresh interval."""
+        if self.__unsub_refetch_timer is not None:
+            self.__unsub_refetch_timer()
+            self.__unsub_refetch_timer = None
+
+        next_refetch_time = self._get_next_refetch_time()
+        if next_refetch_time is None:
+            return
+
+        delay = max((next_refetch_time - self.actual_now).total_seconds(), 0)
+        self.__unsub_refetch_timer = async_call_later(
+            self.hass,
+            delay,
+            HassJob(
+                self._async_on_refetch_timer,
+                f"{DOMAIN} refetch timer",
+                cancel_on_shutdown=True,
+            ),
+        )
+
+    @callback
+    def _async_on_refetch_timer(self, _now: datetime) -> None:
+        """Handle the re-fetch timer firing."""
+        self.__unsub_refetch_timer = None
+        if self._should_refetch():
+            self._async_start_refetch()
+        else:
+            self._async_schedule_refetch_timer()
+
+    @callback
+    def _async_start_source_file_watch(self) -> None:
+        """Start watching the local guide file for changes, if enabled and the guide is read from a file."""
+        if (
+            not self.__watch_source_file
+            or not self.__client.is_file_source
+            or self.__unsub_source_file_watch is not None
+        ):
+            return
+
+        self.__unsub_source_file_watch = async_track_time_interval(
+            self.hass,
+            self._async_on_source_file_watch,
+            timedelta(seconds=SOURCE_FILE_WATCH_INTERVAL),
+            name=f"{DOMAIN} source file watch",
+            cancel_on_shutdown=True,
+        )
+
+    async def _async_on_source_file_watch(self, _now: datetime) -> None:
+        """Check the local guide file, and re-fetch it as soon as a new version was completely written."""
+        if self.__refetch_task is not None:
+            return
+
+        if await self.__client.async_check_source_changed():
+            LOGGER.debug("Guide file changed, re-fetching guide data.")
+            self._async_start_refetch()
+
+    async def async_shutdown(self) -> None:
+        """Cancel the re-fetch timer, the source file watch and any running re-fetch."""
+        if self.__unsub_refetch_timer is not None:
+            self.__unsub_refetch_timer()
+            self.__unsub_refetch_timer = None
+
+        if self.__unsub_source_file_watch is not None:
+            self.__unsub_source_file_watch()
+            self.__unsub_source_file_watch = None
+
+        if self.__refetch_task is not None:
+            self.__refetch_task.cancel()
+            self.__refetch_task = None
+
+        await super().async_shutdown()
+
+    def _is_guide_usable(self) -> bool:
+        """Check if the cached guide data can be served, or is missing or too stale."""
+        # partial guide, while the full guide is loading
+        if self.__guide_partial:
+            return True
+
         if not self.__guide or not self.__last_refetch_time:
+            return False
+
+        if self.__max_staleness is None:
             return True
 
-        # check if refetch interval has passed
-        next_refetch_time = self.__last_refetch_time + self.__refetch_interval
-        return self.actual_now >= next_refetch_time
+        return self.actual_now - self.__last_refetch_time <= self.__max_staleness
 
     async def _async_update_data(self):
-        """Update data from cache or re-fetch if cache is expired."""
+        """
+        Update data from cache, starting a background re-fetch if cache is expired.
+
+        This never waits for the re-fetch, listeners are notified once it completes.
+        """
         if self._should_refetch():
-            await self._refetch_tv_guide()
+            self._async_start_refetch()
+
+        if not self._is_guide_usable():
+            raise UpdateFailed(
+                f"Guide data is unavailable or too stale, next refetch at {self.__next_retry_time}"
+            )
 
         return self.__guide
 
@@ -148,6 +597,39 @@ class XMLTVDataUpdateCoordinator(DataUpdateCoordinator[TVGuide]):
         """Get last update time."""
         return self.__last_refetch_time
 
+    @property
+    def publish_time(self) -> time | None:
+        """Get the time of day the provider publishes its guide, as configured or learned."""
+        return self.__publish_time or self.__publish_time_estimator.publish_time
+
+    @property
+    def guide_known_until(self) -> datetime | None:
+        """Get the end of the last program in the guide, as naive local time."""
+        ends = [
+            channel.last_program.end.timestamp()
+            for channel in self.__guide.channels
+            if channel.last_program is not None
+        ]
+        if not ends:
+            return None
+
+        return datetime.fromtimestamp(max(ends))
+
+    @property
+    def guide_partial(self) -> bool:
+        """Get whether the guide is incomplete, while the full guide is still loading."""
+        return self.__guide_partial
+
+    @property
+    def next_retry_time(self) -> datetime | None:
+        """Get time of the next attempt to refetch the guide, if the last attempt failed."""
+        return self.__next_retry_time
+
+    @property
+    def last_fetch_stats(self) -> XMLTVFetchStats | None:
+        """Get timings and sizes of the last guide fetch."""
+        return self.__last_fetch_stats
+
     @property
     def enable_current_sensor(self) -> bool:
         """Get enable current sensor."""
@@ -173,6 +655,31 @@ class XMLTVDataUpdateCoordinator(DataUpdateCoordinator[TVGuide]):
         """Get enable program image entities."""
         return self.__enable_program_image
 
+    @property
+    def enable_program_list_sensor(self) -> bool:
+        """Get enable program list sensor."""
+        return self.__enable_program_list_sensor
+
+    @property
+    def program_list_size(self) -> int:
+        """Get number of programs shown by program list sensors."""
+        return self.__program_list_size
+
+    @property
+    def record_program_details(self) -> bool:
+        """Get whether bulky program sensor attributes should be recorded anyway."""
+        return self.__record_program_details
+
+    @property
+    def enable_calendar(self) -> bool:
+        """Get enable channel calendar entities."""
+        return self.__enable_calendar
+
+    @property
+    def calendar_channels(self) -> list[str]:
+        """Get IDs of channels to create calendar entities for. Empty for all channels."""
+        return self.__calendar_channels
+
     @property
     def _last_refetch_time(self) -> datetime | None:
         """Get last refetch time."""
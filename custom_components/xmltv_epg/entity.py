@@ -75,6 +75,8 @@ class XMLTVProgramEntity(XMLTVEntity):
             self._program = channel.get_next_program(self.coordinator.current_time)
         elif self._mode == ChannelSensorMode.PRIMETIME:
             self._program = channel.get_current_program(self.coordinator.primetime_time)
+        elif self._mode == ChannelSensorMode.PROGRAM_LIST:
+            self._program = channel.get_next_program(self.coordinator.current_time)
         else:
             raise ValueError(
                 f"Unsupported mode: {self._mode}. Please report this issue."
@@ -1,10 +1,11 @@
 """tvxml_epg helper functions."""
 
+import json
 from typing import Literal
 
 from custom_components.xmltv_epg.const import ChannelSensorMode
 
-from .model import TVChannel
+from .model import TVChannel, TVProgram
 
 
 def normalize_for_entity_id(s: str) -> str:
@@ -57,7 +58,8 @@ def program_get_normalized_identification(
     mode: ChannelSensorMode,
     kind: Literal["program_sensor"]
     | Literal["program_image"]
-    | Literal["channel_icon"],
+    | Literal["channel_icon"]
+    | Literal["channel_calendar"],
 ) -> tuple[str, str]:
     """
     Return normalized identification information for a sensor for the given channel and upcoming status.
@@ -86,6 +88,11 @@ def program_get_normalized_identification(
     - kind = 'channel_icon'
     => ('channel_icon', 'image.de_my_channel_1_icon')
 
+    - channel_id = "DE: My Channel 1'
+    - mode = (don't care)
+    - kind = 'channel_calendar'
+    => ('channel_calendar', 'calendar.de_my_channel_1')
+
     :param channel: The TV channel.
     :param mode: The sensor operating mode.
     :param kind: entity type to create id for
@@ -101,7 +108,70 @@ def program_get_normalized_identification(
     elif kind == "channel_icon":
         translation_key = "channel_icon"
         entity_id = f"image.{normalize_for_entity_id(channel.id)}_icon"
+    elif kind == "channel_calendar":
+        translation_key = "channel_calendar"
+        entity_id = f"calendar.{normalize_for_entity_id(channel.id)}"
     else:
         raise ValueError(f"invalid entity kind '{kind}'")
 
     return translation_key, entity_id
+
+
+def program_to_dict(program: TVProgram) -> dict:
+    """
+    Convert a program to a JSON-serializable dictionary.
+
+    Used for service responses, where only basic types are allowed.
+
+    :param program: The TV program.
+    :return: Dictionary with the program's information.
+    """
+    return {
+        "channel_id": program.channel_id,
+        "start": program.start.isoformat(),
+        "end": program.end.isoformat(),
+        "title": program.title,
+        "subtitle": program.subtitle,
+        "episode": program.episode,
+        "description": program.description,
+        "category": [c.name for c in program.categories],
+    }
+
+
+def program_list_to_attribute(
+    programs: list[TVProgram], max_bytes: int, max_title_length: int
+) -> list[dict]:
+    """
+    Convert a list of programs to a compact list for use as a state attribute.
+
+    Each entry only contains start, end and full title of the program.
+    Titles are truncated to max_title_length, and entries are dropped from the end of
+    the list until the serialized size of the list is no larger than max_bytes.
+
+    :param programs: The programs to convert, sorted by start time.
+    :param max_bytes: Maximum size of the JSON-serialized list, in bytes.
+    :param max_title_length: Maximum length of a single title.
+    :return: List of compact program dictionaries.
+    """
+    items: list[dict] = []
+    size = 2  # '[]'
+    for program in programs:
+        title = program.full_title
+        if len(title) > max_title_length:
+            title = title[: max_title_length - 1] + "…"
+
+        item = {
+            "start": program.start.isoformat(),
+            "end": program.end.isoformat(),
+            "title": title,
+        }
+
+        # + 1 for the ',' separator
+        item_size = len(json.dumps(item, ensure_ascii=False).encode()) + 1
+        if size + item_size > max_bytes:
+            break
+
+        items.append(item)
+        size += item_size
+
+    return items
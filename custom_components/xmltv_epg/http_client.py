@@ -0,0 +1,113 @@
+"""HTTP session of the integration, shared by guide fetches, image fetches and the config flow."""
+
+from __future__ import annotations
+
+import aiohttp
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.util import ssl as ssl_util
+
+from .const import DOMAIN
+from .request_limiter import RequestLimiter
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional, installed with aiohttp[speedups]
+    brotli = None
+
+DATA_SESSION = f"{DOMAIN}_session"
+DATA_LIMITER = f"{DOMAIN}_limiter"
+
+# Idle connections are kept open this long, so the next request to the same host reuses them.
+KEEPALIVE_TIMEOUT = 60  # seconds
+
+# Resolved host names are cached this long.
+DNS_CACHE_TTL = 5 * 60  # seconds
+
+# Maximum number of simultaneous connections to a single host.
+LIMIT_PER_HOST = 4
+
+# Sustained rate of requests to a single host, after a burst of RATE_LIMIT_BURST requests.
+RATE_LIMIT = 2  # requests per second
+RATE_LIMIT_BURST = 10  # requests
+
+# Maximum time to establish a connection.
+CONNECT_TIMEOUT = 30  # seconds
+
+
+def _get_accept_encoding() -> str:
+    """Get the transfer encodings aiohttp can decode."""
+    encodings = ["gzip", "deflate"]
+    if brotli is not None:
+        encodings.append("br")
+
+    return ", ".join(encodings)
+
+
+def get_timeout(total: float, read: float) -> aiohttp.ClientTimeout:
+    """
+    Get the timeouts of a request.
+
+    :param total: Maximum time of the whole request, including reading the response. 0 for no limit.
+    :param read: Maximum time waiting for the next chunk of the response. 0 for no limit.
+    """
+    return aiohttp.ClientTimeout(
+        total=total or None, sock_connect=CONNECT_TIMEOUT, sock_read=read or None
+    )
+
+
+def _create_session(hass: HomeAssistant) -> aiohttp.ClientSession:
+    """Create the session, with a connection pool tuned for repeated requests to few hosts."""
+    connector = aiohttp.TCPConnector(
+        ssl=ssl_util.get_default_context(),
+        limit_per_host=LIMIT_PER_HOST,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        enable_cleanup_closed=True,
+    )
+
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers={
+            aiohttp.hdrs.USER_AGENT: SERVER_SOFTWARE,
+            # plain xml guides can be compressed on the wire
+            aiohttp.hdrs.ACCEPT_ENCODING: _get_accept_encoding(),
+        },
+    )
+
+
+@callback
+def async_get_session(hass: HomeAssistant) -> aiohttp.ClientSession:
+    """
+    Get the session of the integration, creating it on first use.
+
+    The session is shared by all config entries, and closed when Home Assistant stops.
+    """
+    session: aiohttp.ClientSession | None = hass.data.get(DATA_SESSION)
+    if session is not None:
+        return session
+
+    session = hass.data[DATA_SESSION] = _create_session(hass)
+
+    async def _async_close(_event: Event) -> None:
+        await session.close()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close)
+    return session
+
+
+@callback
+def async_get_limiter(hass: HomeAssistant) -> RequestLimiter:
+    """
+    Get the request limiter of the integration, creating it on first use.
+
+    The limiter is shared by all config entries, so requests to the same provider are limited together.
+    """
+    limiter: RequestLimiter | None = hass.data.get(DATA_LIMITER)
+    if limiter is None:
+        limiter = hass.data[DATA_LIMITER] = RequestLimiter(
+            rate=RATE_LIMIT, burst=RATE_LIMIT_BURST, concurrency=LIMIT_PER_HOST
+        )
+
+    return limiter
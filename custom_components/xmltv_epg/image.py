@@ -4,18 +4,22 @@ from __future__ import annotations
 
 import uuid
 
+import aiohttp
 from homeassistant.components.image import (
+    Image,
     ImageEntity,
     ImageEntityDescription,
+    valid_image_content_type,
 )
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.config_entries import ConfigEntry
 
-from .const import DOMAIN, LOGGER, ChannelSensorMode
+from .const import DOMAIN, IMAGE_FETCH_TIMEOUT, LOGGER, ChannelSensorMode
 from .coordinator import XMLTVDataUpdateCoordinator
 from .entity import XMLTVEntity, XMLTVProgramEntity
 from .helper import program_get_normalized_identification
+from .http_client import async_get_limiter, async_get_session
 from .model import TVChannel, TVGuide
 
 
@@ -66,7 +70,44 @@ async def async_setup_entry(
     async_add_entities(images)
 
 
-class XMLTVChannelProgramImage(XMLTVProgramEntity, ImageEntity):
+class XMLTVImageEntity(ImageEntity):
+    """Image entity fetching images using the session of the integration, instead of a separate client."""
+
+    async def _async_load_image_from_url(self, url: str) -> Image | None:
+        """
+        Load an image by url.
+
+        Requests are rate limited per host, and entities showing the same image share a single request.
+        """
+        session = async_get_session(self.hass)
+
+        async def fetch() -> tuple[bytes, str | None]:
+            # release the connection to the pool, also on error responses
+            async with session.get(
+                url, timeout=aiohttp.ClientTimeout(total=IMAGE_FETCH_TIMEOUT)
+            ) as response:
+                response.raise_for_status()
+                return await response.read(), response.headers.get(
+                    aiohttp.hdrs.CONTENT_TYPE
+                )
+
+        try:
+            content, content_type = await async_get_limiter(self.hass).async_fetch(
+                url, fetch
+            )
+        except TimeoutError:
+            LOGGER.error(f"Timeout getting image from {url}")
+            return None
+        except aiohttp.ClientError as err:
+            LOGGER.error(f"Error getting image from {url}: {err}")
+            return None
+
+        return Image(
+            content=content, content_type=valid_image_content_type(content_type)
+        )
+
+
+class XMLTVChannelProgramImage(XMLTVProgramEntity, XMLTVImageEntity):
     """XMLTV Channel Program Image class."""
 
     def __init__(
@@ -117,7 +158,7 @@ class XMLTVChannelProgramImage(XMLTVProgramEntity, ImageEntity):
         super()._handle_coordinator_update()
 
 
-class XMLTVChannelIconImage(XMLTVEntity, ImageEntity):
+class XMLTVChannelIconImage(XMLTVEntity, XMLTVImageEntity):
     """XMLTV Channel Icon Image class."""
 
     coordinator: XMLTVDataUpdateCoordinator
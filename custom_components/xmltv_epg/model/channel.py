@@ -1,5 +1,6 @@
 """TV Channel Model Definition."""
 
+from bisect import bisect_left, bisect_right, insort
 from datetime import datetime
 from typing import Any
 
@@ -25,6 +26,8 @@ class TVChannel(BaseXmlModel, tag="channel", search_mode="ordered"):
     def model_post_init(self, __context: Any) -> None:
         """Hooks post-initialization to initialize programs field."""
         self.__programs: list[TVProgram] = []
+        self.__program_starts: list[float] | None = None
+        self.__program_max_ends: list[float] | None = None
         return super().model_post_init(__context)
 
     def _link_program(self, program: TVProgram):
@@ -36,26 +39,98 @@ class TVChannel(BaseXmlModel, tag="channel", search_mode="ordered"):
 
         :param program: Program to link to this channel.
         """
-        self.__programs.append(program)
-
         # ensure programs remain sorted by start time
-        self.__programs.sort(key=lambda p: p.start)
+        insort(self.__programs, program, key=lambda p: p.start.timestamp())
+
+        # invalidate the interval index, it is rebuilt on next query
+        self.__program_starts = None
+        self.__program_max_ends = None
+
+    def __get_interval_index(self) -> tuple[list[float], list[float]]:
+        """
+        Get the interval index over the programs of this channel.
+
+        The index consists of two arrays parallel to the (start-sorted) program list:
+        - the start timestamps of each program
+        - the running maximum of the end timestamps up to each program
+
+        Since the running maximum is monotonic, both arrays can be binary searched.
+        The index is built lazily and invalidated whenever a program is linked.
+
+        :return: (starts, max_ends) tuple.
+        """
+        if self.__program_starts is None or self.__program_max_ends is None:
+            starts: list[float] = []
+            max_ends: list[float] = []
+            max_end = float("-inf")
+            for program in self.__programs:
+                starts.append(program.start.timestamp())
+                max_end = max(max_end, program.end.timestamp())
+                max_ends.append(max_end)
+
+            self.__program_starts = starts
+            self.__program_max_ends = max_ends
+
+        return self.__program_starts, self.__program_max_ends
+
+    def get_programs(self, start: datetime, end: datetime) -> list[TVProgram]:
+        """
+        Get all programs airing in the given time window.
+
+        A program is included if it overlaps the window [start, end) at least partially.
+        Lookup is done in O(log n + k) using the interval index.
+
+        :param start: Start of the time window (inclusive).
+        :param end: End of the time window (exclusive).
+        :return: List of programs, sorted by start time.
+        """
+        starts, max_ends = self.__get_interval_index()
+        start_ts = start.timestamp()
+        end_ts = end.timestamp()
+
+        # no program before this index ends after the window start
+        first = bisect_right(max_ends, start_ts)
+
+        # no program from this index onwards starts before the window end
+        last = bisect_left(starts, end_ts, lo=first)
+
+        return [p for p in self.__programs[first:last] if p.end.timestamp() > start_ts]
 
     def get_current_program(self, time: datetime) -> TVProgram | None:
         """Get current program at given time."""
-        for program in self.__programs:
-            if program.start.timestamp() <= time.timestamp() < program.end.timestamp():
+        starts, max_ends = self.__get_interval_index()
+        ts = time.timestamp()
+
+        first = bisect_right(max_ends, ts)
+        last = bisect_right(starts, ts, lo=first)
+        for program in self.__programs[first:last]:
+            if program.end.timestamp() > ts:
                 return program
 
         return None
 
     def get_next_program(self, time: datetime) -> TVProgram | None:
         """Get next program after given time."""
-        for program in self.__programs:
-            if program.start.timestamp() >= time.timestamp():
-                return program
+        starts, _ = self.__get_interval_index()
 
-        return None
+        i = bisect_left(starts, time.timestamp())
+        if i >= len(self.__programs):
+            return None
+
+        return self.__programs[i]
+
+    def get_upcoming_programs(self, time: datetime, count: int) -> list[TVProgram]:
+        """
+        Get the next programs starting at or after the given time.
+
+        :param time: Time to get upcoming programs for.
+        :param count: Maximum number of programs to return.
+        :return: List of up to count programs, sorted by start time.
+        """
+        starts, _ = self.__get_interval_index()
+
+        i = bisect_left(starts, time.timestamp())
+        return self.__programs[i : i + count]
 
     @property
     def last_program(self) -> TVProgram | None:
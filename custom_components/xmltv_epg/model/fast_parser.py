@@ -0,0 +1,297 @@
+"""
+Fast parser building the guide models directly from the XML element tree.
+
+This bypasses the generic pydantic-xml deserialization machinery and constructs the
+models using `model_construct`, applying the same checks as the pydantic-xml path by hand:
+- items that fail validation are omitted (see parse_list_omit_on_error)
+- start and stop times use the XMLTV datetime format, and start < stop
+- release dates use one of the XMLTV date formats
+- episode numbers must be parseable in their numbering system
+
+Child elements are looked up the same way as the pydantic-xml path does in "ordered"
+search mode, so both parsers produce identical guides for the same input.
+"""
+
+from collections.abc import Callable
+from datetime import datetime
+from typing import IO, Any, TypeVar
+
+from pydantic import TypeAdapter
+from pydantic_xml.element.native import etree
+from pydantic_xml.errors import ParsingError
+
+from .category import TVProgramCategory
+from .channel import TVChannel
+from .episode_number import TVProgramEpisodeNumber
+from .guide import TVGuide
+from .image import TVImage
+from .parse_stats import record_omitted
+from .program import TVProgram
+
+TModel = TypeVar("TModel")
+
+_int_adapter = TypeAdapter(int)
+
+
+class _ElementReader:
+    """Reads the attributes and child elements of a native element, mirroring "ordered" search mode."""
+
+    def __init__(self, element: Any) -> None:
+        """Create a reader for the given native element."""
+        self.attrib: dict[str, str] = element.attrib
+        self.text: str | None = element.text or None
+
+        # skip comments and processing instructions, their tag is not a string
+        self.__children = [c for c in element if isinstance(c.tag, str)]
+        self.__next_child_idx = 0
+
+    def pop_element(self, tag: str) -> Any | None:
+        """
+        Get the next child element with the given tag, after the current position.
+
+        :param tag: Tag of the child element.
+        :return: The child element, or None if not found.
+        """
+        for idx in range(self.__next_child_idx, len(self.__children)):
+            child = self.__children[idx]
+            if child.tag == tag:
+                self.__next_child_idx = idx + 1
+                return child
+
+        return None
+
+    def pop_text(self, tag: str) -> str | None:
+        """
+        Get the text of the next child element with the given tag, after the current position.
+
+        :param tag: Tag of the child element.
+        :return: The text of the child element, or None if not found or empty.
+        """
+        child = self.pop_element(tag)
+        if child is None:
+            return None
+
+        return child.text or None
+
+    def find_elements(self, tag: str) -> list[Any]:
+        """
+        Get all child elements with the given tag, after the current position.
+
+        Unlike pop_element, this does not advance the current position.
+
+        :param tag: Tag of the child elements.
+        :return: List of matching child elements.
+        """
+        return [c for c in self.__children[self.__next_child_idx :] if c.tag == tag]
+
+
+def _set_if_present(fields: dict[str, Any], name: str, value: Any | None) -> None:
+    """Set a field value, unless it is None. Mirrors how pydantic-xml treats missing values."""
+    if value is not None:
+        fields[name] = value
+
+
+def _require(value: str | None, name: str) -> str:
+    """Ensure a required value is present."""
+    if value is None:
+        raise ValueError(f"Missing required field '{name}'")
+
+    return value
+
+
+def _parse_image(element: Any) -> TVImage:
+    """Parse a TVImage from an icon element."""
+    reader = _ElementReader(element)
+    fields: dict[str, Any] = {"url": _require(reader.attrib.get("src"), "url")}
+
+    for name in ("width", "height"):
+        value = reader.attrib.get(name)
+        if value is not None:
+            fields[name] = _int_adapter.validate_python(value)
+
+    return TVImage.model_construct(**fields)
+
+
+def _parse_category(element: Any) -> TVProgramCategory:
+    """Parse a TVProgramCategory from a category element."""
+    reader = _ElementReader(element)
+    fields: dict[str, Any] = {"name": _require(reader.text, "name")}
+    _set_if_present(fields, "language", reader.attrib.get("lang"))
+
+    return TVProgramCategory.model_construct(**fields)
+
+
+def _parse_episode_number(element: Any) -> TVProgramEpisodeNumber:
+    """Parse a TVProgramEpisodeNumber from an episode-num element."""
+    reader = _ElementReader(element)
+
+    # model_post_init parses the raw value, raising ValueError if that fails
+    return TVProgramEpisodeNumber.model_construct(
+        system=_require(reader.attrib.get("system"), "system"),
+        raw_value=_require(reader.text, "raw_value"),
+    )
+
+
+def _parse_channel(element: Any) -> TVChannel:
+    """Parse a TVChannel from a channel element."""
+    reader = _ElementReader(element)
+    fields: dict[str, Any] = {
+        "id": _require(reader.attrib.get("id"), "id"),
+        "name": _require(reader.pop_text("display-name"), "name"),
+    }
+
+    if (icon := reader.pop_element(TVImage.__xml_tag__)) is not None:
+        fields["icon"] = _parse_image(icon)
+
+    return TVChannel.model_construct(**fields)
+
+
+def _parse_program(element: Any) -> TVProgram:
+    """Parse a TVProgram from a programme element."""
+    reader = _ElementReader(element)
+    fields: dict[str, Any] = {
+        "channel_id": _require(reader.attrib.get("channel"), "channel_id"),
+        "start": TVProgram.parse_datetime(
+            _require(reader.attrib.get("start"), "start")
+        ),
+        "end": TVProgram.parse_datetime(_require(reader.attrib.get("stop"), "end")),
+        "title": _require(reader.pop_text("title"), "title"),
+    }
+    _set_if_present(fields, "subtitle", reader.pop_text("sub-title"))
+    _set_if_present(fields, "description", reader.pop_text("desc"))
+
+    if (release_date := reader.pop_text("date")) is not None:
+        fields["release_date"] = TVProgram.parse_date(release_date)
+
+    _set_if_present(fields, "language", reader.pop_text("language"))
+
+    fields["episode_raw"] = _parse_list(
+        reader.find_elements(TVProgramEpisodeNumber.__xml_tag__),
+        _parse_episode_number,
+    )
+    fields["categories"] = _parse_list(
+        reader.find_elements(TVProgramCategory.__xml_tag__), _parse_category
+    )
+
+    if (icon := reader.pop_element(TVImage.__xml_tag__)) is not None:
+        fields["image"] = _parse_image(icon)
+
+    # model_post_init validates start < end, raising ValueError if not
+    return TVProgram.model_construct(**fields)
+
+
+def _parse_list(elements: list[Any], parse_fn: Callable[[Any], TModel]) -> list[TModel]:
+    """
+    Parse a list of elements, omitting all items that fail validation.
+
+    :param elements: Elements to parse.
+    :param parse_fn: Function parsing a single element.
+    :return: List of valid items.
+    """
+    items: list[TModel] = []
+    for element in elements:
+        try:
+            items.append(parse_fn(element))
+        except ValueError:
+            record_omitted(element.tag)
+
+    return items
+
+
+def _filter_window(elements: list[Any], window: tuple[datetime, datetime]) -> list[Any]:
+    """
+    Filter programme elements to those airing in the given time window, before parsing them.
+
+    Elements with missing or invalid times are kept, so they are omitted by validation as usual.
+
+    :param elements: Programme elements to filter.
+    :param window: (start, end) of the time window. Programs overlapping it at least partially are kept.
+    :return: Filtered elements.
+    """
+    window_start = window[0].timestamp()
+    window_end = window[1].timestamp()
+
+    # most programmes share their start and stop times with others
+    timestamps: dict[str, float] = {}
+
+    def get_timestamp(value: str) -> float:
+        timestamp = timestamps.get(value)
+        if timestamp is None:
+            timestamp = timestamps[value] = TVProgram.parse_datetime(value).timestamp()
+        return timestamp
+
+    filtered = []
+    for element in elements:
+        start = element.attrib.get("start")
+        stop = element.attrib.get("stop")
+        try:
+            if (
+                start is not None
+                and stop is not None
+                and (
+                    get_timestamp(start) >= window_end
+                    or get_timestamp(stop) <= window_start
+                )
+            ):
+                continue
+        except ValueError:
+            pass
+
+        filtered.append(element)
+
+    return filtered
+
+
+def parse_guide(
+    xml: str | bytes | IO[bytes], window: tuple[datetime, datetime] | None = None
+) -> TVGuide:
+    """
+    Parse a TVGuide from XMLTV data.
+
+    This is a faster alternative to `TVGuide.from_xml`, producing an identical guide.
+
+    :param xml: XMLTV data to parse, or a file to read it from.
+    :param window: Only parse programs airing in this (start, end) time window. None to parse all programs.
+    :return: The parsed guide.
+    """
+    # model_post_init cross-links channels and programs
+    return TVGuide.model_construct(**parse_guide_fields(xml, window))
+
+
+def parse_guide_fields(
+    xml: str | bytes | IO[bytes], window: tuple[datetime, datetime] | None = None
+) -> dict[str, Any]:
+    """
+    Parse the fields of a TVGuide from XMLTV data, without constructing the guide.
+
+    Channels and programs are not cross-linked, as that happens when constructing the guide.
+
+    :param xml: XMLTV data to parse, or a file to read it from.
+    :param window: Only parse programs airing in this (start, end) time window. None to parse all programs.
+    :return: Field values of the guide, suitable for `TVGuide.model_construct`.
+    """
+    if isinstance(xml, str | bytes):
+        root = etree.fromstring(xml)
+    else:
+        root = etree.parse(xml).getroot()
+    if root.tag != TVGuide.__xml_tag__:
+        raise ParsingError(
+            f"root element not found (actual: {root.tag}, expected: {TVGuide.__xml_tag__})"
+        )
+
+    reader = _ElementReader(root)
+    fields: dict[str, Any] = {}
+    _set_if_present(fields, "source_name", reader.attrib.get("source-info-name"))
+    _set_if_present(fields, "source_url", reader.attrib.get("source-info-url"))
+    _set_if_present(fields, "generator_name", reader.attrib.get("generator-info-name"))
+    _set_if_present(fields, "generator_url", reader.attrib.get("generator-info-url"))
+
+    fields["channels"] = _parse_list(
+        reader.find_elements(TVChannel.__xml_tag__), _parse_channel
+    )
+    programs = reader.find_elements(TVProgram.__xml_tag__)
+    if window is not None:
+        programs = _filter_window(programs, window)
+    fields["programs"] = _parse_list(programs, _parse_program)
+
+    return fields
@@ -1,5 +1,7 @@
 """Module defining the TVGuide model for XMLTV EPG data."""
 
+import time
+from datetime import datetime
 from typing import Any
 
 from pydantic_xml import BaseXmlModel, attr, element, xml_field_validator
@@ -11,6 +13,7 @@ from custom_components.xmltv_epg.model.omit_on_error_validator import (
 
 
 from .channel import TVChannel
+from .parse_stats import record_link_time
 from .program import TVProgram
 
 
@@ -75,12 +78,40 @@ class TVGuide(BaseXmlModel, tag="tv", search_mode="ordered"):
 
     def model_post_init(self, __context: Any) -> None:
         """Hooks post-initialization to cross-link channels and programs."""
+        link_start = time.perf_counter()
+
+        channels_by_id = {c.id: c for c in reversed(self.channels)}
         for program in self.programs:
-            channel = self.get_channel(program.channel_id)
+            channel = channels_by_id.get(program.channel_id)
             if channel is not None:
                 channel._link_program(program)
                 program._link_channel(channel)
 
+        record_link_time(time.perf_counter() - link_start)
+
     def get_channel(self, channel_id: str) -> TVChannel | None:
         """Get channel by ID."""
         return next((c for c in self.channels if c.id == channel_id), None)
+
+    def get_programs(
+        self,
+        start: datetime,
+        end: datetime,
+        channel_ids: list[str] | None = None,
+    ) -> dict[str, list[TVProgram]]:
+        """
+        Get all programs airing in the given time window, grouped by channel.
+
+        :param start: Start of the time window (inclusive).
+        :param end: End of the time window (exclusive).
+        :param channel_ids: IDs of the channels to include. If None, all channels are included.
+        :return: Dictionary of channel ID to the list of programs (sorted by start time) on that channel.
+        """
+        if channel_ids is None:
+            channels = self.channels
+        else:
+            channels = [
+                c for c in (self.get_channel(i) for i in channel_ids) if c is not None
+            ]
+
+        return {c.id: c.get_programs(start, end) for c in channels}
@@ -1,12 +1,24 @@
-"""Module providing validator utilities to omit items from lists on parsing errors."""
+"""
+Module providing validator utilities to omit items from lists on parsing errors.
 
-import contextlib
+Items are parsed in place, using internals of pydantic-xml that are not part of its public API.
+Whether these still work as expected is checked once, using small probe models. If they do not
+(e.g. after a pydantic-xml update), items are parsed using the public API instead, which is slower.
+"""
+
+import logging
+from functools import cache
 from typing import TypeVar
 
 from pydantic_core import ValidationError
-from pydantic_xml import BaseXmlModel
+from pydantic_xml import BaseXmlModel, element, xml_field_validator
+from pydantic_xml.element import XmlElement
 from pydantic_xml.element.element import SearchMode, XmlElementReader
 
+from .parse_stats import collect_parse_stats, record_omitted
+
+_LOGGER = logging.getLogger(__name__)
+
 TModel = TypeVar("TModel", bound=BaseXmlModel)
 
 
@@ -33,15 +45,60 @@ def parse_list_omit_on_error(
     :param search_mode: Search mode to use when looking for child elements.
     :return: List of valid items.
     """
-    # Create snapshot to avoid modifying the original element
-    # this could cause other validators to miss elements
-    element = element.create_snapshot()
-
     # validate model tag is set
     tag = model.__xml_tag__
     if tag is None:
         raise ValueError("Tag must be provided if model has no xml tag defined.")
 
+    if _in_place_parsing_supported():
+        return _parse_list_in_place(element, model, tag, search_mode)
+
+    return _parse_list_public(element, model, tag, search_mode)
+
+
+def _parse_list_in_place(
+    element: XmlElementReader,
+    model: type[TModel],
+    tag: str,
+    search_mode: SearchMode,
+) -> list[TModel]:
+    """Parse a list of items in place, using pydantic-xml internals."""
+    # Searching for child elements advances the search position of the element.
+    # Restore it when done, as other validators could otherwise miss elements.
+    # In ordered search mode, restoring the position is enough, so avoid copying
+    # the whole element (and all its children) into a snapshot.
+    if search_mode == "ordered" and isinstance(element, XmlElement):
+        position = element._state.next_element_idx
+        try:
+            return _parse_children(element, model, tag, search_mode)
+        finally:
+            element._state.next_element_idx = position
+
+    return _parse_children(element.create_snapshot(), model, tag, search_mode)
+
+
+def _parse_children(
+    element: XmlElementReader,
+    model: type[TModel],
+    tag: str,
+    search_mode: SearchMode,
+) -> list[TModel]:
+    """
+    Parse all child elements with the given tag, omitting all items that fail validation.
+
+    The child elements are deserialized in place, without converting them back to native
+    xml elements first. This consumes the child elements.
+
+    :param element: Input XML element reader.
+    :param model: Model type of the list items.
+    :param tag: Tag of the child elements.
+    :param search_mode: Search mode to use when looking for child elements.
+    :return: List of valid items.
+    """
+    serializer = model.__xml_serializer__
+    if serializer is None:
+        raise ValueError(f"Model {model.__name__} is partially initialized.")
+
     # Iterate over all elements, collecting only valid ones
     items = []
     while True:
@@ -49,7 +106,92 @@ def parse_list_omit_on_error(
         if child is None:
             break
 
-        with contextlib.suppress(ValidationError):
+        try:
+            item = serializer.deserialize(
+                child,
+                context=None,
+                sourcemap={},
+                loc=(),
+                empty_as_string=False,
+            )
+        except ValidationError:
+            record_omitted(tag)
+        else:
+            if item is not None:
+                items.append(item)
+
+    return items
+
+
+def _parse_list_public(
+    element: XmlElementReader,
+    model: type[TModel],
+    tag: str,
+    search_mode: SearchMode,
+) -> list[TModel]:
+    """
+    Parse a list of items using the public API of pydantic-xml only.
+
+    Each child element is converted back to a native element and parsed again,
+    in a snapshot of the element, so other validators do not miss elements.
+    """
+    element = element.create_snapshot()
+
+    # Iterate over all elements, collecting only valid ones
+    items = []
+    while True:
+        child = element.pop_element(tag=tag, search_mode=search_mode)
+        if child is None:
+            break
+
+        try:
             items.append(model.from_xml_tree(child.to_native()))
+        except ValidationError:
+            record_omitted(tag)
 
     return items
+
+
+class _ProbeItem(BaseXmlModel, tag="item"):
+    """Item of the probe model."""
+
+    value: int
+
+
+class _Probe(BaseXmlModel, tag="probe", search_mode="ordered"):
+    """Model to check parsing in place works, mirroring how the guide models use it."""
+
+    items: list[_ProbeItem] = element(tag="item", default_factory=list)
+    footer: str = element(tag="footer")
+
+    @xml_field_validator("items")
+    @classmethod
+    def _parse_items(cls, element: XmlElementReader, field_name: str) -> list:
+        """Parse the items in place."""
+        return _parse_list_in_place(element, _ProbeItem, "item", "ordered")
+
+
+@cache
+def _in_place_parsing_supported() -> bool:
+    """Check the pydantic-xml internals used to parse items in place work as expected."""
+    try:
+        # probed items are not counted as omitted by a caller collecting statistics
+        with collect_parse_stats() as stats:
+            probe = _Probe.from_xml(
+                "<probe><item>1</item><item>x</item><footer>end</footer><item>2</item></probe>"
+            )
+        supported = (
+            [i.value for i in probe.items] == [1, 2]
+            and probe.footer == "end"
+            and stats.omitted == {"item": 1}
+        )
+    except Exception:  # pylint: disable=broad-except
+        _LOGGER.debug("Parsing in place failed", exc_info=True)
+        supported = False
+
+    if not supported:
+        _LOGGER.warning(
+            "The installed pydantic-xml version is not supported for fast parsing of guide data, parsing will be slower"
+        )
+
+    return supported
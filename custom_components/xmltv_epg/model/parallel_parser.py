@@ -0,0 +1,186 @@
+"""
+Parallel parser, parsing XMLTV data in shards across multiple processes.
+
+The document is split into shards at <programme> boundaries. Each shard is wrapped
+into the original prolog and root element, so it is a valid XMLTV document by itself.
+The shards are parsed in a process pool, and the resulting channels and programs are
+merged in document order, so the merged guide is identical to parsing the whole
+document at once. Channels and programs are cross-linked once, after merging.
+
+If the document cannot be split (e.g. it is too small, or not ASCII-compatible),
+or a shard fails to parse, the whole document is parsed serially instead.
+"""
+
+import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import pairwise
+
+from pydantic_xml.element.native import XmlElement, etree
+
+from ..process_pool import get_mp_context
+from .channel import TVChannel
+from .fast_parser import parse_guide, parse_guide_fields
+from .guide import TVGuide
+from .omit_on_error_validator import parse_list_omit_on_error
+from .parse_stats import collect_parse_stats, record_omitted
+from .program import TVProgram
+
+# Documents smaller than this are always parsed serially, as starting the workers costs more than it saves.
+MIN_PARALLEL_SIZE = 1024 * 1024  # bytes
+
+_ROOT_START = re.compile(rb"<tv[\s>/]")
+_ROOT_END = b"</tv"
+_PROGRAMME_START = re.compile(rb"<programme[\s>]")
+
+
+def _find_tag_end(xml: bytes, start: int) -> int | None:
+    """
+    Find the end of the tag starting at the given position, skipping over quoted attribute values.
+
+    :param xml: XML data.
+    :param start: Position of the '<' of the tag.
+    :return: Position after the closing '>', or None if the tag is not closed.
+    """
+    quote: int | None = None
+    for i in range(start, len(xml)):
+        c = xml[i]
+        if quote is not None:
+            if c == quote:
+                quote = None
+        elif c in b"\"'":
+            quote = c
+        elif c == ord(">"):
+            return i + 1
+
+    return None
+
+
+def split_shards(xml: bytes, count: int) -> tuple[bytes, list[bytes]] | None:
+    """
+    Split XMLTV data into shards at <programme> boundaries.
+
+    :param xml: XMLTV data to split.
+    :param count: Maximum number of shards to split into.
+    :return: (header, shards) tuple, or None if the data cannot be split.
+             header is everything up to and including the root start tag.
+             shards are the contents of the root element, without the header and root end tag.
+    """
+    root = _ROOT_START.search(xml)
+    if root is None:
+        return None
+
+    header_end = _find_tag_end(xml, root.start())
+    body_end = xml.rfind(_ROOT_END)
+    if header_end is None or body_end < header_end:
+        return None
+
+    boundaries = [header_end]
+    for i in range(1, count):
+        target = header_end + (body_end - header_end) * i // count
+        if target < boundaries[-1]:
+            continue
+
+        boundary = _PROGRAMME_START.search(xml, target, body_end)
+        if boundary is None:
+            break
+
+        if boundary.start() > boundaries[-1]:
+            boundaries.append(boundary.start())
+
+    boundaries.append(body_end)
+    return xml[:header_end], [xml[a:b] for a, b in pairwise(boundaries)]
+
+
+def _parse_shard(
+    xml: bytes, fast_parser: bool
+) -> tuple[list[TVChannel], list[TVProgram], dict[str, int]] | None:
+    """
+    Parse the channels and programs of a single shard, without cross-linking them.
+
+    Runs in a worker process.
+
+    :param xml: Shard, as a complete XMLTV document.
+    :param fast_parser: Use the fast parser instead of pydantic-xml.
+    :return: (channels, programs, omitted) tuple, or None if the shard is not well-formed.
+    """
+    try:
+        with collect_parse_stats() as stats:
+            if fast_parser:
+                fields = parse_guide_fields(xml)
+                channels = fields["channels"]
+                programs = fields["programs"]
+            else:
+                root = XmlElement.from_native(etree.fromstring(xml))
+                channels = parse_list_omit_on_error(root, TVChannel, "ordered")
+                programs = parse_list_omit_on_error(root, TVProgram, "ordered")
+    except etree.ParseError:
+        return None
+
+    return channels, programs, stats.omitted
+
+
+def _parse_serial(xml: bytes, fast_parser: bool) -> TVGuide:
+    """Parse the whole document in the current process."""
+    return parse_guide(xml) if fast_parser else TVGuide.from_xml(xml)
+
+
+def parse_guide_parallel(
+    xml: bytes,
+    workers: int,
+    fast_parser: bool = False,
+    min_size: int = MIN_PARALLEL_SIZE,
+) -> TVGuide:
+    """
+    Parse a TVGuide from XMLTV data, using multiple worker processes.
+
+    :param xml: XMLTV data to parse.
+    :param workers: Number of worker processes to use.
+    :param fast_parser: Use the fast parser instead of pydantic-xml in the workers.
+    :param min_size: Minimum size of the data to parse in parallel, smaller data is parsed serially.
+    :return: The parsed guide, identical to parsing the data serially.
+    """
+    if workers <= 1 or len(xml) < min_size:
+        return _parse_serial(xml, fast_parser)
+
+    split = split_shards(xml, workers)
+    if split is None or len(split[1]) <= 1:
+        return _parse_serial(xml, fast_parser)
+
+    header, shards = split
+    root_end = b"</" + TVGuide.__xml_tag__.encode() + b">"
+
+    # root element attributes
+    guide_fields = TVGuide.from_xml(header + root_end).model_dump(
+        exclude_unset=True, exclude={"channels", "programs"}
+    )
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=len(shards), mp_context=get_mp_context()
+        ) as executor:
+            results = list(
+                executor.map(
+                    _parse_shard,
+                    [header + shard + root_end for shard in shards],
+                    [fast_parser] * len(shards),
+                )
+            )
+    except BrokenProcessPool, OSError:
+        return _parse_serial(xml, fast_parser)
+
+    channels: list[TVChannel] = []
+    programs: list[TVProgram] = []
+    for result in results:
+        if result is None:
+            # let the serial parser report the error, if the document really is not well-formed
+            return _parse_serial(xml, fast_parser)
+
+        shard_channels, shard_programs, omitted = result
+        channels.extend(shard_channels)
+        programs.extend(shard_programs)
+        for tag, count in omitted.items():
+            record_omitted(tag, count)
+
+    # model_post_init cross-links channels and programs
+    return TVGuide.model_construct(**guide_fields, channels=channels, programs=programs)
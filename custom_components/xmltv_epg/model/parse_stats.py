@@ -0,0 +1,58 @@
+"""Module providing collection of statistics while parsing XMLTV data."""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+
+@dataclass
+class ParseStats:
+    """Statistics collected while parsing a TV guide."""
+
+    omitted: dict[str, int] = field(default_factory=dict)
+    """Number of items omitted due to validation errors, by xml tag."""
+
+    link_time: float = 0.0
+    """Time spent cross-linking channels and programs, in seconds."""
+
+
+_current_stats: ContextVar[ParseStats | None] = ContextVar(
+    "xmltv_epg_parse_stats", default=None
+)
+
+
+@contextmanager
+def collect_parse_stats() -> Iterator[ParseStats]:
+    """
+    Collect parsing statistics for all parsing done inside the context.
+
+    Example usage:
+    .. code-block:: python
+     with collect_parse_stats() as stats:
+       guide = TVGuide.from_xml(xml)
+
+     print(stats.omitted.get("programme", 0))
+
+    :return: Statistics object that is updated while parsing.
+    """
+    stats = ParseStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def record_omitted(tag: str, count: int = 1) -> None:
+    """Record that items with the given tag were omitted. No-op outside of collect_parse_stats."""
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.omitted[tag] = stats.omitted.get(tag, 0) + count
+
+
+def record_link_time(seconds: float) -> None:
+    """Record time spent linking channels and programs. No-op outside of collect_parse_stats."""
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.link_time += seconds
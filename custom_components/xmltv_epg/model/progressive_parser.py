@@ -0,0 +1,117 @@
+"""
+Progressive parser, parsing XMLTV data incrementally as it is received.
+
+XMLTV documents list all <channel> elements before the <programme> elements, so the
+channels are available long before the whole document is received. This parser makes
+them available as a channels-only guide, while the programs are still streaming in.
+
+Elements are parsed using the fast parser as soon as they are complete, and are then
+dropped from the element tree, so the whole tree is never held in memory.
+The final guide is identical to parsing the whole document using the fast parser.
+"""
+
+from typing import Any
+
+from pydantic_xml.element.native import etree
+from pydantic_xml.errors import ParsingError
+
+from .channel import TVChannel
+from .fast_parser import _parse_channel, _parse_list, _parse_program
+from .guide import TVGuide
+from .program import TVProgram
+
+
+class ProgressiveGuideParser:
+    """Parses a TVGuide from XMLTV data fed in chunks."""
+
+    def __init__(self) -> None:
+        """Create a parser for a single document."""
+        self.__parser = etree.XMLPullParser(events=("start", "end"))
+        self.__root: Any = None
+        self.__depth = 0
+        self.__fields: dict[str, Any] = {}
+        self.__channels: list[TVChannel] = []
+        self.__programs: list[TVProgram] = []
+        self.__channels_complete = False
+
+    @property
+    def channels_complete(self) -> bool:
+        """Whether all channels were parsed, i.e. the first program or the end of the document was reached."""
+        return self.__channels_complete
+
+    def feed(self, data: bytes) -> None:
+        """
+        Feed the next chunk of XMLTV data.
+
+        :param data: Next chunk of the document.
+        """
+        self.__parser.feed(data)
+        self.__read_events()
+
+    def get_channels_guide(self) -> TVGuide:
+        """
+        Get a guide containing the channels parsed so far, without any programs.
+
+        The channels are the same objects as in the final guide, programs are linked to them once it is complete.
+        """
+        return TVGuide.model_construct(
+            **self.__fields, channels=list(self.__channels), programs=[]
+        )
+
+    def close(self) -> TVGuide:
+        """
+        Finish parsing the document.
+
+        :return: The parsed guide.
+        """
+        self.__parser.close()
+        self.__read_events()
+        if self.__root is None:
+            raise ParsingError("root element not found")
+
+        # model_post_init cross-links channels and programs
+        return TVGuide.model_construct(
+            **self.__fields, channels=self.__channels, programs=self.__programs
+        )
+
+    def __read_events(self) -> None:
+        """Parse the elements completed by the data fed so far."""
+        for event, element in self.__parser.read_events():
+            if event == "start":
+                self.__depth += 1
+                if self.__root is None:
+                    self.__read_root(element)
+                elif self.__depth == 2 and element.tag == TVProgram.__xml_tag__:
+                    # channels are listed before programs
+                    self.__channels_complete = True
+                continue
+
+            self.__depth -= 1
+            if self.__depth == 0:
+                self.__channels_complete = True
+            elif self.__depth == 1:
+                if element.tag == TVChannel.__xml_tag__:
+                    self.__channels.extend(_parse_list([element], _parse_channel))
+                elif element.tag == TVProgram.__xml_tag__:
+                    self.__programs.extend(_parse_list([element], _parse_program))
+
+                # drop the parsed element, keeping the tree small
+                self.__root.remove(element)
+
+    def __read_root(self, element: Any) -> None:
+        """Read the attributes of the root element."""
+        if element.tag != TVGuide.__xml_tag__:
+            raise ParsingError(
+                f"root element not found (actual: {element.tag}, expected: {TVGuide.__xml_tag__})"
+            )
+
+        self.__root = element
+        for name, attribute in (
+            ("source_name", "source-info-name"),
+            ("source_url", "source-info-url"),
+            ("generator_name", "generator-info-name"),
+            ("generator_url", "generator-info-url"),
+        ):
+            value = element.get(attribute)
+            if value is not None:
+                self.__fields[name] = value
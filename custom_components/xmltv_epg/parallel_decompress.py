@@ -0,0 +1,343 @@
+"""
+Parallel decompressor, decompressing gzip and xz content in segments across multiple processes.
+
+Some compressors write content as multiple independently decompressible parts:
+- gzip content may consist of multiple concatenated members (e.g. written by bgzip,
+  or concatenated .gz files). Member boundaries are not recorded anywhere, so the
+  content is split at candidate member headers. Candidates are checked by inflating
+  the start of the member, and segments are verified again while decompressing.
+- xz content written by multi-threaded compressors (`xz -T`) consists of multiple blocks,
+  whose sizes are recorded in the stream index. Each block is rewrapped into a standalone
+  single-block xz stream.
+
+The segments are decompressed in a process pool and the outputs are returned in order,
+so they are identical to decompressing the whole content at once.
+
+If the content cannot be split (e.g. it is too small, or a single member or block),
+or a segment turns out not to be made up of whole members, the content is decompressed serially instead.
+"""
+
+import gzip
+import lzma
+import re
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import pairwise
+
+from .process_pool import get_mp_context
+
+# Content smaller than this is always decompressed serially, as starting the workers costs more than it saves.
+MIN_PARALLEL_SIZE = 1024 * 1024  # bytes
+
+# Content formats that can be decompressed in parallel.
+PARALLEL_FORMATS = ("gzip", "xz")
+
+# gzip magic bytes, deflate compression method and flags without reserved bits
+_GZIP_MEMBER_START = re.compile(rb"\x1f\x8b\x08[\x00-\x1f]")
+
+# Amount of content inflated from a candidate member header, to check it starts a member
+_GZIP_PROBE_SIZE = 4 * 1024  # bytes
+
+_XZ_HEADER_MAGIC = b"\xfd7zXZ\x00"
+_XZ_FOOTER_MAGIC = b"YZ"
+_XZ_HEADER_SIZE = 12
+_XZ_FOOTER_SIZE = 12
+
+
+def _is_gzip_member(data: bytes, pos: int) -> bool:
+    """
+    Check whether a gzip member starts at the given position, by inflating its start.
+
+    Header bytes occurring inside compressed data are almost always followed by
+    an invalid header or deflate stream, which is detected within a few KB.
+    """
+    decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+    try:
+        decompressor.decompress(memoryview(data)[pos : pos + _GZIP_PROBE_SIZE])
+    except zlib.error:
+        return False
+
+    return True
+
+
+def split_gzip_members(data: bytes, count: int) -> list[bytes] | None:
+    """
+    Split gzip content into segments starting at member headers.
+
+    Candidate member headers are checked by inflating the start of the member.
+    A candidate can still pass the check by chance, so the segments are not guaranteed
+    to consist of whole members. This is verified while decompressing them.
+
+    :param data: gzip content to split.
+    :param count: Maximum number of segments to split into.
+    :return: List of segments, or None if the content cannot be split.
+    """
+    if _GZIP_MEMBER_START.match(data) is None:
+        return None
+
+    boundaries = [0]
+    for i in range(1, count):
+        target = len(data) * i // count
+        if target < boundaries[-1]:
+            continue
+
+        boundary = _GZIP_MEMBER_START.search(data, target)
+        while boundary is not None and not _is_gzip_member(data, boundary.start()):
+            boundary = _GZIP_MEMBER_START.search(data, boundary.start() + 1)
+        if boundary is None:
+            break
+
+        if boundary.start() > boundaries[-1]:
+            boundaries.append(boundary.start())
+
+    boundaries.append(len(data))
+    return [data[a:b] for a, b in pairwise(boundaries)]
+
+
+def _read_xz_integer(data: bytes, pos: int) -> tuple[int, int]:
+    """
+    Read a variable-length integer of the xz format.
+
+    :return: (value, position after the integer) tuple.
+    """
+    value = 0
+    for i in range(9):
+        byte = data[pos + i]
+        value |= (byte & 0x7F) << (7 * i)
+        if not byte & 0x80:
+            return value, pos + i + 1
+
+    raise ValueError("Invalid xz integer")
+
+
+def _encode_xz_integer(value: int) -> bytes:
+    """Encode a variable-length integer of the xz format."""
+    encoded = bytearray()
+    while value >= 0x80:
+        encoded.append(value & 0x7F | 0x80)
+        value >>= 7
+    encoded.append(value)
+
+    return bytes(encoded)
+
+
+def _build_xz_stream(
+    header: bytes, block: bytes, unpadded_size: int, uncompressed_size: int
+) -> bytes:
+    """
+    Wrap a single block into a standalone xz stream.
+
+    :param header: Stream header of the stream the block was read from, declaring the check type.
+    :param block: The block, including its padding.
+    :param unpadded_size: Unpadded size of the block, as recorded in the index.
+    :param uncompressed_size: Uncompressed size of the block, as recorded in the index.
+    """
+    index = (
+        b"\x00"
+        + _encode_xz_integer(1)
+        + _encode_xz_integer(unpadded_size)
+        + _encode_xz_integer(uncompressed_size)
+    )
+    index += b"\x00" * (-len(index) % 4)
+    index += struct.pack("<I", zlib.crc32(index))
+
+    # backward size and stream flags, followed by the footer magic
+    backward = struct.pack("<I", len(index) // 4 - 1) + header[6:8]
+    footer = struct.pack("<I", zlib.crc32(backward)) + backward + _XZ_FOOTER_MAGIC
+
+    return header + block + index + footer
+
+
+def _read_xz_stream(data: bytes, end: int) -> tuple[int, list[bytes]]:
+    """
+    Read the blocks of the xz stream ending at the given position, using its index.
+
+    :param data: xz content.
+    :param end: Position after the stream footer.
+    :return: (start of the stream, blocks) tuple. Blocks are wrapped into standalone streams.
+    """
+    footer = data[end - _XZ_FOOTER_SIZE : end]
+    if len(footer) != _XZ_FOOTER_SIZE or footer[10:] != _XZ_FOOTER_MAGIC:
+        raise ValueError("xz stream footer not found")
+    crc, backward_size = struct.unpack_from("<II", footer)
+    if zlib.crc32(footer[4:10]) != crc:
+        raise ValueError("xz stream footer is corrupt")
+
+    index_end = end - _XZ_FOOTER_SIZE
+    index_start = index_end - (backward_size + 1) * 4
+    index = data[max(index_start, 0) : index_end]
+    if (
+        index_start < 0
+        or index[0] != 0
+        or zlib.crc32(index[:-4]) != struct.unpack_from("<I", index, len(index) - 4)[0]
+    ):
+        raise ValueError("xz stream index is corrupt")
+
+    record_count, pos = _read_xz_integer(index, 1)
+    records = []
+    for _ in range(record_count):
+        unpadded_size, pos = _read_xz_integer(index, pos)
+        uncompressed_size, pos = _read_xz_integer(index, pos)
+        records.append((unpadded_size, uncompressed_size))
+
+    start = (
+        index_start
+        - sum((unpadded_size + 3) & ~3 for unpadded_size, _ in records)
+        - _XZ_HEADER_SIZE
+    )
+    header = data[max(start, 0) : start + _XZ_HEADER_SIZE]
+    if (
+        start < 0
+        or not header.startswith(_XZ_HEADER_MAGIC)
+        or header[6:8] != footer[8:10]
+        or zlib.crc32(header[6:8]) != struct.unpack_from("<I", header, 8)[0]
+    ):
+        raise ValueError("xz stream header not found")
+
+    blocks = []
+    pos = start + _XZ_HEADER_SIZE
+    for unpadded_size, uncompressed_size in records:
+        padded_size = (unpadded_size + 3) & ~3
+        blocks.append(
+            _build_xz_stream(
+                header, data[pos : pos + padded_size], unpadded_size, uncompressed_size
+            )
+        )
+        pos += padded_size
+
+    return start, blocks
+
+
+def split_xz_blocks(data: bytes, count: int) -> list[bytes] | None:
+    """
+    Split xz content into segments of whole blocks, each a sequence of standalone xz streams.
+
+    :param data: xz content to split. May consist of multiple concatenated streams.
+    :param count: Maximum number of segments to split into.
+    :return: List of segments, or None if the content cannot be split.
+    """
+    if not data.startswith(_XZ_HEADER_MAGIC):
+        return None
+
+    # streams are located from the end, using their footers and indexes
+    streams: list[list[bytes]] = []
+    end = len(data)
+    try:
+        while end > 0:
+            # streams may be followed by padding
+            while end >= 4 and data[end - 4 : end] == b"\x00" * 4:
+                end -= 4
+
+            end, blocks = _read_xz_stream(data, end)
+            streams.append(blocks)
+    except ValueError, IndexError, struct.error:
+        return None
+
+    blocks = [block for stream in reversed(streams) for block in stream]
+    if len(blocks) <= 1:
+        return None
+
+    # group consecutive blocks into segments of similar size
+    segments: list[bytes] = []
+    total = sum(len(block) for block in blocks)
+    size = 0
+    group: list[bytes] = []
+    for block in blocks:
+        group.append(block)
+        size += len(block)
+        if size >= total * (len(segments) + 1) // count:
+            segments.append(b"".join(group))
+            group = []
+    if group:
+        segments.append(b"".join(group))
+
+    return segments
+
+
+def _decompress_serial(data: bytes, content_format: str) -> bytes:
+    """Decompress the whole content in the current process."""
+    if content_format == "gzip":
+        return gzip.decompress(data)
+
+    return lzma.decompress(data)
+
+
+def _decompress_segment(data: bytes, content_format: str) -> bytes | None:
+    """
+    Decompress a single segment, verifying it consists of whole members or streams.
+
+    Runs in a worker process.
+
+    :param data: Segment to decompress.
+    :param content_format: "gzip" or "xz".
+    :return: Decompressed segment, or None if it does not consist of whole members or streams.
+    """
+    output = []
+    try:
+        while data:
+            if content_format == "gzip":
+                decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+            else:
+                decompressor = lzma.LZMADecompressor(format=lzma.FORMAT_XZ)
+            output.append(decompressor.decompress(data))
+            if not decompressor.eof:
+                return None
+
+            # members may be padded with NUL bytes
+            data = decompressor.unused_data.lstrip(b"\x00")
+    except zlib.error, lzma.LZMAError, EOFError:
+        return None
+
+    return b"".join(output)
+
+
+def decompress_parallel(
+    data: bytes,
+    content_format: str,
+    workers: int,
+    min_size: int = MIN_PARALLEL_SIZE,
+) -> list[bytes]:
+    """
+    Decompress gzip or xz content, using multiple worker processes.
+
+    :param data: Compressed content.
+    :param content_format: "gzip" or "xz".
+    :param workers: Number of worker processes to use.
+    :param min_size: Minimum size of the content to decompress in parallel, smaller content is decompressed serially.
+    :return: Decompressed parts, in order. Joined, they are identical to decompressing the content serially.
+    """
+    if workers <= 1 or len(data) < min_size:
+        return [_decompress_serial(data, content_format)]
+
+    if content_format == "gzip":
+        segments = split_gzip_members(data, workers)
+    else:
+        segments = split_xz_blocks(data, workers)
+    if segments is None or len(segments) <= 1:
+        return [_decompress_serial(data, content_format)]
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=len(segments), mp_context=get_mp_context()
+        ) as executor:
+            results = list(
+                executor.map(
+                    _decompress_segment,
+                    segments,
+                    [content_format] * len(segments),
+                )
+            )
+    except BrokenProcessPool, OSError:
+        return [_decompress_serial(data, content_format)]
+
+    parts = []
+    for result in results:
+        if result is None:
+            # split inside a member, or let the serial decompressor report the error
+            return [_decompress_serial(data, content_format)]
+
+        parts.append(result)
+
+    return parts
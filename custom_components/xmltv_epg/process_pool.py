@@ -0,0 +1,13 @@
+"""Helpers for the process pools guides are parsed and decompressed in."""
+
+import multiprocessing
+from typing import Any
+
+
+def get_mp_context() -> Any:
+    """Get the multiprocessing context to create worker processes with."""
+    # avoid forking the (multi-threaded) parent process
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+
+    return multiprocessing.get_context("spawn")
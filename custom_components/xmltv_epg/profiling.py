@@ -0,0 +1,104 @@
+"""Opt-in profiling instrumentation for xmltv_epg."""
+
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import os
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime
+from logging import Logger
+
+
+class XMLTVProfiler:
+    """
+    Instrumentation of the fetch, decode, parse and entity update phases.
+
+    When enabled, spans log their duration to the debug log.
+    If dumping is enabled too, profiling sessions additionally run cProfile and
+    write the collected statistics as a pstats file to the dump directory.
+    These can be inspected with e.g. 'python -m pstats <file>' or snakeviz.
+
+    Note that cProfile profiles the whole event loop thread, so the statistics
+    also contain other work that ran concurrently to the profiled session.
+    """
+
+    enabled: bool
+    """Whether spans are measured and logged."""
+
+    dump_stats: bool
+    """Whether profiling sessions are recorded with cProfile and written to dump_dir."""
+
+    def __init__(
+        self,
+        logger: Logger,
+        enabled: bool = False,
+        dump_stats: bool = False,
+        dump_dir: str | None = None,
+    ) -> None:
+        """
+        Initialize the profiler.
+
+        :param logger: Logger to write span timings to.
+        :param enabled: Whether spans are measured and logged.
+        :param dump_stats: Whether to record profiling sessions with cProfile.
+        :param dump_dir: Directory to write pstats files to. Required for dump_stats.
+        """
+        self.__logger = logger
+        self.__dump_dir = dump_dir
+        self.enabled = enabled
+        self.dump_stats = dump_stats
+
+    def record(self, name: str, seconds: float) -> None:
+        """Record a span that was measured elsewhere."""
+        if self.enabled:
+            self.__logger.debug("[profile] %s took %.3f s", name, seconds)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Measure the time spent inside the context."""
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    @asynccontextmanager
+    async def session(self, name: str) -> AsyncIterator[None]:
+        """
+        Measure the time spent inside the context, recording it with cProfile if enabled.
+
+        :param name: Name of the session, used as span name and file name prefix.
+        """
+        if not self.enabled or not self.dump_stats or self.__dump_dir is None:
+            with self.span(name):
+                yield
+            return
+
+        profile = cProfile.Profile()
+        with self.span(name):
+            profile.enable()
+            try:
+                yield
+            finally:
+                profile.disable()
+
+        path = os.path.join(
+            self.__dump_dir, f"{name}_{datetime.now():%Y%m%d_%H%M%S}.pstats"
+        )
+        await asyncio.get_running_loop().run_in_executor(
+            None, self.__write_stats, profile, path
+        )
+        self.__logger.debug("[profile] wrote %s statistics to %s", name, path)
+
+    @staticmethod
+    def __write_stats(profile: cProfile.Profile, path: str) -> None:
+        """Write profiling statistics to a file."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        profile.dump_stats(path)
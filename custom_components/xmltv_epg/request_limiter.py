@@ -0,0 +1,159 @@
+"""Rate and concurrency limiting of outbound requests, per host."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import Any, TypeVar
+from urllib.parse import urlparse
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """Token bucket, allowing bursts of requests up to its capacity, and a sustained rate afterwards."""
+
+    __rate: float
+    __capacity: float
+    __clock: Callable[[], float]
+    __tokens: float
+    __updated: float
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initialize a full bucket.
+
+        :param rate: Tokens added per second.
+        :param capacity: Maximum number of tokens, i.e. the size of bursts.
+        :param clock: Monotonic clock returning seconds.
+        """
+        self.__rate = rate
+        self.__capacity = capacity
+        self.__clock = clock
+        self.__tokens = capacity
+        self.__updated = clock()
+
+    def reserve(self) -> float:
+        """
+        Take a token, reserving it in advance if the bucket is empty.
+
+        Reservations are served in order, so waiting requests are not starved by later ones.
+
+        :return: Seconds to wait until the token is available, 0 if it is available now.
+        """
+        now = self.__clock()
+        self.__tokens = min(
+            self.__capacity, self.__tokens + (now - self.__updated) * self.__rate
+        )
+        self.__updated = now
+
+        self.__tokens -= 1
+        if self.__tokens >= 0:
+            return 0.0
+
+        return -self.__tokens / self.__rate
+
+
+class _HostLimit:
+    """Rate and concurrency limit of a single host."""
+
+    def __init__(
+        self, rate: float, burst: int, concurrency: int, clock: Callable[[], float]
+    ) -> None:
+        """Initialize."""
+        self.bucket = TokenBucket(rate, burst, clock)
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+
+class RequestLimiter:
+    """
+    Limits the rate and concurrency of requests per host, and coalesces identical requests.
+
+    Shared by all clients of the integration, so requests of multiple config entries
+    and entities to the same provider are limited together.
+    """
+
+    __rate: float
+    __burst: int
+    __concurrency: int
+    __clock: Callable[[], float]
+    __hosts: dict[str, _HostLimit]
+    __pending: dict[str, asyncio.Task[Any]]
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        concurrency: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initialize.
+
+        :param rate: Sustained number of requests per second, per host.
+        :param burst: Number of requests per host that may be sent at once, before the rate applies.
+        :param concurrency: Maximum number of requests per host in progress at the same time.
+        :param clock: Monotonic clock returning seconds.
+        """
+        self.__rate = rate
+        self.__burst = burst
+        self.__concurrency = concurrency
+        self.__clock = clock
+        self.__hosts = {}
+        self.__pending = {}
+
+    def __get_host_limit(self, url: str) -> _HostLimit:
+        """Get the limit of the host of the url."""
+        host = urlparse(url).netloc.lower()
+        limit = self.__hosts.get(host)
+        if limit is None:
+            limit = self.__hosts[host] = _HostLimit(
+                self.__rate, self.__burst, self.__concurrency, self.__clock
+            )
+
+        return limit
+
+    @asynccontextmanager
+    async def async_slot(self, url: str) -> AsyncIterator[None]:
+        """
+        Wait until a request to the url may be sent, holding a concurrency slot of its host while in the context.
+
+        :param url: URL of the request.
+        """
+        limit = self.__get_host_limit(url)
+        async with limit.semaphore:
+            delay = limit.bucket.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            yield
+
+    async def async_fetch(self, url: str, fetch: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run a fetch of the url in a slot of its host, sharing its result with identical fetches queued or in progress.
+
+        The fetch runs in its own task, so a caller that is cancelled does not cancel it for the others.
+
+        :param url: URL to fetch. Fetches of the same url are coalesced.
+        :param fetch: Performs the request and reads the response.
+        :return: Result of the fetch.
+        """
+        task = self.__pending.get(url)
+        if task is None:
+            task = asyncio.create_task(self.__async_run(url, fetch))
+            self.__pending[url] = task
+            task.add_done_callback(lambda _: self.__pending.pop(url))
+
+        return await asyncio.shield(task)
+
+    async def __async_run(self, url: str, fetch: Callable[[], Awaitable[T]]) -> T:
+        """Run a fetch in a slot of its host."""
+        async with self.async_slot(url):
+            return await fetch()
@@ -0,0 +1,152 @@
+"""Scheduling helpers for refetching guide data."""
+
+from __future__ import annotations
+
+import math
+import random
+from collections import deque
+from datetime import datetime, time, timedelta
+
+
+class ExponentialBackoff:
+    """Exponential backoff with jitter, for retrying failed refetches."""
+
+    __initial_delay: timedelta
+    __max_delay: timedelta
+    __jitter: float
+    __random: random.Random
+    __failures: int
+
+    def __init__(
+        self,
+        initial_delay: timedelta,
+        max_delay: timedelta,
+        jitter: float = 0.5,
+        rng: random.Random | None = None,
+    ) -> None:
+        """
+        Initialize.
+
+        :param initial_delay: Delay after the first failure.
+        :param max_delay: Upper bound of the delay, reached after multiple consecutive failures.
+        :param jitter: Fraction of the delay that is randomized, to spread retries of multiple clients.
+        :param rng: Random number generator to use for the jitter.
+        """
+        self.__initial_delay = initial_delay
+        self.__max_delay = max_delay
+        self.__jitter = min(max(jitter, 0.0), 1.0)
+        self.__random = rng or random.Random()  # noqa: S311
+        self.__failures = 0
+
+    @property
+    def failures(self) -> int:
+        """Number of consecutive failures."""
+        return self.__failures
+
+    def next_delay(self) -> timedelta:
+        """
+        Record a failure and get the delay until the next attempt.
+
+        The delay doubles with every consecutive failure, up to the maximum delay.
+        The jitter reduces the delay by a random amount of up to jitter * delay.
+
+        :return: Delay until the next attempt.
+        """
+        self.__failures += 1
+
+        # cap the exponent, the maximum delay is reached long before that
+        exponent = min(self.__failures - 1, 32)
+        delay = min(self.__initial_delay * (2**exponent), self.__max_delay)
+        return delay * (1 - self.__jitter * self.__random.random())
+
+    def reset(self) -> None:
+        """Record a success, resetting the delay to the initial delay."""
+        self.__failures = 0
+
+
+def parse_time_of_day(value: str) -> time | None:
+    """
+    Parse a time of day in HH:MM:SS or HH:MM format.
+
+    :param value: Time of day to parse.
+    :return: The parsed time, or None if the format is invalid.
+    """
+    for time_format in ("%H:%M:%S", "%H:%M"):
+        try:
+            return datetime.strptime(value, time_format).time()
+        except ValueError:
+            continue
+
+    return None
+
+
+class PublishTimeEstimator:
+    """Learns the time of day a provider publishes its guide, from the Last-Modified history."""
+
+    __history: deque[datetime]
+
+    def __init__(self, history_size: int = 7) -> None:
+        """
+        Initialize.
+
+        :param history_size: Number of most recent publications to base the estimate on.
+        """
+        self.__history = deque(maxlen=history_size)
+
+    def record(self, last_modified: datetime) -> None:
+        """
+        Record the Last-Modified time of a fetched guide.
+
+        :param last_modified: Last modification time of the guide, as naive local time.
+        """
+        # the same publication may be fetched multiple times
+        if last_modified in self.__history:
+            return
+
+        self.__history.append(last_modified)
+
+    @property
+    def publish_time(self) -> time | None:
+        """
+        Estimated time of day the provider publishes its guide, or None if nothing was recorded yet.
+
+        This is the circular mean of the recorded times of day, so publications around midnight average correctly.
+        """
+        if not self.__history:
+            return None
+
+        x = y = 0.0
+        for last_modified in self.__history:
+            seconds = (
+                last_modified.hour * 3600
+                + last_modified.minute * 60
+                + last_modified.second
+            )
+            angle = 2 * math.pi * seconds / 86400
+            x += math.cos(angle)
+            y += math.sin(angle)
+
+        seconds = round(math.atan2(y, x) / (2 * math.pi) * 86400) % 86400
+        return time(
+            hour=seconds // 3600, minute=seconds // 60 % 60, second=seconds % 60
+        )
+
+
+def get_next_publish_time(after: datetime, publish_time: time) -> datetime:
+    """
+    Get the next occurrence of the publish time of day, strictly after the given time.
+
+    :param after: Time to get the next publication after, as naive local time.
+    :param publish_time: Time of day the provider publishes its guide.
+    :return: Next publication time.
+    """
+    candidate = after.replace(
+        hour=publish_time.hour,
+        minute=publish_time.minute,
+        second=publish_time.second,
+        microsecond=0,
+    )
+    if candidate <= after:
+        candidate += timedelta(days=1)
+
+    return candidate
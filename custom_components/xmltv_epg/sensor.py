@@ -3,21 +3,38 @@
 from __future__ import annotations
 
 import uuid
+from collections.abc import Callable
+from dataclasses import dataclass
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
     SensorEntityDescription,
+    SensorStateClass,
 )
-from homeassistant.const import EntityCategory
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-
-from .const import DOMAIN, LOGGER, ChannelSensorMode
+from homeassistant.helpers.typing import StateType
+
+from .api import XMLTVFetchStats
+from .const import (
+    DOMAIN,
+    LOGGER,
+    PROGRAM_LIST_MAX_BYTES,
+    PROGRAM_LIST_MAX_TITLE_LENGTH,
+    PROGRAM_LIST_SENSOR_UNRECORDED_ATTRIBUTES,
+    PROGRAM_SENSOR_UNRECORDED_ATTRIBUTES,
+    ChannelSensorMode,
+)
 from .coordinator import XMLTVDataUpdateCoordinator
 from .entity import XMLTVEntity, XMLTVProgramEntity
-from .helper import normalize_for_entity_id, program_get_normalized_identification
+from .helper import (
+    normalize_for_entity_id,
+    program_get_normalized_identification,
+    program_list_to_attribute,
+)
 from .model import TVChannel, TVGuide
 
 
@@ -37,31 +54,49 @@ async def async_setup_entry(
     # sensor for coordinator status
     sensors: list[SensorEntity] = [XMLTVStatusSensor(coordinator, guide)]
 
+    # sensors for fetch diagnostics
+    sensors.extend(
+        XMLTVFetchStatSensor(coordinator, guide, description)
+        for description in FETCH_STAT_SENSORS
+    )
+
+    channel_sensor_class = (
+        XMLTVChannelRecordedSensor
+        if coordinator.record_program_details
+        else XMLTVChannelSensor
+    )
+
     for channel in guide.channels:
         # current
         if coordinator.enable_current_sensor:
             sensors.append(
-                XMLTVChannelSensor(coordinator, channel, ChannelSensorMode.CURRENT)
+                channel_sensor_class(coordinator, channel, ChannelSensorMode.CURRENT)
             )
 
         # upcoming
         if coordinator.enable_upcoming_sensor:
             sensors.append(
-                XMLTVChannelSensor(coordinator, channel, ChannelSensorMode.NEXT)
+                channel_sensor_class(coordinator, channel, ChannelSensorMode.NEXT)
             )
 
         # primetime
         if coordinator.enable_primetime_sensor:
             sensors.append(
-                XMLTVChannelSensor(coordinator, channel, ChannelSensorMode.PRIMETIME)
+                channel_sensor_class(coordinator, channel, ChannelSensorMode.PRIMETIME)
             )
 
+        # program list
+        if coordinator.enable_program_list_sensor:
+            sensors.append(XMLTVChannelProgramListSensor(coordinator, channel))
+
     async_add_entities(sensors)
 
 
 class XMLTVChannelSensor(XMLTVProgramEntity, SensorEntity):
     """XMLTV Channel Program Sensor class."""
 
+    _unrecorded_attributes = PROGRAM_SENSOR_UNRECORDED_ATTRIBUTES
+
     def __init__(
         self,
         coordinator: XMLTVDataUpdateCoordinator,
@@ -143,6 +178,77 @@ class XMLTVChannelSensor(XMLTVProgramEntity, SensorEntity):
         super()._handle_coordinator_update()
 
 
+class XMLTVChannelRecordedSensor(XMLTVChannelSensor):
+    """XMLTV Channel Program Sensor class, recording all attributes in the history."""
+
+    _unrecorded_attributes = frozenset()
+
+
+class XMLTVChannelProgramListSensor(XMLTVProgramEntity, SensorEntity):
+    """XMLTV Channel Program List Sensor class, listing the next programs of a channel."""
+
+    _unrecorded_attributes = PROGRAM_LIST_SENSOR_UNRECORDED_ATTRIBUTES
+
+    def __init__(
+        self,
+        coordinator: XMLTVDataUpdateCoordinator,
+        channel: TVChannel,
+    ) -> None:
+        """Initialize the sensor class."""
+        super().__init__(coordinator, channel, ChannelSensorMode.PROGRAM_LIST)
+
+        translation_key, entity_id = program_get_normalized_identification(
+            channel, ChannelSensorMode.PROGRAM_LIST, "program_sensor"
+        )
+
+        self.entity_id = entity_id
+        self._attr_unique_id = str(uuid.uuid5(uuid.NAMESPACE_X500, self.entity_id))
+
+        self._attr_has_entity_name = True
+        self.entity_description = SensorEntityDescription(
+            key=translation_key,
+            translation_key=translation_key,
+            icon="mdi:format-list-bulleted",
+        )
+
+        LOGGER.debug(f"Setup sensor '{self.entity_id}' for channel '{channel.id}'.")
+
+    @property
+    def available(self) -> bool:  # pyright: ignore[reportIncompatibleVariableOverride] -- Entity.available and CoordinatorEntity.available are defined incompatible
+        """Return if entity is available."""
+        return (
+            self._channel is not None
+            and self._program is not None
+            and XMLTVEntity.available.__get__(self)
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        if not self._update_from_coordinator() or self._program is None:
+            self._attr_native_value = None
+            self._attr_extra_state_attributes = {}
+
+            super()._handle_coordinator_update()
+            return
+
+        # native value is full title of the next program
+        self._attr_native_value = self._program.full_title
+
+        # the next program is the first in the list, slice from there
+        programs = self._channel.get_upcoming_programs(
+            self._program.start, self.coordinator.program_list_size
+        )
+
+        self._attr_extra_state_attributes = {
+            "programs": program_list_to_attribute(
+                programs, PROGRAM_LIST_MAX_BYTES, PROGRAM_LIST_MAX_TITLE_LENGTH
+            ),
+        }
+
+        super()._handle_coordinator_update()
+
+
 class XMLTVStatusSensor(XMLTVEntity, SensorEntity):
     """XMLTV Coordinator Status Sensor class."""
 
@@ -232,3 +338,122 @@ class XMLTVStatusSensor(XMLTVEntity, SensorEntity):
         }
 
         super()._handle_coordinator_update()
+
+
+@dataclass(frozen=True, kw_only=True)
+class XMLTVFetchStatSensorEntityDescription(SensorEntityDescription):
+    """Describes a XMLTV fetch diagnostics sensor."""
+
+    value_fn: Callable[[XMLTVFetchStats], StateType]
+
+
+def _duration_sensor(
+    key: str, value_fn: Callable[[XMLTVFetchStats], float]
+) -> XMLTVFetchStatSensorEntityDescription:
+    """Describe a fetch diagnostics sensor reporting a duration in seconds."""
+    return XMLTVFetchStatSensorEntityDescription(
+        key=key,
+        translation_key=key,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        suggested_display_precision=2,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=value_fn,
+    )
+
+
+def _size_sensor(
+    key: str, value_fn: Callable[[XMLTVFetchStats], int | None]
+) -> XMLTVFetchStatSensorEntityDescription:
+    """Describe a fetch diagnostics sensor reporting a size in bytes."""
+    return XMLTVFetchStatSensorEntityDescription(
+        key=key,
+        translation_key=key,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        suggested_unit_of_measurement=UnitOfInformation.MEBIBYTES,
+        suggested_display_precision=1,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=value_fn,
+    )
+
+
+def _count_sensor(
+    key: str, value_fn: Callable[[XMLTVFetchStats], int]
+) -> XMLTVFetchStatSensorEntityDescription:
+    """Describe a fetch diagnostics sensor reporting a count."""
+    return XMLTVFetchStatSensorEntityDescription(
+        key=key,
+        translation_key=key,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=value_fn,
+    )
+
+
+FETCH_STAT_SENSORS: tuple[XMLTVFetchStatSensorEntityDescription, ...] = (
+    _duration_sensor("download_time", lambda s: s.download_time),
+    _duration_sensor("decompress_time", lambda s: s.decompress_time),
+    _duration_sensor("parse_time", lambda s: s.parse_time),
+    _duration_sensor("link_time", lambda s: s.link_time),
+    _size_sensor("transfer_size", lambda s: s.transfer_bytes),
+    _size_sensor("download_size", lambda s: s.download_bytes),
+    _size_sensor("xml_size", lambda s: s.xml_bytes),
+    _size_sensor("peak_memory_delta", lambda s: s.peak_memory_delta),
+    _count_sensor("channel_count", lambda s: s.channel_count),
+    _count_sensor("program_count", lambda s: s.program_count),
+    _count_sensor("dropped_program_count", lambda s: s.dropped_program_count),
+)
+
+
+class XMLTVFetchStatSensor(XMLTVEntity, SensorEntity):
+    """XMLTV Fetch Diagnostics Sensor class."""
+
+    coordinator: XMLTVDataUpdateCoordinator
+    entity_description: XMLTVFetchStatSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: XMLTVDataUpdateCoordinator,
+        guide: TVGuide,
+        description: XMLTVFetchStatSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor class."""
+        super().__init__(coordinator, None)
+
+        if guide.name is None:
+            raise ValueError(
+                "Guide name is required for sensor identification but was None."
+            )
+
+        self.entity_id = (
+            f"sensor.{normalize_for_entity_id(guide.name)}_{description.key}"
+        )
+        self._attr_unique_id = str(uuid.uuid5(uuid.NAMESPACE_X500, self.entity_id))
+
+        self._attr_has_entity_name = True
+        self.entity_description = description
+        self._attr_translation_placeholders = {"generator_name": guide.name}
+
+        LOGGER.debug(
+            f"Setup sensor '{self.entity_id}' for coordinator '{guide.name}' fetch diagnostics."
+        )
+
+    @property
+    def available(self) -> bool:  # pyright: ignore[reportIncompatibleVariableOverride] -- Entity.available and CoordinatorEntity.available are defined incompatible
+        """Return if entity is available."""
+        return self._attr_native_value is not None and XMLTVEntity.available.__get__(
+            self
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        stats = self.coordinator.last_fetch_stats
+        self._attr_native_value = (
+            self.entity_description.value_fn(stats) if stats is not None else None
+        )
+
+        super()._handle_coordinator_update()
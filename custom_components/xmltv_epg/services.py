@@ -0,0 +1,120 @@
+"""Services for xmltv_epg."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+import voluptuous as vol
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .coordinator import XMLTVDataUpdateCoordinator
+from .helper import program_to_dict
+
+SERVICE_GET_PROGRAMS = "get_programs"
+SERVICE_PROFILE_REFETCH = "profile_refetch"
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_CHANNELS = "channels"
+ATTR_START = "start"
+ATTR_END = "end"
+
+GET_PROGRAMS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_CHANNELS): vol.All(cv.ensure_list, [cv.string]),
+        vol.Required(ATTR_START): cv.datetime,
+        vol.Required(ATTR_END): cv.datetime,
+    }
+)
+
+
+PROFILE_REFETCH_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+
+def _get_coordinators(
+    hass: HomeAssistant, entry_id: str | None
+) -> dict[str, XMLTVDataUpdateCoordinator]:
+    """Get the coordinators of all config entries, or only of the given entry."""
+    coordinators: dict[str, XMLTVDataUpdateCoordinator] = hass.data.get(DOMAIN, {})
+    if entry_id is None:
+        return coordinators
+
+    if entry_id not in coordinators:
+        raise ServiceValidationError(f"Unknown config entry '{entry_id}'")
+
+    return {entry_id: coordinators[entry_id]}
+
+
+def _ensure_aware(value: datetime) -> datetime:
+    """Interpret naive datetimes as being in the configured time zone."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=dt_util.get_default_time_zone())
+
+    return value
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the xmltv_epg services."""
+
+    async def async_get_programs(call: ServiceCall) -> ServiceResponse:
+        """Get all programs airing in a time window, optionally filtered by channel."""
+        start = _ensure_aware(call.data[ATTR_START])
+        end = _ensure_aware(call.data[ATTR_END])
+        if start >= end:
+            raise ServiceValidationError("start must be before end")
+
+        coordinators = _get_coordinators(hass, call.data.get(ATTR_CONFIG_ENTRY_ID))
+
+        channels: dict[str, list[dict]] = {}
+        for coordinator in coordinators.values():
+            guide = coordinator.data
+            if guide is None:
+                continue
+
+            programs = guide.get_programs(start, end, call.data.get(ATTR_CHANNELS))
+            for channel_id, channel_programs in programs.items():
+                channels.setdefault(channel_id, []).extend(
+                    program_to_dict(p) for p in channel_programs
+                )
+
+        return {"channels": channels}
+
+    async def async_profile_refetch(call: ServiceCall) -> None:
+        """Re-fetch the guide with profiling enabled, writing cProfile statistics to the config directory."""
+        coordinators = _get_coordinators(hass, call.data.get(ATTR_CONFIG_ENTRY_ID))
+        for coordinator in coordinators.values():
+            try:
+                await coordinator.async_profile_refetch()
+            except UpdateFailed as exception:
+                raise HomeAssistantError(
+                    f"Profiled refetch failed: {exception}"
+                ) from exception
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE_REFETCH,
+        async_profile_refetch,
+        schema=PROFILE_REFETCH_SCHEMA,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_PROGRAMS,
+        async_get_programs,
+        schema=GET_PROGRAMS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
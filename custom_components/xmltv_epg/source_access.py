@@ -0,0 +1,61 @@
+"""
+Access checks of guide sources that run on the host.
+
+file:// sources read files of the host, so like other integrations reading local files,
+they must be in a directory listed in allowlist_external_dirs.
+
+exec: sources run a command, so everyone able to open the config flow could run
+commands on the host. Like the command_line integration, commands are therefore only
+run if they are listed in configuration.yaml:
+
+xmltv_epg:
+  allowed_commands:
+    - tv_grab_fi --days 3
+"""
+
+from __future__ import annotations
+
+import shlex
+
+from homeassistant.core import HomeAssistant
+
+from .api import (
+    XMLTVClientSourceNotAllowedError,
+    get_source_command,
+    get_source_path,
+)
+from .const import DOMAIN
+
+DATA_ALLOWED_COMMANDS = f"{DOMAIN}_allowed_commands"
+
+
+def set_allowed_commands(hass: HomeAssistant, commands: list[str]) -> None:
+    """
+    Set the command lines exec: sources may run.
+
+    :param commands: Command lines, as configured in configuration.yaml.
+    """
+    hass.data[DATA_ALLOWED_COMMANDS] = [shlex.split(command) for command in commands]
+
+
+async def async_check_source_allowed(hass: HomeAssistant, url: str) -> None:
+    """
+    Check the guide source may be used.
+
+    :param url: URL of the guide.
+    :raises XMLTVClientSourceNotAllowedError: If the source may not be used.
+    """
+    path = get_source_path(url)
+    # resolving the path accesses the file system
+    if path is not None and not await hass.async_add_executor_job(
+        hass.config.is_allowed_path, path
+    ):
+        raise XMLTVClientSourceNotAllowedError(
+            f"Guide file '{path}' is not in a directory listed in allowlist_external_dirs of configuration.yaml"
+        )
+
+    args = get_source_command(url)
+    if args is not None and args not in hass.data.get(DATA_ALLOWED_COMMANDS, []):
+        raise XMLTVClientSourceNotAllowedError(
+            f"Guide command '{shlex.join(args)}' is not listed in {DOMAIN}.allowed_commands of configuration.yaml"
+        )
@@ -0,0 +1 @@
+"""Benchmarks for xmltv_epg."""
@@ -0,0 +1,315 @@
+"""
+Run the xmltv_epg benchmark suite.
+
+Usage:
+  python -m test.benchmark [--profile small|medium|large] [--workers N] [--repeat N] [--output results.json]
+
+Results are printed as a table and, if --output is given, written as JSON
+so they can be compared across releases.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+from custom_components.xmltv_epg.api import (
+    SPOOL_CHUNK_SIZE,
+    XMLTVClient,
+    _StreamDecompressor,
+)
+from custom_components.xmltv_epg.model import (
+    TVChannel,
+    TVGuide,
+    omit_on_error_validator,
+)
+from custom_components.xmltv_epg.model.fast_parser import parse_guide
+from custom_components.xmltv_epg.model.parallel_parser import parse_guide_parallel
+
+from .generator import (
+    COMPRESSION_FORMATS,
+    GUIDE_START,
+    PROFILES,
+    GuideProfile,
+    compress,
+    generate_guide_xml,
+)
+
+MANIFEST = Path(__file__).parents[2] / "custom_components/xmltv_epg/manifest.json"
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> dict[str, float]:
+    """Run fn repeat times and return timing statistics, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "max": max(timings),
+    }
+
+
+def decode(client: XMLTVClient, data: bytes, url: str) -> bytes:
+    """Decode a response body like XMLTVClient.async_get_data does."""
+    return client._XMLTVClient__decode_response(data, url)  # type: ignore[attr-defined]
+
+
+def decode_stream(data: bytes, url: str) -> int:
+    """Decode a response body in chunks, like the progressive parser receives it."""
+    decompressor = _StreamDecompressor(url)
+    size = 0
+    for i in range(0, len(data), SPOOL_CHUNK_SIZE):
+        size += len(decompressor.decompress(data[i : i + SPOOL_CHUNK_SIZE]))
+
+    return size
+
+
+def relink(guide: TVGuide) -> TVGuide:
+    """Build a new guide from already parsed programs, measuring only the cross-linking."""
+    channels = [TVChannel(id=c.id, name=c.name, icon=c.icon) for c in guide.channels]
+    return TVGuide(
+        generator_name=guide.generator_name,
+        channels=channels,
+        programs=guide.programs,
+    )
+
+
+def lookup_times(profile: GuideProfile) -> list[datetime]:
+    """Get lookup times spread over the guide's time range."""
+    return [
+        GUIDE_START + timedelta(minutes=m) for m in range(0, profile.days * 24 * 60, 97)
+    ]
+
+
+def lookup_current_next(guide: TVGuide, times: list[datetime]) -> None:
+    """Look up current and next program on every channel for all given times."""
+    for channel in guide.channels:
+        for t in times:
+            channel.get_current_program(t)
+            channel.get_next_program(t)
+
+
+def sensor_tick(guide: TVGuide, now: datetime) -> None:
+    """
+    Emulate the work done by the channel sensors on a single coordinator update.
+
+    Mirrors XMLTVChannelSensor._handle_coordinator_update for current and
+    upcoming sensors of every channel, without the Home Assistant state machine.
+    """
+    for channel in guide.channels:
+        for program in (
+            channel.get_current_program(now),
+            channel.get_next_program(now),
+        ):
+            if program is None:
+                continue
+
+            last_program = channel.last_program
+            _ = {
+                "state": program.full_title,
+                "start": program.start,
+                "end": program.end,
+                "duration": program.duration.total_seconds(),
+                "title": program.title,
+                "description": program.description,
+                "release_date": program.release_date,
+                "language": program.language,
+                "episode": program.episode,
+                "category": [c.name for c in program.categories] or None,
+                "subtitle": program.subtitle,
+                "channel_program_known_until": (
+                    last_program.end if last_program is not None else None
+                ),
+            }
+
+
+def run(
+    profile_name: str, formats: list[str], workers: list[int], repeat: int
+) -> list[dict[str, Any]]:
+    """Run all benchmarks for a profile and return the results."""
+    profile = PROFILES[profile_name]
+    xml = generate_guide_xml(profile)
+    client = XMLTVClient(session=None, url="http://example.com/guide.xml")  # type: ignore[arg-type]
+
+    results: list[dict[str, Any]] = []
+
+    def add(name: str, timing: dict[str, float], **extra: Any) -> None:
+        result = {
+            "name": name,
+            "profile": profile_name,
+            "repeat": repeat,
+            **timing,
+            **extra,
+        }
+        results.append(result)
+        print(
+            f"{profile_name:<8} {name:<30} median {timing['median'] * 1000:10.2f} ms"
+            f"   min {timing['min'] * 1000:10.2f} ms",
+            file=sys.stderr,
+        )
+
+    for fmt in formats:
+        data, suffix, _content_type = compress(xml, fmt)
+        url = "http://example.com/guide" + suffix
+        timing = measure(lambda: decode(client, data, url), repeat)
+        add(
+            f"decode[{fmt}]",
+            timing,
+            input_bytes=len(data),
+            output_bytes=len(xml),
+            ratio=len(xml) / len(data),
+            mb_per_s=len(xml) / timing["median"] / 1e6,
+        )
+
+        timing = measure(lambda: decode_stream(data, url), repeat)
+        add(
+            f"stream_decode[{fmt}]",
+            timing,
+            input_bytes=len(data),
+            output_bytes=len(xml),
+            mb_per_s=len(xml) / timing["median"] / 1e6,
+        )
+
+    timing = measure(lambda: TVGuide.from_xml(xml), repeat)
+    add(
+        "from_xml",
+        timing,
+        input_bytes=len(xml),
+        programs=profile.program_count,
+        programs_per_s=profile.program_count / timing["median"],
+    )
+
+    # the omit-on-error validator as it was before parsing items in place
+    with mock.patch.object(
+        omit_on_error_validator, "_in_place_parsing_supported", return_value=False
+    ):
+        previous_timing = measure(lambda: TVGuide.from_xml(xml), repeat)
+    add(
+        "from_xml[previous_validator]",
+        previous_timing,
+        input_bytes=len(xml),
+        programs=profile.program_count,
+        programs_per_s=profile.program_count / previous_timing["median"],
+        speedup=previous_timing["median"] / timing["median"],
+    )
+
+    timing = measure(lambda: parse_guide(xml), repeat)
+    add(
+        "fast_parse",
+        timing,
+        input_bytes=len(xml),
+        programs=profile.program_count,
+        programs_per_s=profile.program_count / timing["median"],
+    )
+
+    for fast_parser in (False, True):
+        for n in workers:
+            timing = measure(
+                lambda: parse_guide_parallel(
+                    xml, workers=n, fast_parser=fast_parser, min_size=0
+                ),
+                repeat,
+            )
+            add(
+                f"{'fast_' if fast_parser else ''}parallel_parse[{n}]",
+                timing,
+                workers=n,
+                programs=profile.program_count,
+                programs_per_s=profile.program_count / timing["median"],
+            )
+
+    guide = TVGuide.from_xml(xml)
+    add("link", measure(lambda: relink(guide), repeat))
+
+    times = lookup_times(profile)
+    timing = measure(lambda: lookup_current_next(guide, times), repeat)
+    add(
+        "current_next_lookup",
+        timing,
+        lookups=2 * len(times) * len(guide.channels),
+    )
+
+    now = GUIDE_START + timedelta(hours=12, minutes=5)
+    add("sensor_tick", measure(lambda: sensor_tick(guide, now), repeat))
+
+    return results
+
+
+def main() -> None:
+    """Entry point of the benchmark suite."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--profile",
+        choices=PROFILES.keys(),
+        action="append",
+        help="guide profile to benchmark; may be given multiple times (default: small, medium)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=COMPRESSION_FORMATS,
+        action="append",
+        dest="formats",
+        help="compression format to benchmark decoding for; may be given multiple times (default: all)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        action="append",
+        help="number of processes to benchmark parallel parsing with; may be given multiple times (default: 1, 2, 4, ... up to the CPU count)",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="write JSON results to this file")
+    args = parser.parse_args()
+
+    workers = args.workers or [2**i for i in range((os.cpu_count() or 1).bit_length())]
+
+    results = []
+    for profile_name in args.profile or ["small", "medium"]:
+        results.extend(
+            run(
+                profile_name,
+                args.formats or COMPRESSION_FORMATS,
+                workers,
+                args.repeat,
+            )
+        )
+
+    report = {
+        "meta": {
+            "version": json.loads(MANIFEST.read_text())["version"],
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "profiles": {
+                name: asdict(PROFILES[name])
+                for name in args.profile or ["small", "medium"]
+            },
+        },
+        "results": results,
+    }
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""Deterministic synthetic XMLTV guide generator for benchmarks."""
+
+from __future__ import annotations
+
+import bz2
+import gzip
+import io
+import lzma
+import random
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from xml.sax.saxutils import escape, quoteattr
+
+try:
+    from compression import zstd
+except ImportError:  # pragma: no cover - python built without zstd support
+    zstd = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional
+    brotli = None
+
+CATEGORIES = [
+    "Drama",
+    "Action",
+    "Comedy",
+    "News",
+    "Sports",
+    "Documentary",
+    "Kids",
+    "Music",
+]
+
+WORDS = [
+    "lorem",
+    "ipsum",
+    "dolor",
+    "sit",
+    "amet",
+    "consectetur",
+    "adipiscing",
+    "elit",
+    "sed",
+    "do",
+    "eiusmod",
+    "tempor",
+]
+
+COMPRESSION_FORMATS = ["plain", "gz", "xz", "bz2", "zip"]
+if zstd is not None:
+    COMPRESSION_FORMATS.append("zst")
+if brotli is not None:
+    COMPRESSION_FORMATS.append("br")
+
+
+@dataclass(frozen=True)
+class GuideProfile:
+    """Parameters of a synthetic guide."""
+
+    channels: int = 10
+    """Number of channels."""
+
+    days: int = 1
+    """Number of days covered by the guide."""
+
+    programs_per_day: int = 24
+    """Number of programs per channel and day."""
+
+    description_size: int = 200
+    """Approximate length of program descriptions, in characters. 0 to omit descriptions."""
+
+    categories: int = 2
+    """Number of categories per program."""
+
+    episode_variants: bool = True
+    """Emit episode numbers in all supported numbering systems (and some invalid ones)."""
+
+    invalid_ratio: float = 0.0
+    """Ratio of programs that fail validation (start >= stop)."""
+
+    seed: int = 578
+    """Seed for the random generator, to keep generated guides stable across runs."""
+
+    @property
+    def program_count(self) -> int:
+        """Total number of programs in the guide."""
+        return self.channels * self.days * self.programs_per_day
+
+
+PROFILES: dict[str, GuideProfile] = {
+    "small": GuideProfile(channels=10, days=1, programs_per_day=24, invalid_ratio=0.01),
+    "medium": GuideProfile(
+        channels=100, days=7, programs_per_day=30, invalid_ratio=0.01
+    ),
+    "large": GuideProfile(
+        channels=300, days=14, programs_per_day=40, invalid_ratio=0.01
+    ),
+}
+
+GUIDE_START = datetime(2024, 5, 17, 0, 0, tzinfo=timezone(timedelta(hours=2)))
+
+
+def _format_time(t: datetime) -> str:
+    """Format time in XMLTV format."""
+    return t.strftime("%Y%m%d%H%M%S %z")
+
+
+def generate_guide_xml(profile: GuideProfile, start: datetime = GUIDE_START) -> bytes:
+    """
+    Generate a synthetic XMLTV guide.
+
+    The same profile always yields the same document.
+
+    :param profile: Parameters of the guide.
+    :param start: Start time of the first program on every channel.
+    :return: XMLTV document, UTF-8 encoded.
+    """
+    rnd = random.Random(profile.seed)  # noqa: S311 - not used for cryptography
+    out = io.StringIO()
+    out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    out.write(
+        '<tv generator-info-name="xmltv_epg benchmark" generator-info-url="http://example.com">\n'
+    )
+
+    for c in range(profile.channels):
+        out.write(f'  <channel id="bench.ch{c}">\n')
+        out.write(f"    <display-name>XX: Channel {c}</display-name>\n")
+        out.write(f'    <icon src="http://example.com/ch/{c}.png" />\n')
+        out.write("  </channel>\n")
+
+    duration = timedelta(days=1) / profile.programs_per_day
+    for c in range(profile.channels):
+        program_start = start
+        for p in range(profile.days * profile.programs_per_day):
+            program_end = program_start + duration
+            stop = program_end
+            if rnd.random() < profile.invalid_ratio:
+                stop = program_start
+
+            out.write(
+                f'  <programme start="{_format_time(program_start)}" stop="{_format_time(stop)}" channel="bench.ch{c}">\n'
+            )
+            out.write(f"    <title>Program {c}-{p}</title>\n")
+
+            if rnd.random() < 0.5:
+                out.write(f"    <sub-title>Part {p % 7}</sub-title>\n")
+
+            if profile.description_size > 0:
+                words: list[str] = []
+                length = 0
+                while length < profile.description_size:
+                    word = rnd.choice(WORDS)
+                    words.append(word)
+                    length += len(word) + 1
+                out.write(f"    <desc>{escape(' '.join(words))}</desc>\n")
+
+            for category in rnd.sample(CATEGORIES, profile.categories):
+                out.write(f'    <category lang="en">{category}</category>\n')
+
+            if profile.episode_variants:
+                season = p % 10
+                episode = p % 24
+                variant = p % 4
+                if variant == 0:
+                    out.write(
+                        f'    <episode-num system="xmltv_ns">{season}.{episode}.</episode-num>\n'
+                    )
+                elif variant == 1:
+                    out.write(
+                        f'    <episode-num system="onscreen">S{season + 1}E{episode + 1}</episode-num>\n'
+                    )
+                elif variant == 2:
+                    out.write(
+                        f'    <episode-num system="SxxExx">E{episode + 1}</episode-num>\n'
+                    )
+                else:
+                    # not a known system, value is kept but not parsed
+                    out.write(
+                        f"    <episode-num system={quoteattr('dd_progid')}>EP{p:08d}</episode-num>\n"
+                    )
+
+            if p % 3 == 0:
+                out.write(f"    <date>{2000 + p % 24}0101</date>\n")
+
+            out.write(f'    <icon src="http://example.com/pr/{c}/{p}.jpg" />\n')
+            out.write("  </programme>\n")
+            program_start = program_end
+
+    out.write("</tv>\n")
+    return out.getvalue().encode()
+
+
+def compress(xml: bytes, fmt: str) -> tuple[bytes, str, str]:
+    """
+    Compress a guide document like a provider would serve it.
+
+    :param xml: The XMLTV document.
+    :param fmt: Compression format, one of COMPRESSION_FORMATS.
+    :return: (data, url suffix, content type) tuple.
+    """
+    if fmt == "plain":
+        return xml, ".xml", "application/xml"
+    if fmt == "gz":
+        return gzip.compress(xml), ".xml.gz", "application/gzip"
+    if fmt == "xz":
+        return lzma.compress(xml), ".xml.xz", "application/x-xz"
+    if fmt == "bz2":
+        return bz2.compress(xml), ".xml.bz2", "application/x-bzip2"
+    if fmt == "zst" and zstd is not None:
+        return zstd.compress(xml), ".xml.zst", "application/zstd"
+    if fmt == "br" and brotli is not None:
+        return brotli.compress(xml), ".xml.br", "application/octet-stream"
+    if fmt == "zip":
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            zip_file.writestr("guide.xml", xml)
+        return buffer.getvalue(), ".xml.zip", "application/zip"
+
+    raise ValueError(f"unknown compression format '{fmt}'")
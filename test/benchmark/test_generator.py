@@ -0,0 +1,36 @@
+"""Test cases for the synthetic benchmark guide generator."""
+
+import pytest
+
+from custom_components.xmltv_epg.model import TVGuide
+
+from .generator import COMPRESSION_FORMATS, GuideProfile, compress, generate_guide_xml
+
+
+def test_generate_guide_xml():
+    """Test generated guides are deterministic and parse as expected."""
+    profile = GuideProfile(channels=3, days=2, programs_per_day=12, invalid_ratio=0.1)
+
+    xml = generate_guide_xml(profile)
+    assert xml == generate_guide_xml(profile)
+
+    guide = TVGuide.from_xml(xml)
+    assert len(guide.channels) == 3
+
+    # invalid programs are omitted while parsing
+    assert 0 < len(guide.programs) < profile.program_count
+
+    # all episode number variants are present
+    systems = {e.system for p in guide.programs for e in p.episode_raw}
+    assert systems == {"xmltv_ns", "onscreen", "SxxExx", "dd_progid"}
+
+
+@pytest.mark.parametrize("fmt", COMPRESSION_FORMATS)
+def test_compress(fmt: str):
+    """Test compression formats produce data."""
+    xml = generate_guide_xml(GuideProfile(channels=1, programs_per_day=4))
+    data, suffix, content_type = compress(xml, fmt)
+
+    assert data
+    assert suffix.startswith(".xml")
+    assert content_type
@@ -4,7 +4,9 @@ from unittest.mock import patch
 
 import pytest
 
-from .const import MOCK_TV_GUIDE
+from custom_components.xmltv_epg.api import XMLTVProbeResult
+
+from .const import MOCK_TV_GUIDE, MOCK_TV_GUIDE_NAME
 
 pytest_plugins = "pytest_homeassistant_custom_component"
 
@@ -35,3 +37,28 @@ def mock_xmltv_client_get_data():
         return_value=MOCK_TV_GUIDE,
     ) as mock:
         yield mock
+
+
+@pytest.fixture()
+def mock_xmltv_client_probe():
+    """Fixture to replace 'XMLTVClient.async_probe' method with a mock."""
+    with patch(
+        "custom_components.xmltv_epg.api.XMLTVClient.async_probe",
+        return_value=XMLTVProbeResult(
+            compression="xml",
+            generator_name=MOCK_TV_GUIDE_NAME,
+            channel_count=3,
+            channels_complete=True,
+        ),
+    ) as mock:
+        yield mock
+
+
+@pytest.fixture()
+def mock_http_session(aioclient_mock):
+    """Fixture to make the session of the integration send its requests to the aiohttp client mock."""
+    with patch(
+        "custom_components.xmltv_epg.http_client._create_session",
+        side_effect=lambda hass: aioclient_mock.create_session(hass.loop),
+    ):
+        yield aioclient_mock
@@ -102,3 +102,121 @@ def test_get_current_or_next_program():
     last = channel.last_program
     assert last is not None
     assert last.title == program_next.title
+
+
+def test_get_programs():
+    """Test TVChannel.get_programs method."""
+    # prepare channel with programs, linked out of order
+    # p0 @ 00:00 - 01:00
+    # p1 @ 01:00 - 02:00
+    # p2 @ 02:00 - 03:00
+    # p3 @ 03:00 - 04:00
+    programs = [
+        TVProgram(
+            channel_id="CH1",
+            start=datetime(2020, 1, 1, h, 0),
+            end=datetime(2020, 1, 1, h + 1, 0),
+            title=f"Program {h}",
+        )
+        for h in range(4)
+    ]
+
+    channel = TVChannel(id="CH1", name="Channel 1")
+    for program in reversed(programs):
+        channel._link_program(program)
+
+    def titles(start_h: int, start_m: int, end_h: int, end_m: int) -> list[str]:
+        return [
+            p.title
+            for p in channel.get_programs(
+                datetime(2020, 1, 1, start_h, start_m),
+                datetime(2020, 1, 1, end_h, end_m),
+            )
+        ]
+
+    # window fully inside one program
+    assert titles(1, 15, 1, 45) == ["Program 1"]
+
+    # window spanning multiple programs, partial overlaps are included
+    assert titles(0, 30, 2, 30) == ["Program 0", "Program 1", "Program 2"]
+
+    # window boundaries are [start, end)
+    assert titles(1, 0, 2, 0) == ["Program 1"]
+
+    # window outside of known programs
+    assert titles(4, 0, 5, 0) == []
+
+    # linking a program invalidates the index
+    channel._link_program(
+        TVProgram(
+            channel_id="CH1",
+            start=datetime(2020, 1, 1, 4, 0),
+            end=datetime(2020, 1, 1, 5, 0),
+            title="Program 4",
+        )
+    )
+    assert titles(4, 0, 5, 0) == ["Program 4"]
+
+
+def test_get_current_program_overlapping():
+    """Test TVChannel.get_current_program with overlapping programs."""
+    # long @ 00:00 - 06:00
+    # short @ 01:00 - 02:00
+    program_long = TVProgram(
+        channel_id="CH1",
+        start=datetime(2020, 1, 1, 0, 0),
+        end=datetime(2020, 1, 1, 6, 0),
+        title="Long",
+    )
+    program_short = TVProgram(
+        channel_id="CH1",
+        start=datetime(2020, 1, 1, 1, 0),
+        end=datetime(2020, 1, 1, 2, 0),
+        title="Short",
+    )
+
+    channel = TVChannel(id="CH1", name="Channel 1")
+    channel._link_program(program_short)
+    channel._link_program(program_long)
+
+    # the earliest starting program that is currently airing wins
+    current = channel.get_current_program(datetime(2020, 1, 1, 3, 0))
+    assert current is not None
+    assert current.title == "Long"
+
+    current = channel.get_current_program(datetime(2020, 1, 1, 1, 30))
+    assert current is not None
+    assert current.title == "Long"
+
+    # the long program still overlaps a window after the short one ended
+    assert [
+        p.title
+        for p in channel.get_programs(
+            datetime(2020, 1, 1, 2, 0), datetime(2020, 1, 1, 3, 0)
+        )
+    ] == ["Long"]
+
+
+def test_get_upcoming_programs():
+    """Test TVChannel.get_upcoming_programs method."""
+    channel = TVChannel(id="CH1", name="Channel 1")
+    for h in range(6):
+        channel._link_program(
+            TVProgram(
+                channel_id="CH1",
+                start=datetime(2020, 1, 1, h, 0),
+                end=datetime(2020, 1, 1, h + 1, 0),
+                title=f"Program {h}",
+            )
+        )
+
+    # programs starting at or after 01:30, limited to 3
+    upcoming = channel.get_upcoming_programs(datetime(2020, 1, 1, 1, 30), 3)
+    assert [p.title for p in upcoming] == ["Program 2", "Program 3", "Program 4"]
+
+    # fewer programs remaining than requested
+    upcoming = channel.get_upcoming_programs(datetime(2020, 1, 1, 5, 0), 3)
+    assert [p.title for p in upcoming] == ["Program 5"]
+
+    # nothing upcoming
+    assert channel.get_upcoming_programs(datetime(2020, 1, 1, 6, 0), 3) == []
@@ -1,5 +1,7 @@
 """Test cases for TVGuide class."""
 
+from datetime import datetime
+
 from custom_components.xmltv_epg.model import TVChannel, TVGuide
 
 
@@ -143,3 +145,39 @@ def test_from_xml_program_invalid_start_after_end():
     assert guide is not None
     assert len(guide.channels) == 1
     assert len(guide.programs) == 1
+
+
+def test_get_programs():
+    """Test TVGuide.get_programs method."""
+    xml = """
+<tv generator-info-name="xmltv_epg">
+  <channel id="CH1">
+    <display-name>Channel 1</display-name>
+  </channel>
+  <channel id="CH2">
+    <display-name>Channel 2</display-name>
+  </channel>
+  <programme start="20200101010000 +0000" stop="20200101020000 +0000" channel="CH1">
+    <title>CH1 Program 1</title>
+  </programme>
+  <programme start="20200101020000 +0000" stop="20200101030000 +0000" channel="CH1">
+    <title>CH1 Program 2</title>
+  </programme>
+  <programme start="20200101013000 +0000" stop="20200101023000 +0000" channel="CH2">
+    <title>CH2 Program 1</title>
+  </programme>
+</tv>
+"""
+
+    guide = TVGuide.from_xml(xml)
+    start = datetime.fromisoformat("2020-01-01T01:45:00+00:00")
+    end = datetime.fromisoformat("2020-01-01T02:15:00+00:00")
+
+    # all channels
+    programs = guide.get_programs(start, end)
+    assert [p.title for p in programs["CH1"]] == ["CH1 Program 1", "CH1 Program 2"]
+    assert [p.title for p in programs["CH2"]] == ["CH2 Program 1"]
+
+    # channel filter, unknown channels are ignored
+    programs = guide.get_programs(start, end, ["CH2", "CH3"])
+    assert list(programs.keys()) == ["CH2"]
@@ -0,0 +1,211 @@
+"""Differential test cases for the fast parser, comparing it against TVGuide.from_xml."""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from pydantic_xml.errors import ParsingError
+
+from custom_components.xmltv_epg.model import TVGuide
+from custom_components.xmltv_epg.model.fast_parser import parse_guide
+from custom_components.xmltv_epg.model.parse_stats import collect_parse_stats
+from test.benchmark.generator import GuideProfile, generate_guide_xml
+
+
+def assert_same_guide(xml: str | bytes):
+    """Assert that the fast parser and the pydantic-xml parser produce identical guides."""
+    with collect_parse_stats() as expected_stats:
+        expected = TVGuide.from_xml(xml)
+    with collect_parse_stats() as actual_stats:
+        actual = parse_guide(xml)
+
+    assert actual.model_dump() == expected.model_dump()
+    assert actual.model_fields_set == expected.model_fields_set
+    assert actual_stats.omitted == expected_stats.omitted
+
+    # derived values, computed in model_post_init
+    for a, e in zip(actual.programs, expected.programs, strict=True):
+        assert a.episode == e.episode
+        assert a.full_title == e.full_title
+        assert a.model_fields_set == e.model_fields_set
+        assert [ep.value for ep in a.episode_raw] == [ep.value for ep in e.episode_raw]
+
+    # cross-linking
+    for a, e in zip(actual.channels, expected.channels, strict=True):
+        assert (a.last_program is None) == (e.last_program is None)
+        if a.last_program is not None and e.last_program is not None:
+            assert a.last_program.model_dump() == e.last_program.model_dump()
+
+    for a, e in zip(actual.programs, expected.programs, strict=True):
+        assert (a.channel is None) == (e.channel is None)
+        if a.channel is not None and e.channel is not None:
+            assert a.channel.id == e.channel.id
+
+
+@pytest.mark.parametrize(
+    "profile",
+    [
+        GuideProfile(channels=3, days=1, programs_per_day=24),
+        GuideProfile(channels=5, days=2, programs_per_day=30, invalid_ratio=0.1),
+        GuideProfile(channels=2, description_size=0, categories=0),
+        GuideProfile(channels=2, episode_variants=False, seed=1),
+    ],
+)
+def test_generated_guides(profile: GuideProfile):
+    """Test the fast parser against synthetic guides."""
+    assert_same_guide(generate_guide_xml(profile))
+
+
+def test_full_featured_guide():
+    """Test the fast parser with all supported elements and attributes."""
+    assert_same_guide("""
+<tv source-info-name="Source" source-info-url="http://source.example.com"
+    generator-info-name="Generator" generator-info-url="http://example.com">
+  <!-- comments are ignored -->
+  <channel id="CH1">
+    <display-name>DE: Channel 1</display-name>
+    <icon src="http://example.com/ch1.png" width="100" height=" 50 " />
+  </channel>
+  <channel id="CH2">
+    <display-name>Channel 2</display-name>
+  </channel>
+  <programme start="20200101010000 +0000" stop="20200101020000 +0000" channel="CH1">
+    <title>Program 1</title>
+    <sub-title>Subtitle 1</sub-title>
+    <desc>Description 1</desc>
+    <date>2020</date>
+    <category lang="en">Drama</category>
+    <category>Comedy</category>
+    <language>English</language>
+    <icon src="http://example.com/p1.png" />
+    <episode-num system="xmltv_ns">0.1.</episode-num>
+    <episode-num system="onscreen">S1E2</episode-num>
+    <episode-num system="SxxExx">E2</episode-num>
+    <episode-num system="dd_progid">EP1234</episode-num>
+  </programme>
+  <programme start="20200101020000 +0100" stop="20200101030000 +0100" channel="CH2">
+    <title>Program 2</title>
+    <date>19960217000000 +0000</date>
+  </programme>
+  <programme start="20200101030000 +0000" stop="20200101040000 +0000" channel="CH3">
+    <title>Program on unknown channel</title>
+  </programme>
+</tv>
+""")
+
+
+def test_invalid_items_omitted():
+    """Test the fast parser omits the same invalid items as the pydantic-xml parser."""
+    assert_same_guide("""
+<tv>
+  <channel id="CH1"><display-name>Channel 1</display-name></channel>
+  <channel><display-name>Missing id</display-name></channel>
+  <channel id="CH3"></channel>
+  <channel id="CH4"><display-name></display-name></channel>
+  <channel id="CH5"><display-name>Icon missing src</display-name><icon /></channel>
+  <channel id="CH6"><display-name>Bad icon size</display-name><icon src="x" width="a" /></channel>
+
+  <programme start="20200101010000 +0000" stop="20200101020000 +0000" channel="CH1">
+    <title>Valid</title>
+    <episode-num system="xmltv_ns">invalid</episode-num>
+    <episode-num system="SxxExx">SxE1</episode-num>
+    <episode-num>1</episode-num>
+    <episode-num system="onscreen"></episode-num>
+    <category lang="en"></category>
+  </programme>
+  <programme start="20200101020000 +0000" stop="20200101010000 +0000" channel="CH1">
+    <title>Start after stop</title>
+  </programme>
+  <programme start="20200101010000 +0000" stop="20200101010000 +0000" channel="CH1">
+    <title>Start equals stop</title>
+  </programme>
+  <programme start="2020-01-01 01:00" stop="20200101020000 +0000" channel="CH1">
+    <title>Bad start format</title>
+  </programme>
+  <programme start="20200101010000 +0000" channel="CH1">
+    <title>Missing stop</title>
+  </programme>
+  <programme start="20200101010000 +0000" stop="20200101020000 +0000">
+    <title>Missing channel</title>
+  </programme>
+  <programme start="20200101010000 +0000" stop="20200101020000 +0000" channel="CH1">
+  </programme>
+  <programme start="20200101010000 +0000" stop="20200101020000 +0000" channel="CH1">
+    <title>Bad date</title>
+    <date>01.01.2020</date>
+  </programme>
+  <programme start="20200101010000 +0000" stop="20200101020000 +0000" channel="CH1">
+    <title>Bad icon</title>
+    <icon width="10" />
+  </programme>
+</tv>
+""")
+
+
+def test_element_order():
+    """Test the fast parser looks up out-of-order elements like the pydantic-xml parser."""
+    assert_same_guide("""
+<tv>
+  <programme channel="CH1" start="20200101010000 +0000" stop="20200101020000 +0000">
+    <category>Before title</category>
+    <desc>Description before title</desc>
+    <title>Title</title>
+    <title>Second title</title>
+    <language>English</language>
+    <sub-title>Subtitle after language</sub-title>
+    <category>After language</category>
+    <episode-num system="onscreen">S1E1</episode-num>
+  </programme>
+  <channel id="CH1">
+    <icon src="http://example.com/before-name.png" />
+    <display-name>Channel after programs</display-name>
+  </channel>
+</tv>
+""")
+
+
+def test_empty_guide():
+    """Test the fast parser with an empty guide."""
+    assert_same_guide("<tv></tv>")
+
+
+def test_invalid_root():
+    """Test the fast parser rejects documents that are not a TV guide."""
+    with pytest.raises(ParsingError):
+        parse_guide("<foo></foo>")
+
+
+def test_window():
+    """Test the fast parser only parses programs overlapping the time window."""
+    xml = generate_guide_xml(GuideProfile(channels=3, days=2, programs_per_day=24))
+    full = parse_guide(xml)
+
+    start = full.programs[0].start + timedelta(hours=5, minutes=30)
+    end = start + timedelta(hours=6)
+    windowed = parse_guide(xml, window=(start, end))
+
+    expected = [p for p in full.programs if p.start < end and p.end > start]
+    assert expected
+    assert len(expected) < len(full.programs)
+    assert [p.model_dump() for p in windowed.programs] == [
+        p.model_dump() for p in expected
+    ]
+    assert [c.id for c in windowed.channels] == [c.id for c in full.channels]
+
+
+def test_window_keeps_invalid_times():
+    """Test programs with invalid times are omitted by validation, not by the window filter."""
+    xml = """
+<tv>
+  <programme start="invalid" stop="20200101020000 +0000" channel="CH1">
+    <title>Invalid start</title>
+  </programme>
+</tv>
+"""
+    with collect_parse_stats() as stats:
+        guide = parse_guide(
+            xml,
+            window=(datetime(2020, 1, 1, tzinfo=UTC), datetime(2020, 1, 2, tzinfo=UTC)),
+        )
+
+    assert guide.programs == []
+    assert stats.omitted == {"programme": 1}
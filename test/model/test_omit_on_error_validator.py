@@ -1,10 +1,29 @@
 """Test cases for custom 'on error omit' validator."""
 
+import pytest
 from pydantic_xml import BaseXmlModel, attr, element, xml_field_validator
 
+from custom_components.xmltv_epg.model import omit_on_error_validator
 from custom_components.xmltv_epg.model.omit_on_error_validator import (
     parse_list_omit_on_error,
 )
+from custom_components.xmltv_epg.model.parse_stats import collect_parse_stats
+
+
+@pytest.fixture(autouse=True, params=[True, False], ids=["in_place", "public"])
+def in_place_parsing(request, monkeypatch):
+    """Run each test parsing items in place, and using the public pydantic-xml API only."""
+    if not request.param:
+        monkeypatch.setattr(
+            omit_on_error_validator, "_in_place_parsing_supported", lambda: False
+        )
+
+    return request.param
+
+
+def test_in_place_parsing_supported(in_place_parsing):
+    """Test parsing in place works with the installed pydantic-xml version."""
+    assert omit_on_error_validator._in_place_parsing_supported() is in_place_parsing
 
 
 def test_omit_on_error_validator():
@@ -23,7 +42,8 @@ def test_omit_on_error_validator():
             """Omit invalid items from items lists while parsing."""
             return parse_list_omit_on_error(element, FooItem, cls.__xml_search_mode__)
 
-    foo = Foo.from_xml("""
+    with collect_parse_stats() as stats:
+        foo = Foo.from_xml("""
 <list>
   <item id="1">Item 1</item>
   <item id="2">Item 2</item>
@@ -32,6 +52,9 @@ def test_omit_on_error_validator():
 </list>
 """)
 
+    # omitted items are counted
+    assert stats.omitted == {"item": 2}
+
     assert len(foo.items) == 2
 
     assert foo.items[0].id == "1"
@@ -39,3 +62,48 @@ def test_omit_on_error_validator():
 
     assert foo.items[1].id == "2"
     assert foo.items[1].value == "Item 2"
+
+
+def test_omit_on_error_validator_keeps_search_position():
+    """Test omit on error validator does not affect the lookup of other fields."""
+
+    class FooItem(BaseXmlModel, tag="item"):
+        value: str
+
+    class FooOther(BaseXmlModel, tag="other"):
+        value: str
+
+    class Foo(BaseXmlModel, tag="list", search_mode="ordered"):
+        name: str = element(tag="name")
+        items: list[FooItem] = element(tag="item", default_factory=list)
+        others: list[FooOther] = element(tag="other", default_factory=list)
+        footer: str | None = element(tag="footer", default=None)
+
+        @xml_field_validator("items")
+        @classmethod
+        def _omit_invalid_items(cls, element, field_name) -> list:
+            """Omit invalid items from items lists while parsing."""
+            return parse_list_omit_on_error(element, FooItem, cls.__xml_search_mode__)
+
+        @xml_field_validator("others")
+        @classmethod
+        def _omit_invalid_others(cls, element, field_name) -> list:
+            """Omit invalid items from others lists while parsing."""
+            return parse_list_omit_on_error(element, FooOther, cls.__xml_search_mode__)
+
+    foo = Foo.from_xml("""
+<list>
+  <name>Foo</name>
+  <other>Other 1</other>
+  <item>Item 1</item>
+  <item></item>
+  <other>Other 2</other>
+  <footer>Footer</footer>
+  <item>Item 2</item>
+</list>
+""")
+
+    assert foo.name == "Foo"
+    assert [i.value for i in foo.items] == ["Item 1", "Item 2"]
+    assert [o.value for o in foo.others] == ["Other 1", "Other 2"]
+    assert foo.footer == "Footer"
@@ -0,0 +1,88 @@
+"""Test cases for the parallel parser."""
+
+import pytest
+
+from custom_components.xmltv_epg.model import TVGuide
+from custom_components.xmltv_epg.model.parallel_parser import (
+    parse_guide_parallel,
+    split_shards,
+)
+from custom_components.xmltv_epg.model.parse_stats import collect_parse_stats
+from test.benchmark.generator import GuideProfile, generate_guide_xml
+
+XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE tv SYSTEM "xmltv.dtd">
+<tv generator-info-name="a > b" generator-info-url="http://example.com">
+  <channel id="CH1"><display-name>Channel 1</display-name></channel>
+  <programme start="20200101010000 +0000" stop="20200101020000 +0000" channel="CH1">
+    <title>Program 1</title>
+  </programme>
+  <programme start="20200101020000 +0000" stop="20200101030000 +0000" channel="CH1">
+    <title>Program 2</title>
+  </programme>
+  <programme start="20200101030000 +0000" stop="20200101040000 +0000" channel="CH1">
+    <title>Program 3</title>
+  </programme>
+</tv>
+"""
+
+
+def test_split_shards():
+    """Test splitting XMLTV data at programme boundaries."""
+    split = split_shards(XML, 3)
+    assert split is not None
+
+    header, shards = split
+    assert header.endswith(b'generator-info-url="http://example.com">')
+    assert len(shards) == 3
+
+    # shards are split at programme boundaries, and cover the whole root element content
+    assert all(s.lstrip().startswith((b"<channel", b"<programme")) for s in shards)
+    assert header + b"".join(shards) + b"</tv>\n" == XML
+
+    # cannot split more than there are programmes
+    split = split_shards(XML, 10)
+    assert split is not None
+    assert len(split[1]) == 4
+
+
+def test_split_shards_invalid():
+    """Test splitting data that is not an XMLTV document."""
+    assert split_shards(b"<foo></foo>", 2) is None
+    assert split_shards(b"<tv", 2) is None
+    assert split_shards(b"<tv/>", 2) is None
+
+
+@pytest.mark.parametrize("fast_parser", [False, True], ids=["pydantic", "fast"])
+def test_parse_guide_parallel(fast_parser: bool):
+    """Test parallel parsing produces the same guide as serial parsing."""
+    xml = generate_guide_xml(
+        GuideProfile(channels=4, days=1, programs_per_day=24, invalid_ratio=0.1)
+    )
+
+    with collect_parse_stats() as expected_stats:
+        expected = TVGuide.from_xml(xml)
+    with collect_parse_stats() as actual_stats:
+        actual = parse_guide_parallel(
+            xml, workers=3, fast_parser=fast_parser, min_size=0
+        )
+
+    assert actual.model_dump() == expected.model_dump()
+    assert actual.model_fields_set == expected.model_fields_set
+    assert actual_stats.omitted == expected_stats.omitted
+
+    # cross-linked once
+    for a, e in zip(actual.channels, expected.channels, strict=True):
+        assert a.last_program is not None and e.last_program is not None
+        assert a.last_program.model_dump() == e.last_program.model_dump()
+        assert a.last_program.channel is a
+
+
+def test_parse_guide_parallel_invalid():
+    """Test parallel parsing reports malformed documents like serial parsing."""
+    xml = XML.replace(b"<title>Program 3</title>", b"<title>Program 3")
+
+    with pytest.raises(Exception) as expected:
+        TVGuide.from_xml(xml)
+    with pytest.raises(type(expected.value)):
+        parse_guide_parallel(xml, workers=2, min_size=0)
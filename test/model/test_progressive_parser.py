@@ -0,0 +1,80 @@
+"""Test cases for the progressive parser, comparing it against the fast parser."""
+
+import pytest
+from pydantic_xml.errors import ParsingError
+
+from custom_components.xmltv_epg.model.fast_parser import parse_guide
+from custom_components.xmltv_epg.model.parse_stats import collect_parse_stats
+from custom_components.xmltv_epg.model.progressive_parser import ProgressiveGuideParser
+from test.benchmark.generator import GuideProfile, generate_guide_xml
+
+
+def parse_progressive(xml: bytes, chunk_size: int):
+    """Parse the data in chunks, returning the final guide and the channels-only guide published first."""
+    parser = ProgressiveGuideParser()
+    channels_guide = None
+    for i in range(0, len(xml), chunk_size):
+        parser.feed(xml[i : i + chunk_size])
+        if channels_guide is None and parser.channels_complete:
+            channels_guide = parser.get_channels_guide()
+
+    return parser.close(), channels_guide
+
+
+@pytest.mark.parametrize("chunk_size", [1, 64, 4096, 1024 * 1024])
+@pytest.mark.parametrize(
+    "profile",
+    [
+        GuideProfile(channels=3, days=1, programs_per_day=24),
+        GuideProfile(channels=5, days=2, programs_per_day=30, invalid_ratio=0.1),
+    ],
+)
+def test_generated_guides(profile: GuideProfile, chunk_size: int):
+    """Test the progressive parser produces the same guide as the fast parser."""
+    xml = generate_guide_xml(profile)
+
+    with collect_parse_stats() as expected_stats:
+        expected = parse_guide(xml)
+    with collect_parse_stats() as actual_stats:
+        actual, channels_guide = parse_progressive(xml, chunk_size)
+
+    assert actual.model_dump() == expected.model_dump()
+    assert actual_stats.omitted == expected_stats.omitted
+
+    # all channels are published before the first program
+    assert channels_guide is not None
+    assert [c.id for c in channels_guide.channels] == [c.id for c in actual.channels]
+    assert channels_guide.programs == []
+
+    # channel objects are shared, and linked to their programs once complete
+    assert channels_guide.channels[0] is actual.channels[0]
+    assert channels_guide.channels[0].last_program is not None
+
+
+def test_channels_complete_before_programs():
+    """Test channels are complete as soon as the first program starts."""
+    parser = ProgressiveGuideParser()
+    parser.feed(
+        b"""<tv generator-info-name="Generator">
+  <channel id="CH1"><display-name>Channel 1</display-name></channel>
+  <channel id="CH2"><display-name>Channel 2</display-name></channel>
+  <programme start="20200101010000 +0000" stop="20200101020000 +0000" channel="CH1">
+"""
+    )
+
+    assert parser.channels_complete
+    guide = parser.get_channels_guide()
+    assert guide.generator_name == "Generator"
+    assert [c.id for c in guide.channels] == ["CH1", "CH2"]
+
+    parser.feed(b"<title>Program 1</title></programme></tv>")
+    guide = parser.close()
+    assert len(guide.programs) == 1
+    assert guide.programs[0].channel is guide.channels[0]
+
+
+def test_invalid_root():
+    """Test the progressive parser rejects documents that are not a TV guide."""
+    parser = ProgressiveGuideParser()
+    with pytest.raises(ParsingError):
+        parser.feed(b"<foo></foo>")
@@ -1,23 +1,51 @@
 """Test xmltv_epg api component."""
 
+import asyncio
+import bz2
 import gzip
 import inspect
 import io
 import lzma
+import os
+import shlex
+import sys
+import threading
 import zipfile
 from collections.abc import Callable
+from datetime import UTC, datetime
 from unittest.mock import AsyncMock, MagicMock
 
 import aiohttp
 import pytest
 
-from custom_components.xmltv_epg.api import XMLTVClient
+from custom_components.xmltv_epg import api
+from custom_components.xmltv_epg.api import (
+    SPOOL_CHUNK_SIZE,
+    XMLTVClient,
+    XMLTVClientCommunicationError,
+    XMLTVClientError,
+    _sniff_content_format,
+)
+from custom_components.xmltv_epg.model.fast_parser import parse_guide
+from custom_components.xmltv_epg.model.progressive_parser import ProgressiveGuideParser
+from custom_components.xmltv_epg.parallel_decompress import decompress_parallel
+from custom_components.xmltv_epg.request_limiter import RequestLimiter
 
 from .const import (
     MOCK_TV_GUIDE_NAME,
     MOCK_TV_GUIDE_URL,
 )
 
+try:
+    from compression import zstd
+except ImportError:  # pragma: no cover - python built without zstd support
+    zstd = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional
+    brotli = None
+
 
 async def create_zip_file(contents: list[tuple[str, str]]) -> bytes:
     """Create a zip file containing multiple files given in contents."""
@@ -39,6 +67,12 @@ async def create_xml_zip_multi_file(xml):
     return await create_zip_file([("license.txt", ""), ("tv_guide.xml", xml.decode())])
 
 
+def create_gzip_multi_member(xml):
+    """Prepare xml for test [gzipped xml, multiple members], like concatenated .gz files."""
+    half = len(xml) // 2
+    return gzip.compress(xml[:half]) + gzip.compress(xml[half:])
+
+
 # the configuration profiles to test
 # format is: "profile name": (url, content_type, content_encoding , compression_function)
 TEST_CONFIGURATIONS = {
@@ -98,6 +132,18 @@ TEST_CONFIGURATIONS = {
         None,
         lzma.compress,
     ),
+    "gzipped xml, multiple members": (
+        MOCK_TV_GUIDE_URL + ".gz",
+        "application/gzip",
+        None,
+        create_gzip_multi_member,
+    ),
+    "bzip2-compressed xml, raw transfer": (
+        MOCK_TV_GUIDE_URL + ".bz2",
+        "application/x-bzip2",
+        None,
+        bz2.compress,
+    ),
     "xml file inside zip archive": (  # xmltvfr.fr
         MOCK_TV_GUIDE_URL + ".zip",
         "application/zip",
@@ -130,7 +176,33 @@ TEST_CONFIGURATIONS = {
         None,
         create_xml_zip_multi_file,
     ),
+    "xz-compressed xml (wrong content-type and url)": (
+        MOCK_TV_GUIDE_URL,
+        "application/xml",
+        None,
+        lzma.compress,
+    ),
+    "plain xml (file download, wrong url)": (
+        MOCK_TV_GUIDE_URL + ".gz",
+        "application/octet-stream",
+        None,
+        None,
+    ),
 }
+if zstd is not None:
+    TEST_CONFIGURATIONS["zstd-compressed xml, raw transfer"] = (
+        MOCK_TV_GUIDE_URL + ".zst",
+        "application/zstd",
+        None,
+        zstd.compress,
+    )
+if brotli is not None:
+    TEST_CONFIGURATIONS["brotli-compressed xml, raw transfer"] = (
+        MOCK_TV_GUIDE_URL + ".br",
+        "application/octet-stream",
+        None,
+        brotli.compress,
+    )
 
 
 def create_mock_session_for_get():
@@ -153,11 +225,17 @@ def create_mock_session_for_get():
     TEST_CONFIGURATIONS.values(),
     ids=TEST_CONFIGURATIONS.keys(),
 )
+@pytest.mark.parametrize("fast_parser", [False, True], ids=["pydantic", "fast"])
+@pytest.mark.parametrize(
+    "spool_threshold", [None, 0, 16], ids=["memory", "spool", "spool to disk"]
+)
 async def test_xmltv_client_get_data(
     url: str,
     content_type: str,
     content_encoding: str,
     compression_function: Callable | None,
+    fast_parser: bool,
+    spool_threshold: int | None,
 ):
     """Test XMLTVClient.async_get_data with variable configurations."""
     # prepare the session and response
@@ -195,14 +273,25 @@ async def test_xmltv_client_get_data(
         else:
             compressed_xml = compression_function(xml.encode())
 
-        response.read.return_value = compressed_xml
+        body = compressed_xml
     else:
-        response.read.return_value = xml.encode()
+        body = xml.encode()
+
+    response.read.return_value = body
+
+    async def iter_chunked(n: int):
+        """Iterate response content in chunks mock."""
+        for i in range(0, len(body), n):
+            yield body[i : i + n]
+
+    response.content.iter_chunked = iter_chunked
 
     # create client
     client = XMLTVClient(
         session=session,
         url=url,
+        fast_parser=fast_parser,
+        spool_threshold=spool_threshold,
     )
 
     # fetch data
@@ -215,3 +304,885 @@ async def test_xmltv_client_get_data(
 
     assert len(guide.channels) == 1
     assert guide.channels[0].id == "CH1"
+
+    # fetch statistics are collected
+    stats = client.last_fetch_stats
+    assert stats is not None
+    assert stats.download_bytes == len(body)
+    assert stats.xml_bytes == len(xml.encode())
+    assert stats.channel_count == 1
+    assert stats.program_count == 1
+    assert stats.dropped_program_count == 0
+
+
+def create_mock_response(
+    body: bytes,
+    status: int = 200,
+    headers: dict[str, str] | None = None,
+    fail_after: int | None = None,
+):
+    """
+    Create a mock response streaming the given body.
+
+    :param fail_after: Raise a payload error after streaming this many bytes.
+    """
+    response = AsyncMock()
+    response.raise_for_status = MagicMock()
+    response.status = status
+    response.url = MOCK_TV_GUIDE_URL
+    response.content_type = "application/xml"
+    response.content_length = len(body)
+    response.headers = headers or {}
+
+    async def iter_chunked(n: int):
+        """Iterate response content in chunks mock."""
+        for i in range(0, len(body), n):
+            if fail_after is not None and i >= fail_after:
+                raise aiohttp.ClientPayloadError("connection lost")
+            yield body[i : i + n]
+
+    response.content.iter_chunked = iter_chunked
+    return response
+
+
+GUIDE_XML = f"""
+<tv generator-info-name="{MOCK_TV_GUIDE_NAME}">
+  <channel id="CH1">
+    <display-name>Channel 1</display-name>
+  </channel>
+  <programme start="20200101010000 +0000" stop="20200101020000 +0000" channel="CH1">
+    <title>Program 1</title>
+    <desc>{"Description " * 20000}</desc>
+  </programme>
+</tv>
+""".encode()
+
+
+@pytest.mark.parametrize(
+    ("url", "content_type", "content_encoding", "compression_function"),
+    TEST_CONFIGURATIONS.values(),
+    ids=TEST_CONFIGURATIONS.keys(),
+)
+async def test_xmltv_client_probe(
+    url: str,
+    content_type: str,
+    content_encoding: str,
+    compression_function: Callable | None,
+):
+    """Test XMLTVClient.async_probe reads only the start of the guide, with variable configurations."""
+    session, response = create_mock_session_for_get()
+    response.close = MagicMock()
+
+    programs = "".join(
+        f"""
+  <programme start="20200101{h:02}0000 +0000" stop="20200101{h + 1:02}0000 +0000" channel="CH1">
+    <title>Program {h}</title>
+    <desc>{"Description " * 100}</desc>
+  </programme>"""
+        for h in range(20)
+    )
+    xml = f"""<?xml version="1.0" encoding="UTF-8"?>
+<tv generator-info-name="{MOCK_TV_GUIDE_NAME}" generator-info-url="{url}">
+  <channel id="CH1">
+    <display-name>Channel 1</display-name>
+  </channel>
+  <channel id="CH2">
+    <display-name>Channel 2</display-name>
+  </channel>{programs}
+</tv>
+"""
+
+    response.url = url
+    response.content_type = content_type
+    response.headers.get = lambda name, default=None: (
+        content_encoding if name == "Content-Encoding" else default
+    )
+
+    if compression_function:
+        if inspect.iscoroutinefunction(compression_function):
+            body = await compression_function(xml.encode())
+        else:
+            body = compression_function(xml.encode())
+    else:
+        body = xml.encode()
+    response.content_length = len(body)
+
+    chunks_read = 0
+
+    async def iter_chunked(n: int):
+        """Iterate response content in small chunks mock, to exercise incremental decoding."""
+        nonlocal chunks_read
+        for i in range(0, len(body), 64):
+            chunks_read += 1
+            yield body[i : i + 64]
+
+    response.content.iter_chunked = iter_chunked
+
+    client = XMLTVClient(session=session, url=url)
+    probe = await client.async_probe()
+
+    assert probe.name == MOCK_TV_GUIDE_NAME
+    assert probe.channel_count == 2
+    assert probe.channels_complete
+    assert probe.content_length == len(body)
+    assert probe.estimated_xml_bytes is not None
+
+    # the transfer is aborted once the channels are read
+    assert chunks_read < len(body) / 64
+    assert probe.probed_bytes < len(body)
+    response.close.assert_called_once()
+
+
+async def test_xmltv_client_probe_invalid():
+    """Test XMLTVClient.async_probe rejects documents that are not a TV guide."""
+    response = create_mock_response(b"<html><body>Not Found</body></html>")
+    response.close = MagicMock()
+    session = AsyncMock(spec=aiohttp.ClientSession)
+    session.get = AsyncMock(return_value=response)
+
+    client = XMLTVClient(session=session, url=MOCK_TV_GUIDE_URL)
+    with pytest.raises(XMLTVClientError):
+        await client.async_probe()
+
+    response.close.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    ("url", "content_type", "content_encoding", "compression_function"),
+    TEST_CONFIGURATIONS.values(),
+    ids=TEST_CONFIGURATIONS.keys(),
+)
+async def test_xmltv_client_get_data_progressive(
+    url: str,
+    content_type: str,
+    content_encoding: str,
+    compression_function: Callable | None,
+):
+    """Test XMLTVClient.async_get_data publishes the channels before the programs are loaded."""
+    session, response = create_mock_session_for_get()
+    response.close = MagicMock()
+
+    xml = GUIDE_XML
+    response.url = url
+    response.content_type = content_type
+    response.content_length = None
+    response.headers.get = lambda name, default=None: (
+        content_encoding if name == "Content-Encoding" else default
+    )
+
+    if compression_function:
+        if inspect.iscoroutinefunction(compression_function):
+            body = await compression_function(xml)
+        else:
+            body = compression_function(xml)
+    else:
+        body = xml
+
+    # the first chunk contains the channels, the program follows later
+    chunks = [body[: len(body) // 2], body[len(body) // 2 :]]
+    chunks_read = 0
+
+    async def iter_chunked(n: int):
+        """Iterate response content in chunks mock."""
+        nonlocal chunks_read
+        for chunk in chunks:
+            chunks_read += 1
+            yield chunk
+
+    response.content.iter_chunked = iter_chunked
+
+    channels_guides = []
+
+    def on_channels(guide):
+        """Record the channels-only guide, and when it was published."""
+        channels_guides.append((chunks_read, guide))
+
+    client = XMLTVClient(session=session, url=url)
+    guide = await client.async_get_data(on_channels=on_channels)
+
+    assert len(channels_guides) == 1
+    published_after, channels_guide = channels_guides[0]
+    # bzip2 only outputs data once a whole block (of up to 900 kB) was received
+    assert published_after == (2 if url.endswith(".bz2") else 1)
+    assert [c.id for c in channels_guide.channels] == ["CH1"]
+    assert channels_guide.programs == []
+
+    assert guide.generator_name == MOCK_TV_GUIDE_NAME
+    assert len(guide.programs) == 1
+    assert guide.programs[0].channel is channels_guide.channels[0]
+
+    stats = client.last_fetch_stats
+    assert stats is not None
+    assert stats.download_bytes == len(body)
+    assert stats.xml_bytes == len(xml)
+    assert stats.program_count == 1
+    response.close.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    ("spool_threshold", "parallel"),
+    [(None, True), (1024 * 1024, True), (0, False)],
+    ids=["memory", "spooled", "spooled_to_disk"],
+)
+@pytest.mark.parametrize(
+    ("content_format", "compression_function"),
+    [
+        ("gzip", create_gzip_multi_member),
+        ("xz", lambda xml: lzma.compress(xml[:1000]) + lzma.compress(xml[1000:])),
+    ],
+    ids=["gzip", "xz"],
+)
+async def test_xmltv_client_get_data_parallel_decompress(
+    monkeypatch,
+    content_format: str,
+    compression_function: Callable,
+    spool_threshold: int | None,
+    parallel: bool,
+):
+    """Test XMLTVClient.async_get_data decompresses multi-member content in parallel, unless spooled to disk."""
+    calls = []
+
+    def decompress(data: bytes, content_format: str, workers: int) -> list[bytes]:
+        """Decompress in parallel regardless of the size, recording the call."""
+        parts = decompress_parallel(data, content_format, workers, min_size=0)
+        calls.append((content_format, workers, len(parts)))
+        return parts
+
+    monkeypatch.setattr(api, "decompress_parallel", decompress)
+
+    body = compression_function(GUIDE_XML)
+    response = create_mock_response(body)
+    response.read.return_value = body
+    session = AsyncMock(spec=aiohttp.ClientSession)
+    session.get = AsyncMock(return_value=response)
+
+    client = XMLTVClient(
+        session=session,
+        url=MOCK_TV_GUIDE_URL,
+        spool_threshold=spool_threshold,
+        decompress_workers=2,
+    )
+    guide = await client.async_get_data()
+
+    assert guide.generator_name == MOCK_TV_GUIDE_NAME
+    assert len(guide.programs) == 1
+    assert calls == ([(content_format, 2, 2)] if parallel else [])
+
+    stats = client.last_fetch_stats
+    assert stats is not None
+    assert stats.xml_bytes == len(GUIDE_XML)
+
+
+@pytest.mark.parametrize("spool_threshold", [None, 0], ids=["memory", "spooled"])
+async def test_xmltv_client_get_data_priority_window(spool_threshold: int | None):
+    """Test XMLTVClient.async_get_data parses the priority window before the full guide."""
+    session, response = create_mock_session_for_get()
+
+    xml = f"""
+<tv generator-info-name="{MOCK_TV_GUIDE_NAME}">
+  <channel id="CH1"><display-name>Channel 1</display-name></channel>
+  <programme start="20200101010000 +0000" stop="20200101020000 +0000" channel="CH1">
+    <title>Program 1</title>
+  </programme>
+  <programme start="20200101020000 +0000" stop="20200101030000 +0000" channel="CH1">
+    <title>Program 2</title>
+  </programme>
+  <programme start="20200102010000 +0000" stop="20200102020000 +0000" channel="CH1">
+    <title>Program 3</title>
+  </programme>
+  <programme start="20200101013000 +0000" stop="20200101010000 +0000" channel="CH1">
+    <title>Invalid</title>
+  </programme>
+</tv>
+""".encode()
+
+    response.url = MOCK_TV_GUIDE_URL
+    response.content_type = "application/xml"
+    response.headers.get = lambda name, default=None: default
+    response.read.return_value = xml
+
+    async def iter_chunked(n: int):
+        """Iterate response content in chunks mock."""
+        for i in range(0, len(xml), n):
+            yield xml[i : i + n]
+
+    response.content.iter_chunked = iter_chunked
+
+    priority_guides = []
+
+    client = XMLTVClient(
+        session=session, url=MOCK_TV_GUIDE_URL, spool_threshold=spool_threshold
+    )
+    guide = await client.async_get_data(
+        priority_window=(
+            datetime(2020, 1, 1, 1, 30, tzinfo=UTC),
+            datetime(2020, 1, 1, 2, 30, tzinfo=UTC),
+        ),
+        on_priority_guide=priority_guides.append,
+    )
+
+    # the priority guide only contains the programs overlapping the window
+    assert len(priority_guides) == 1
+    assert [p.title for p in priority_guides[0].programs] == [
+        "Program 1",
+        "Program 2",
+    ]
+    assert [c.id for c in priority_guides[0].channels] == ["CH1"]
+
+    # the full guide contains all valid programs
+    assert [p.title for p in guide.programs] == ["Program 1", "Program 2", "Program 3"]
+
+    # omitted programs are only counted once
+    stats = client.last_fetch_stats
+    assert stats is not None
+    assert stats.program_count == 3
+    assert stats.dropped_program_count == 1
+
+
+async def test_xmltv_client_resume_download():
+    """Test XMLTVClient resumes an interrupted download with a range request."""
+    split = SPOOL_CHUNK_SIZE * 2
+    session = AsyncMock(spec=aiohttp.ClientSession)
+    session.get = AsyncMock(
+        side_effect=[
+            create_mock_response(GUIDE_XML, headers={"ETag": '"v1"'}, fail_after=split),
+            create_mock_response(
+                GUIDE_XML[split:],
+                status=206,
+                headers={
+                    "ETag": '"v1"',
+                    "Content-Range": f"bytes {split}-{len(GUIDE_XML) - 1}/{len(GUIDE_XML)}",
+                },
+            ),
+        ]
+    )
+
+    client = XMLTVClient(session=session, url=MOCK_TV_GUIDE_URL, spool_threshold=0)
+
+    # first attempt is interrupted
+    with pytest.raises(XMLTVClientCommunicationError):
+        await client.async_get_data()
+
+    assert session.get.call_args.kwargs["headers"] == {}
+
+    # second attempt requests only the missing bytes
+    guide = await client.async_get_data()
+    assert session.get.call_args.kwargs["headers"] == {
+        "Range": f"bytes={split}-",
+        "If-Range": '"v1"',
+        "Accept-Encoding": "identity",
+    }
+
+    assert guide.generator_name == MOCK_TV_GUIDE_NAME
+    assert guide.programs[0].description == "Description " * 20000
+
+    stats = client.last_fetch_stats
+    assert stats is not None
+    assert stats.resumed_bytes == split
+    assert stats.download_bytes == len(GUIDE_XML)
+
+
+async def test_xmltv_client_resume_download_changed():
+    """Test XMLTVClient discards an interrupted download if the content changed."""
+    split = SPOOL_CHUNK_SIZE * 2
+    changed_xml = GUIDE_XML.replace(b"Program 1", b"Program 2")
+    session = AsyncMock(spec=aiohttp.ClientSession)
+    session.get = AsyncMock(
+        side_effect=[
+            create_mock_response(
+                GUIDE_XML,
+                headers={"Last-Modified": "Wed, 01 Jan 2020 00:00:00 GMT"},
+                fail_after=split,
+            ),
+            # server ignores the range, as the content changed (If-Range)
+            create_mock_response(
+                changed_xml,
+                headers={"Last-Modified": "Thu, 02 Jan 2020 00:00:00 GMT"},
+            ),
+        ]
+    )
+
+    client = XMLTVClient(session=session, url=MOCK_TV_GUIDE_URL, spool_threshold=0)
+
+    with pytest.raises(XMLTVClientCommunicationError):
+        await client.async_get_data()
+
+    guide = await client.async_get_data()
+    assert session.get.call_args.kwargs["headers"] == {
+        "Range": f"bytes={split}-",
+        "If-Range": "Wed, 01 Jan 2020 00:00:00 GMT",
+        "Accept-Encoding": "identity",
+    }
+
+    # the whole, changed content is used
+    assert guide.programs[0].title == "Program 2"
+
+    stats = client.last_fetch_stats
+    assert stats is not None
+    assert stats.resumed_bytes == 0
+    assert stats.download_bytes == len(changed_xml)
+    assert stats.last_modified == datetime(2020, 1, 2, tzinfo=UTC).astimezone().replace(
+        tzinfo=None
+    )
+
+
+async def test_xmltv_client_resume_download_without_validator():
+    """Test XMLTVClient does not resume downloads it cannot validate."""
+    split = SPOOL_CHUNK_SIZE * 2
+    session = AsyncMock(spec=aiohttp.ClientSession)
+    session.get = AsyncMock(
+        side_effect=[
+            # weak ETags cannot be used with If-Range
+            create_mock_response(
+                GUIDE_XML, headers={"ETag": 'W/"v1"'}, fail_after=split
+            ),
+            create_mock_response(GUIDE_XML),
+        ]
+    )
+
+    client = XMLTVClient(session=session, url=MOCK_TV_GUIDE_URL, spool_threshold=0)
+
+    with pytest.raises(XMLTVClientCommunicationError):
+        await client.async_get_data()
+
+    await client.async_get_data()
+    assert session.get.call_args.kwargs["headers"] == {}
+
+
+async def test_xmltv_client_timeout():
+    """Test XMLTVClient sends guide requests with the configured timeouts."""
+    timeout = aiohttp.ClientTimeout(total=120, sock_read=30)
+    response = create_mock_response(GUIDE_XML)
+    response.read.return_value = GUIDE_XML
+    session = AsyncMock(spec=aiohttp.ClientSession)
+    session.get = AsyncMock(return_value=response)
+
+    client = XMLTVClient(session=session, url=MOCK_TV_GUIDE_URL, timeout=timeout)
+    await client.async_get_data()
+    assert session.get.call_args.kwargs["timeout"] is timeout
+
+    # without timeouts, those of the session are used
+    client = XMLTVClient(session=session, url=MOCK_TV_GUIDE_URL)
+    await client.async_get_data()
+    assert "timeout" not in session.get.call_args.kwargs
+
+
+@pytest.mark.parametrize("spool_threshold", [None, 0], ids=["memory", "spooled"])
+async def test_xmltv_client_get_data_parses_in_executor(monkeypatch, spool_threshold):
+    """Test XMLTVClient decompresses and parses downloaded guides in the executor, not in the event loop."""
+    threads = []
+
+    def parse(xml):
+        threads.append(threading.current_thread())
+        return parse_guide(xml)
+
+    def decompress(data):
+        threads.append(threading.current_thread())
+        return gzip.decompress(data)
+
+    monkeypatch.setattr(api, "parse_guide", parse)
+    monkeypatch.setitem(api._DECOMPRESS_FUNCTIONS, "gzip", decompress)
+
+    body = gzip.compress(GUIDE_XML)
+    response = create_mock_response(body)
+    response.read.return_value = body
+    session = AsyncMock(spec=aiohttp.ClientSession)
+    session.get = AsyncMock(return_value=response)
+
+    client = XMLTVClient(
+        session=session,
+        url=MOCK_TV_GUIDE_URL,
+        fast_parser=True,
+        spool_threshold=spool_threshold,
+    )
+    guide = await client.async_get_data()
+
+    assert guide.generator_name == MOCK_TV_GUIDE_NAME
+    # spooled content is decompressed as a stream
+    assert len(threads) == (2 if spool_threshold is None else 1)
+    assert threading.main_thread() not in threads
+
+
+def record_progressive_parser_threads(monkeypatch) -> list[threading.Thread]:
+    """Record the threads the progressive parser is fed and closed in."""
+    threads = []
+    feed = ProgressiveGuideParser.feed
+    close = ProgressiveGuideParser.close
+
+    def recording_feed(self, data: bytes) -> None:
+        threads.append(threading.current_thread())
+        feed(self, data)
+
+    def recording_close(self):
+        threads.append(threading.current_thread())
+        return close(self)
+
+    monkeypatch.setattr(ProgressiveGuideParser, "feed", recording_feed)
+    monkeypatch.setattr(ProgressiveGuideParser, "close", recording_close)
+    return threads
+
+
+async def test_xmltv_client_get_data_progressive_parses_in_executor(monkeypatch):
+    """Test XMLTVClient parses progressively loaded guides in the executor, not in the event loop."""
+    threads = record_progressive_parser_threads(monkeypatch)
+
+    body = gzip.compress(GUIDE_XML)
+    session, response = create_mock_session_for_get()
+    response.close = MagicMock()
+    response.url = MOCK_TV_GUIDE_URL
+    response.content_length = None
+    response.headers.get = lambda name, default=None: default
+
+    async def iter_chunked(n: int):
+        """Iterate response content in chunks mock."""
+        for i in range(0, len(body), 16):
+            yield body[i : i + 16]
+
+    response.content.iter_chunked = iter_chunked
+
+    channels_guides = []
+    client = XMLTVClient(session=session, url=MOCK_TV_GUIDE_URL)
+    guide = await client.async_get_data(on_channels=channels_guides.append)
+
+    assert guide.generator_name == MOCK_TV_GUIDE_NAME
+    assert len(channels_guides) == 1
+    assert len(threads) > 2
+    assert threading.main_thread() not in threads
+
+
+async def test_xmltv_client_limiter():
+    """Test XMLTVClient sends guide requests in a slot of the limiter."""
+    limiter = RequestLimiter(rate=1, burst=1, concurrency=1)
+    response = create_mock_response(GUIDE_XML)
+    response.read.return_value = GUIDE_XML
+    session = AsyncMock(spec=aiohttp.ClientSession)
+
+    async def get(**_kwargs: object) -> MagicMock:
+        # the slot is held while the request is sent
+        with pytest.raises(TimeoutError):
+            async with asyncio.timeout(0.01):
+                async with limiter.async_slot(MOCK_TV_GUIDE_URL):
+                    pass
+        return response
+
+    session.get = AsyncMock(side_effect=get)
+
+    client = XMLTVClient(session=session, url=MOCK_TV_GUIDE_URL, limiter=limiter)
+    guide = await client.async_get_data()
+    assert guide is not None
+    session.get.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    ("file_name", "compression_function"),
+    [
+        ("guide.xml", None),
+        ("guide.xml.gz", gzip.compress),
+        ("guide.xml.xz", lzma.compress),
+        ("guide.xml.bz2", bz2.compress),
+        ("guide.xml.zip", create_xml_zip_single),
+    ],
+)
+@pytest.mark.parametrize("progressive", [False, True], ids=["complete", "progressive"])
+async def test_xmltv_client_get_data_file(
+    tmp_path,
+    file_name: str,
+    compression_function: Callable | None,
+    progressive: bool,
+):
+    """Test XMLTVClient.async_get_data reads local guide files, and skips parsing them while unchanged."""
+    if compression_function:
+        if inspect.iscoroutinefunction(compression_function):
+            body = await compression_function(GUIDE_XML)
+        else:
+            body = compression_function(GUIDE_XML)
+    else:
+        body = GUIDE_XML
+
+    path = tmp_path / file_name
+    path.write_bytes(body)
+
+    session = AsyncMock(spec=aiohttp.ClientSession)
+    channels_guides = []
+    client = XMLTVClient(session=session, url=path.as_uri())
+    assert client.is_file_source
+
+    guide = await client.async_get_data(
+        on_channels=channels_guides.append if progressive else None
+    )
+    assert guide.generator_name == MOCK_TV_GUIDE_NAME
+    assert len(guide.programs) == 1
+    assert len(channels_guides) == (1 if progressive else 0)
+    session.get.assert_not_called()
+
+    stats = client.last_fetch_stats
+    assert stats is not None
+    assert stats.download_bytes == len(body)
+    assert stats.xml_bytes == len(GUIDE_XML)
+    assert stats.last_modified == datetime.fromtimestamp(path.stat().st_mtime_ns / 1e9)
+
+    # unchanged file is not parsed again
+    assert await client.async_get_data() is guide
+    assert client.last_fetch_stats is stats
+
+    # changed file is parsed again
+    path.write_bytes(body)
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10**9))
+    assert await client.async_get_data() is not guide
+    assert client.last_fetch_stats is not stats
+
+
+async def test_xmltv_client_get_data_directory(tmp_path):
+    """Test XMLTVClient.async_get_data reads the newest guide file in a directory."""
+    (tmp_path / "old.xml").write_bytes(GUIDE_XML.replace(b"Program 1", b"Old"))
+    (tmp_path / "new.xml.gz").write_bytes(gzip.compress(GUIDE_XML))
+    (tmp_path / "notes.txt").write_text("not a guide")
+    os.utime(tmp_path / "old.xml", (1_000_000_000, 1_000_000_000))
+
+    client = XMLTVClient(
+        session=AsyncMock(spec=aiohttp.ClientSession), url=tmp_path.as_uri()
+    )
+    guide = await client.async_get_data()
+    assert guide.programs[0].title == "Program 1"
+
+    probe = await client.async_probe()
+    assert probe.compression == "gzip"
+    assert probe.name == MOCK_TV_GUIDE_NAME
+    assert probe.channel_count == 1
+
+
+async def test_xmltv_client_get_data_file_missing(tmp_path):
+    """Test XMLTVClient.async_get_data reports missing local guide files as communication errors."""
+    session = AsyncMock(spec=aiohttp.ClientSession)
+
+    client = XMLTVClient(session=session, url=(tmp_path / "missing.xml").as_uri())
+    with pytest.raises(XMLTVClientCommunicationError):
+        await client.async_get_data()
+
+    # empty directory
+    client = XMLTVClient(session=session, url=tmp_path.as_uri())
+    with pytest.raises(XMLTVClientError):
+        await client.async_get_data()
+
+
+async def test_xmltv_client_check_source_changed(tmp_path):
+    """Test XMLTVClient.async_check_source_changed reports new versions once they were completely written."""
+    path = tmp_path / "guide.xml"
+    path.write_bytes(GUIDE_XML)
+
+    client = XMLTVClient(
+        session=AsyncMock(spec=aiohttp.ClientSession), url=path.as_uri()
+    )
+    await client.async_get_data()
+
+    # unchanged file
+    assert not await client.async_check_source_changed()
+    assert not await client.async_check_source_changed()
+
+    # file is being written, then stays unchanged for one check
+    path.write_bytes(GUIDE_XML[:100])
+    assert not await client.async_check_source_changed()
+    path.write_bytes(GUIDE_XML + b"\n")
+    assert not await client.async_check_source_changed()
+    assert await client.async_check_source_changed()
+
+    # new version is reported only once
+    assert not await client.async_check_source_changed()
+
+    # remote sources are never reported
+    client = XMLTVClient(
+        session=AsyncMock(spec=aiohttp.ClientSession), url=MOCK_TV_GUIDE_URL
+    )
+    assert not client.is_file_source
+    assert not await client.async_check_source_changed()
+
+
+def create_guide_command(tmp_path, script: str) -> str:
+    """Create an exec: url running the given python script."""
+    path = tmp_path / "grabber.py"
+    path.write_text(script)
+    return f"exec:{shlex.quote(sys.executable)} {shlex.quote(str(path))}"
+
+
+async def test_xmltv_client_get_data_command(tmp_path):
+    """Test XMLTVClient.async_get_data parses the output of a guide command while it runs."""
+    xml_path = tmp_path / "guide.xml"
+    xml_path.write_bytes(GUIDE_XML)
+    url = create_guide_command(
+        tmp_path,
+        f"""
+import sys
+data = open({str(xml_path)!r}, "rb").read()
+for i in range(0, len(data), 1000):
+    sys.stdout.buffer.write(data[i : i + 1000])
+    sys.stdout.buffer.flush()
+print("done", file=sys.stderr)
+""",
+    )
+
+    session = AsyncMock(spec=aiohttp.ClientSession)
+    channels_guides = []
+    client = XMLTVClient(session=session, url=url)
+    guide = await client.async_get_data(on_channels=channels_guides.append)
+
+    assert guide.generator_name == MOCK_TV_GUIDE_NAME
+    assert len(guide.programs) == 1
+    assert len(channels_guides) == 1
+    session.get.assert_not_called()
+
+    stats = client.last_fetch_stats
+    assert stats is not None
+    assert stats.command_runtime is not None
+    assert stats.command_runtime > 0
+    assert stats.download_bytes == len(GUIDE_XML)
+    assert stats.xml_bytes == len(GUIDE_XML)
+
+    probe = await client.async_probe()
+    assert probe.name == MOCK_TV_GUIDE_NAME
+    assert probe.channel_count == 1
+
+
+async def test_xmltv_client_get_data_command_parses_in_executor(monkeypatch, tmp_path):
+    """Test XMLTVClient parses the output of a guide command in the executor on every refetch."""
+    threads = record_progressive_parser_threads(monkeypatch)
+
+    xml_path = tmp_path / "guide.xml"
+    xml_path.write_bytes(GUIDE_XML)
+    url = create_guide_command(
+        tmp_path,
+        f"""
+import sys
+sys.stdout.buffer.write(open({str(xml_path)!r}, "rb").read())
+""",
+    )
+
+    client = XMLTVClient(session=AsyncMock(spec=aiohttp.ClientSession), url=url)
+    for on_channels in (MagicMock(), None):
+        threads.clear()
+        guide = await client.async_get_data(on_channels=on_channels)
+
+        assert guide.generator_name == MOCK_TV_GUIDE_NAME
+        assert len(threads) >= 2
+        assert threading.main_thread() not in threads
+
+
+async def test_xmltv_client_get_data_command_failed(tmp_path):
+    """Test XMLTVClient.async_get_data reports failures of the guide command, instead of its incomplete output."""
+    url = create_guide_command(
+        tmp_path,
+        """
+import sys
+sys.stdout.write("<tv><channel")
+print("grabber failed: no network", file=sys.stderr)
+sys.exit(3)
+""",
+    )
+
+    client = XMLTVClient(session=AsyncMock(spec=aiohttp.ClientSession), url=url)
+    with pytest.raises(
+        XMLTVClientCommunicationError, match="status 3: grabber failed: no network"
+    ):
+        await client.async_get_data()
+
+    # missing executable
+    client = XMLTVClient(
+        session=AsyncMock(spec=aiohttp.ClientSession),
+        url=f"exec:{tmp_path / 'missing'} --days 1",
+    )
+    with pytest.raises(XMLTVClientCommunicationError):
+        await client.async_get_data()
+
+
+async def test_xmltv_client_get_data_command_timeout(tmp_path):
+    """Test XMLTVClient.async_get_data kills guide commands exceeding the timeout."""
+    pid_path = tmp_path / "pid"
+    url = create_guide_command(
+        tmp_path,
+        f"""
+import os, sys, time
+open({str(pid_path)!r}, "w").write(str(os.getpid()))
+sys.stdout.write("<tv>")
+sys.stdout.flush()
+time.sleep(60)
+""",
+    )
+
+    client = XMLTVClient(
+        session=AsyncMock(spec=aiohttp.ClientSession), url=url, command_timeout=0.5
+    )
+    with pytest.raises(XMLTVClientCommunicationError, match="Timeout"):
+        await client.async_get_data()
+
+    # the command was killed
+    with pytest.raises(ProcessLookupError):
+        os.kill(int(pid_path.read_text()), 0)
+
+
+@pytest.mark.parametrize(
+    ("head", "content_format"),
+    [
+        (b'<?xml version="1.0"?>', "xml"),
+        (b"\r\n  <tv>", "xml"),
+        (b"\xef\xbb\xbf<tv>", "xml"),
+        ("<tv>".encode("utf-16"), "xml"),
+        ("<tv>".encode("utf-16-be"), "xml"),
+        (gzip.compress(b"<tv/>"), "gzip"),
+        (lzma.compress(b"<tv/>"), "xz"),
+        (b"PK\x03\x04", "zip"),
+        (b"\x28\xb5\x2f\xfd", "zstd"),
+        (b"BZh9", "bzip2"),
+        (b"\x1f", None),  # incomplete magic bytes
+        (b"  ", None),
+        (b"{}", None),
+    ],
+)
+def test_sniff_content_format(head: bytes, content_format: str | None):
+    """Test the content format is detected from the first bytes."""
+    assert _sniff_content_format(head) == content_format
+
+
+def test_sniff_content_format_brotli():
+    """Test brotli content, which has no magic bytes, is detected by its suffix."""
+    head = b"\x1b\x07\x00\xf8"
+    assert _sniff_content_format(head) is None
+    assert _sniff_content_format(head, "http://example.com/guide.xml.br") == "brotli"
+    assert _sniff_content_format(head, "http://example.com/guide.br?day=1") == "brotli"
+    assert _sniff_content_format(head, "/guides/guide.xml.br") == "brotli"
+
+    # magic bytes take precedence
+    assert _sniff_content_format(b"<tv/>", "guide.xml.br") == "xml"
+
+
+@pytest.mark.parametrize(
+    ("body", "message"),
+    [
+        (b"\x00\x01\x02\x03" * 1024, "Don't know how to handle content"),
+        (b"not xml", "Don't know how to handle content"),
+        pytest.param(
+            b"\x28\xb5\x2f\xfd" + b"\x00" * 100,
+            "Unsupported compression format",
+            marks=pytest.mark.skipif(zstd is not None, reason="zstd is supported"),
+        ),
+    ],
+    ids=["binary", "text", "zstd"],
+)
+@pytest.mark.parametrize("spool_threshold", [None, 0], ids=["memory", "spooled"])
+async def test_xmltv_client_get_data_unrecognized(
+    body: bytes, message: str, spool_threshold: int | None
+):
+    """Test XMLTVClient.async_get_data rejects content that is neither XML nor in a supported format."""
+    response = create_mock_response(body)
+    response.read.return_value = body
+    response.close = MagicMock()
+    session = AsyncMock(spec=aiohttp.ClientSession)
+    session.get = AsyncMock(return_value=response)
+
+    client = XMLTVClient(
+        session=session, url=MOCK_TV_GUIDE_URL, spool_threshold=spool_threshold
+    )
+    with pytest.raises(XMLTVClientError, match=message):
+        await client.async_get_data()
+
+    # the same applies when decoding while downloading
+    with pytest.raises(XMLTVClientError, match=message):
+        await client.async_get_data(on_channels=lambda guide: None)
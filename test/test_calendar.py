@@ -0,0 +1,89 @@
+"""Test xmltv_epg calendar platform."""
+
+from datetime import timedelta
+from unittest.mock import PropertyMock, patch
+
+import pytest
+from homeassistant.const import CONF_HOST
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.xmltv_epg.const import (
+    DOMAIN,
+    OPT_CALENDAR_CHANNELS,
+    OPT_ENABLE_CALENDAR,
+)
+
+from .const import MOCK_NOW, MOCK_TV_GUIDE_URL
+
+
+@pytest.fixture()
+def mock_coordinator_actual_now():
+    """Fixture to replace 'XMLTVDataUpdateCoordinator.actual_now' method with a mock."""
+    with patch(
+        "custom_components.xmltv_epg.coordinator.XMLTVDataUpdateCoordinator.actual_now",
+        new_callable=PropertyMock,
+    ) as mock:
+        mock.return_value = MOCK_NOW
+        yield mock
+
+
+async def test_calendar_basic(
+    hass,
+    mock_xmltv_client_get_data,
+    mock_coordinator_actual_now,
+):
+    """Test calendar entity setup, current event and event queries."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_HOST: MOCK_TV_GUIDE_URL},
+        options={
+            OPT_ENABLE_CALENDAR: True,
+            OPT_CALENDAR_CHANNELS: ["mock 1", "mock 3"],
+        },
+        entry_id="MOCK",
+    )
+    config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    # only the selected channels have a calendar
+    assert hass.states.get("calendar.mock_1")
+    assert hass.states.get("calendar.mock_2") is None
+
+    # current program is the active event
+    state = hass.states.get("calendar.mock_3")
+    assert state
+    assert state.state == "on"
+    assert state.attributes["message"] == "CH 3 Current - Subtitle (S1E1)"
+    assert state.attributes["location"] == "Mock Channel 3"
+
+    # query events via calendar.get_events
+    response = await hass.services.async_call(
+        "calendar",
+        "get_events",
+        {
+            "entity_id": "calendar.mock_1",
+            "start_date_time": MOCK_NOW.astimezone(),
+            "end_date_time": (MOCK_NOW + timedelta(hours=1)).astimezone(),
+        },
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response is not None
+    events = response["calendar.mock_1"]["events"]
+    assert [e["summary"] for e in events] == ["CH 1 Current", "CH 1 Upcoming"]
+
+
+async def test_calendar_disabled(hass, mock_xmltv_client_get_data):
+    """Test calendar entities are not created by default."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_HOST: MOCK_TV_GUIDE_URL},
+        entry_id="MOCK",
+    )
+    config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert hass.states.get("calendar.mock_1") is None
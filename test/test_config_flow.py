@@ -1,5 +1,9 @@
 """Test xmltv_epg config and options flow."""
 
+import os
+import shlex
+import sys
+
 from homeassistant import config_entries
 from homeassistant.const import CONF_HOST
 from homeassistant.data_entry_flow import FlowResultType
@@ -11,23 +15,46 @@ from custom_components.xmltv_epg.api import (
 )
 from custom_components.xmltv_epg.const import (
     DOMAIN,
+    OPT_ALIGN_TO_PUBLISH_TIME,
+    OPT_CALENDAR_CHANNELS,
+    OPT_COVERAGE_HORIZON,
+    OPT_ENABLE_CALENDAR,
     OPT_ENABLE_CHANNEL_ICONS,
     OPT_ENABLE_CURRENT_SENSOR,
+    OPT_ENABLE_FAST_PARSER,
+    OPT_ENABLE_PRIORITY_WINDOW_PARSE,
+    OPT_ENABLE_PROGRESSIVE_LOADING,
+    OPT_ENABLE_PROFILING,
     OPT_ENABLE_PRIMETIME_SENSOR,
     OPT_ENABLE_PROGRAM_IMAGES,
+    OPT_ENABLE_PROGRAM_LIST_SENSOR,
     OPT_ENABLE_UPCOMING_SENSOR,
+    OPT_COMMAND_TIMEOUT,
+    OPT_HTTP_READ_TIMEOUT,
+    OPT_HTTP_TIMEOUT,
+    OPT_MAX_STALENESS,
+    OPT_DECOMPRESS_WORKERS,
+    OPT_PARSER_WORKERS,
     OPT_PRIMETIME_TIME,
+    OPT_PROGRAM_LIST_SIZE,
+    OPT_PROFILING_DUMP_STATS,
     OPT_PROGRAM_LOOKAHEAD,
+    OPT_PUBLISH_TIME,
+    OPT_SPOOL_THRESHOLD,
+    OPT_RECORD_PROGRAM_DETAILS,
     OPT_UPDATE_INTERVAL,
+    OPT_WATCH_SOURCE_FILE,
 )
 
+from custom_components.xmltv_epg.source_access import set_allowed_commands
+
 from .const import MOCK_TV_GUIDE_NAME, MOCK_TV_GUIDE_URL
 
 
 # note: need to bypass integration setup to avoid hass actually trying to setup the entry, which would
-# interfere with counters on xmltv_client_get_data
+# interfere with counters on xmltv_client_probe
 async def test_config_flow_user_step_ok(
-    hass, bypass_integration_setup, mock_xmltv_client_get_data
+    hass, bypass_integration_setup, mock_xmltv_client_probe
 ):
     """Test that the 'user' config step correctly creates a config entry."""
     # initialize the config flow
@@ -50,8 +77,8 @@ async def test_config_flow_user_step_ok(
     )
 
     # to test the connection, a XMLTVClient should be created and
-    # the async_get_data method should be called
-    mock_xmltv_client_get_data.assert_called_once()
+    # the async_probe method should be called
+    mock_xmltv_client_probe.assert_called_once()
 
     # a new config entry should be created
     assert result["type"] == FlowResultType.CREATE_ENTRY
@@ -62,7 +89,7 @@ async def test_config_flow_user_step_ok(
 
 
 async def test_config_flow_user_step_handles_error(
-    hass, bypass_integration_setup, mock_xmltv_client_get_data
+    hass, bypass_integration_setup, mock_xmltv_client_probe
 ):
     """Test that the 'user' config step correctly handles errors in _test_connection."""
     # initialize the config flow
@@ -76,7 +103,7 @@ async def test_config_flow_user_step_handles_error(
     assert result["step_id"] == "user"
 
     # raise an communication exception when doing the connection test
-    mock_xmltv_client_get_data.side_effect = XMLTVClientCommunicationError(
+    mock_xmltv_client_probe.side_effect = XMLTVClientCommunicationError(
         "MOCK client communication error"
     )
 
@@ -94,7 +121,7 @@ async def test_config_flow_user_step_handles_error(
     assert result["errors"] == {"base": "connection"}
 
     # raise a generic exception when doing the connection test
-    mock_xmltv_client_get_data.side_effect = XMLTVClientError(
+    mock_xmltv_client_probe.side_effect = XMLTVClientError(
         "MOCK client communication error"
     )
 
@@ -110,6 +137,65 @@ async def test_config_flow_user_step_handles_error(
     assert result["errors"] == {"base": "unknown"}
 
 
+async def test_config_flow_user_step_command(
+    hass, bypass_integration_setup, mock_xmltv_client_probe
+):
+    """Test that the 'user' config step only accepts allowed guide commands, without running them."""
+    command = f"{shlex.quote(sys.executable)} -c 'import sys'"
+
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN,
+        context={"source": config_entries.SOURCE_USER},
+    )
+
+    # commands not listed in configuration.yaml are refused
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        user_input={CONF_HOST: f"exec:{command}"},
+    )
+    assert result["type"] == FlowResultType.FORM
+    assert result["errors"] == {"base": "source_not_allowed"}
+
+    # allowed commands are accepted, without probing (i.e. running) them
+    set_allowed_commands(hass, [command])
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        user_input={CONF_HOST: f"exec:{command}"},
+    )
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    assert result["title"] == os.path.basename(sys.executable)
+    mock_xmltv_client_probe.assert_not_called()
+
+
+async def test_config_flow_user_step_file(
+    hass, tmp_path, bypass_integration_setup, mock_xmltv_client_probe
+):
+    """Test that the 'user' config step only accepts guide files in allowed directories."""
+    url = (tmp_path / "guide.xml").as_uri()
+
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN,
+        context={"source": config_entries.SOURCE_USER},
+    )
+
+    # files outside of allowlist_external_dirs are refused
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        user_input={CONF_HOST: url},
+    )
+    assert result["type"] == FlowResultType.FORM
+    assert result["errors"] == {"base": "source_not_allowed"}
+    mock_xmltv_client_probe.assert_not_called()
+
+    hass.config.allowlist_external_dirs = {str(tmp_path)}
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        user_input={CONF_HOST: url},
+    )
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    mock_xmltv_client_probe.assert_called_once()
+
+
 async def test_option_flow_init_step_ok(hass, bypass_integration_setup):
     """Test that the 'init' options step correctly creates a config entry."""
     # create a new MockConfigEntry and add to HASS, bypassing the config flow
@@ -133,12 +219,33 @@ async def test_option_flow_init_step_ok(hass, bypass_integration_setup):
         user_input={
             OPT_UPDATE_INTERVAL: 24,
             OPT_PROGRAM_LOOKAHEAD: 10,
+            OPT_MAX_STALENESS: 24,
+            OPT_ALIGN_TO_PUBLISH_TIME: True,
+            OPT_PUBLISH_TIME: "06:00:00",
+            OPT_COVERAGE_HORIZON: 24,
+            OPT_WATCH_SOURCE_FILE: True,
+            OPT_HTTP_TIMEOUT: 600,
+            OPT_HTTP_READ_TIMEOUT: 30,
+            OPT_COMMAND_TIMEOUT: 7200,
             OPT_ENABLE_CURRENT_SENSOR: True,
             OPT_ENABLE_UPCOMING_SENSOR: True,
             OPT_ENABLE_PRIMETIME_SENSOR: True,
             OPT_ENABLE_CHANNEL_ICONS: True,
             OPT_ENABLE_PROGRAM_IMAGES: True,
             OPT_PRIMETIME_TIME: "20:00:00",
+            OPT_ENABLE_PROGRAM_LIST_SENSOR: True,
+            OPT_PROGRAM_LIST_SIZE: 10,
+            OPT_RECORD_PROGRAM_DETAILS: True,
+            OPT_ENABLE_CALENDAR: True,
+            OPT_CALENDAR_CHANNELS: ["mock 1"],
+            OPT_ENABLE_FAST_PARSER: True,
+            OPT_ENABLE_PROGRESSIVE_LOADING: True,
+            OPT_ENABLE_PRIORITY_WINDOW_PARSE: True,
+            OPT_SPOOL_THRESHOLD: 32,
+            OPT_PARSER_WORKERS: 4,
+            OPT_DECOMPRESS_WORKERS: 2,
+            OPT_ENABLE_PROFILING: True,
+            OPT_PROFILING_DUMP_STATS: False,
         },
     )
 
@@ -147,10 +254,31 @@ async def test_option_flow_init_step_ok(hass, bypass_integration_setup):
     assert result["data"] == {
         OPT_UPDATE_INTERVAL: 24,
         OPT_PROGRAM_LOOKAHEAD: 10,
+        OPT_MAX_STALENESS: 24,
+        OPT_ALIGN_TO_PUBLISH_TIME: True,
+        OPT_PUBLISH_TIME: "06:00:00",
+        OPT_COVERAGE_HORIZON: 24,
+        OPT_WATCH_SOURCE_FILE: True,
+        OPT_HTTP_TIMEOUT: 600,
+        OPT_HTTP_READ_TIMEOUT: 30,
+        OPT_COMMAND_TIMEOUT: 7200,
         OPT_ENABLE_CURRENT_SENSOR: True,
         OPT_ENABLE_UPCOMING_SENSOR: True,
         OPT_ENABLE_PRIMETIME_SENSOR: True,
         OPT_ENABLE_CHANNEL_ICONS: True,
         OPT_ENABLE_PROGRAM_IMAGES: True,
         OPT_PRIMETIME_TIME: "20:00:00",
+        OPT_ENABLE_PROGRAM_LIST_SENSOR: True,
+        OPT_PROGRAM_LIST_SIZE: 10,
+        OPT_RECORD_PROGRAM_DETAILS: True,
+        OPT_ENABLE_CALENDAR: True,
+        OPT_CALENDAR_CHANNELS: ["mock 1"],
+        OPT_ENABLE_FAST_PARSER: True,
+        OPT_ENABLE_PROGRESSIVE_LOADING: True,
+        OPT_ENABLE_PRIORITY_WINDOW_PARSE: True,
+        OPT_SPOOL_THRESHOLD: 32,
+        OPT_PARSER_WORKERS: 4,
+        OPT_DECOMPRESS_WORKERS: 2,
+        OPT_ENABLE_PROFILING: True,
+        OPT_PROFILING_DUMP_STATS: False,
     }
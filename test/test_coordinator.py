@@ -1,17 +1,20 @@
 """Test xmltv_epg coordinator component."""
 
-from datetime import timedelta
-from unittest.mock import PropertyMock, patch
+import asyncio
+from datetime import datetime, time, timedelta
+from unittest.mock import Mock, PropertyMock, patch
 
 import pytest
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.update_coordinator import UpdateFailed
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
-from custom_components.xmltv_epg.api import XMLTVClient
+from custom_components.xmltv_epg.api import XMLTVClient, XMLTVClientError
 from custom_components.xmltv_epg.const import DOMAIN
 from custom_components.xmltv_epg.coordinator import XMLTVDataUpdateCoordinator
+from custom_components.xmltv_epg.model import TVGuide
 
-from .const import MOCK_NOW, MOCK_TV_GUIDE, MOCK_TV_GUIDE_URL
+from .const import MOCK_NOW, MOCK_PRIMETIME, MOCK_TV_GUIDE, MOCK_TV_GUIDE_URL
 
 
 @pytest.fixture()
@@ -63,7 +66,8 @@ async def test_coordinator_basic(
     # nothing was fetched yet, so the api client was not called yet
     assert mock_xmltv_client_get_data.call_count == 0
 
-    # fetch the data for the first time
+    # fetch the data for the first time, during the first refresh
+    await coordinator._async_setup()
     data = await coordinator._async_update_data()
     assert data
     assert data == MOCK_TV_GUIDE
@@ -78,6 +82,7 @@ async def test_coordinator_basic(
     data = await coordinator._async_update_data()
     assert data
     assert data == MOCK_TV_GUIDE
+    await hass.async_block_till_done(wait_background_tasks=True)
 
     # the api client was not called again, because the data is still fresh
     assert mock_xmltv_client_get_data.call_count == 1
@@ -86,13 +91,15 @@ async def test_coordinator_basic(
     assert coordinator._last_refetch_time == MOCK_NOW
 
     # time-travel 2 hours into the future
-    # the data is now stale and should be refetched
+    # the data is now stale and should be refetched in the background
     TWO_HOURS_FROM_NOW = MOCK_NOW + timedelta(hours=2)
     mock_actual_now.return_value = TWO_HOURS_FROM_NOW
 
+    # the cached data is returned immediately, without waiting for the refetch
     data = await coordinator._async_update_data()
     assert data
     assert data == MOCK_TV_GUIDE
+    await hass.async_block_till_done(wait_background_tasks=True)
 
     # the api client was called again, because the data was stale
     assert mock_xmltv_client_get_data.call_count == 2
@@ -100,6 +107,563 @@ async def test_coordinator_basic(
     # last update time should be updated
     assert coordinator._last_refetch_time == TWO_HOURS_FROM_NOW
 
+    await coordinator.async_shutdown()
+
+
+async def test_coordinator_refetch_not_awaited(
+    hass,
+    bypass_integration_setup,
+    mock_xmltv_client_get_data,
+    mock_actual_now,
+):
+    """Test the refresh tick does not wait for a running refetch, and listeners are notified once it completes."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        entry_id="test",
+        data={},
+    )
+
+    coordinator = XMLTVDataUpdateCoordinator(
+        hass,
+        config_entry=entry,
+        client=XMLTVClient(
+            session=async_get_clientsession(hass),
+            url=MOCK_TV_GUIDE_URL,
+        ),
+        update_interval=1,
+        lookahead=15,
+        enable_current_sensor=True,
+        enable_upcoming_sensor=True,
+        enable_primetime_sensor=True,
+        enable_channel_icon=True,
+        enable_program_image=True,
+        primetime_time="20:00:00",
+    )
+    await coordinator._async_setup()
+
+    listener = Mock()
+    unsub = coordinator.async_add_listener(listener)
+
+    # block the refetch until released
+    release = asyncio.Event()
+    new_guide = TVGuide()
+
+    async def slow_get_data(on_channels=None):
+        await release.wait()
+        return new_guide
+
+    mock_xmltv_client_get_data.side_effect = slow_get_data
+    mock_actual_now.return_value = MOCK_NOW + timedelta(hours=2)
+
+    # ticks return the cached data while the refetch is running
+    assert await coordinator._async_update_data() == MOCK_TV_GUIDE
+    assert await coordinator._async_update_data() == MOCK_TV_GUIDE
+    assert mock_xmltv_client_get_data.call_count == 2
+    listener.assert_not_called()
+
+    # once the refetch completes, the new guide is swapped in and listeners are notified once
+    release.set()
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert coordinator.data is new_guide
+    assert listener.call_count == 1
+
+    unsub()
+    await coordinator.async_shutdown()
+
+
+async def test_coordinator_profile_refetch_waits_for_refetch(
+    hass,
+    bypass_integration_setup,
+    mock_xmltv_client_get_data,
+    mock_actual_now,
+):
+    """Test a profiled refetch waits for a running refetch, and no refetch is started while it runs."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        entry_id="test",
+        data={},
+    )
+
+    coordinator = XMLTVDataUpdateCoordinator(
+        hass,
+        config_entry=entry,
+        client=XMLTVClient(
+            session=async_get_clientsession(hass),
+            url=MOCK_TV_GUIDE_URL,
+        ),
+        update_interval=1,
+        lookahead=15,
+        enable_current_sensor=True,
+        enable_upcoming_sensor=True,
+        enable_primetime_sensor=True,
+        enable_channel_icon=True,
+        enable_program_image=True,
+        primetime_time="20:00:00",
+    )
+    await coordinator._async_setup()
+    assert mock_xmltv_client_get_data.call_count == 1
+
+    # block each refetch until released, tracking how many run at once
+    releases = [asyncio.Event(), asyncio.Event()]
+    running = 0
+    max_running = 0
+
+    async def slow_get_data(on_channels=None):
+        nonlocal running, max_running
+        release = releases[mock_xmltv_client_get_data.call_count - 2]
+        running += 1
+        max_running = max(max_running, running)
+        try:
+            await release.wait()
+        finally:
+            running -= 1
+        return MOCK_TV_GUIDE
+
+    mock_xmltv_client_get_data.side_effect = slow_get_data
+    mock_actual_now.return_value = MOCK_NOW + timedelta(hours=2)
+
+    # start a background refetch, then a profiled one
+    assert await coordinator._async_update_data() == MOCK_TV_GUIDE
+    assert mock_xmltv_client_get_data.call_count == 2
+    profile_task = hass.async_create_task(coordinator.async_profile_refetch())
+    await asyncio.sleep(0)
+    assert mock_xmltv_client_get_data.call_count == 2
+
+    # the profiled refetch starts once the background refetch completes
+    releases[0].set()
+    await asyncio.sleep(0.1)
+    assert mock_xmltv_client_get_data.call_count == 3
+    assert not profile_task.done()
+
+    # ticks do not start another refetch while the profiled one runs
+    assert await coordinator._async_update_data() == MOCK_TV_GUIDE
+    assert mock_xmltv_client_get_data.call_count == 3
+
+    releases[1].set()
+    await profile_task
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert max_running == 1
+
+    await coordinator.async_shutdown()
+
+
+async def test_coordinator_refetch_failure(
+    hass,
+    bypass_integration_setup,
+    mock_xmltv_client_get_data,
+    mock_actual_now,
+):
+    """Test failed refetches are retried with backoff, serving stale data until it is too old."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        entry_id="test",
+        data={},
+    )
+
+    coordinator = XMLTVDataUpdateCoordinator(
+        hass,
+        config_entry=entry,
+        client=XMLTVClient(
+            session=async_get_clientsession(hass),
+            url=MOCK_TV_GUIDE_URL,
+        ),
+        update_interval=1,  # every 1 hour
+        lookahead=15,
+        enable_current_sensor=True,
+        enable_upcoming_sensor=True,
+        enable_primetime_sensor=True,
+        enable_channel_icon=True,
+        enable_program_image=True,
+        primetime_time="20:00:00",
+        max_staleness=3,  # 3 hours
+    )
+
+    # initial fetch succeeds
+    await coordinator._async_setup()
+    assert await coordinator._async_update_data() == MOCK_TV_GUIDE
+    assert mock_xmltv_client_get_data.call_count == 1
+
+    # refetch fails, but the stale data is still served
+    mock_xmltv_client_get_data.side_effect = XMLTVClientError("boom")
+    mock_actual_now.return_value = MOCK_NOW + timedelta(hours=2)
+    assert await coordinator._async_update_data() == MOCK_TV_GUIDE
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert mock_xmltv_client_get_data.call_count == 2
+    assert coordinator._last_refetch_time == MOCK_NOW
+
+    # the next attempt is delayed, and not retried on every tick
+    next_retry_time = coordinator.next_retry_time
+    assert next_retry_time is not None
+    assert next_retry_time > mock_actual_now.return_value
+    assert await coordinator._async_update_data() == MOCK_TV_GUIDE
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert mock_xmltv_client_get_data.call_count == 2
+
+    # retry fails again, with a longer delay
+    mock_actual_now.return_value = next_retry_time
+    assert await coordinator._async_update_data() == MOCK_TV_GUIDE
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert mock_xmltv_client_get_data.call_count == 3
+    assert coordinator.next_retry_time is not None
+    assert coordinator.next_retry_time > next_retry_time
+
+    # once the data exceeds the maximum staleness, the coordinator fails
+    mock_actual_now.return_value = MOCK_NOW + timedelta(hours=3, minutes=1)
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_update_data()
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert mock_xmltv_client_get_data.call_count == 4
+    assert not coordinator.last_update_success
+
+    # retry succeeds, backoff is reset and listeners get the new data
+    mock_xmltv_client_get_data.side_effect = None
+    mock_actual_now.return_value = coordinator.next_retry_time
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_update_data()
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert mock_xmltv_client_get_data.call_count == 5
+    assert coordinator._last_refetch_time == mock_actual_now.return_value
+    assert coordinator.next_retry_time is None
+    assert coordinator.last_update_success
+    assert coordinator.data == MOCK_TV_GUIDE
+
+    await coordinator.async_shutdown()
+
+
+async def test_coordinator_publish_time_scheduling(
+    hass,
+    bypass_integration_setup,
+    mock_xmltv_client_get_data,
+    mock_actual_now,
+):
+    """Test refetches are scheduled shortly after the provider publishes new data, or when coverage runs low."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        entry_id="test",
+        data={},
+    )
+
+    coordinator = XMLTVDataUpdateCoordinator(
+        hass,
+        config_entry=entry,
+        client=XMLTVClient(
+            session=async_get_clientsession(hass),
+            url=MOCK_TV_GUIDE_URL,
+        ),
+        update_interval=24,
+        lookahead=15,
+        enable_current_sensor=True,
+        enable_upcoming_sensor=True,
+        enable_primetime_sensor=True,
+        enable_channel_icon=True,
+        enable_program_image=True,
+        primetime_time="20:00:00",
+        align_to_publish_time=True,
+        publish_time="14:00",
+    )
+    assert coordinator.publish_time == time(14, 0)
+    await coordinator._async_setup()
+
+    # refetch shortly after the next publication, instead of after the update interval
+    next_refetch_time = coordinator._get_next_refetch_time()
+    assert next_refetch_time is not None
+    publish_time = MOCK_NOW.replace(hour=14, minute=0)
+    assert publish_time < next_refetch_time <= publish_time + timedelta(hours=1)
+
+    mock_actual_now.return_value = next_refetch_time
+    assert await coordinator._async_update_data() == MOCK_TV_GUIDE
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert mock_xmltv_client_get_data.call_count == 2
+
+    # next refetch is after the publication on the next day
+    next_refetch_time = coordinator._get_next_refetch_time()
+    assert next_refetch_time is not None
+    assert next_refetch_time > publish_time + timedelta(days=1)
+
+    await coordinator.async_shutdown()
+
+    # coverage horizon, the mock guide is known until the end of primetime
+    coordinator = XMLTVDataUpdateCoordinator(
+        hass,
+        config_entry=entry,
+        client=XMLTVClient(
+            session=async_get_clientsession(hass),
+            url=MOCK_TV_GUIDE_URL,
+        ),
+        update_interval=24,
+        lookahead=15,
+        enable_current_sensor=True,
+        enable_upcoming_sensor=True,
+        enable_primetime_sensor=True,
+        enable_channel_icon=True,
+        enable_program_image=True,
+        primetime_time="20:00:00",
+        coverage_horizon=6,
+    )
+    mock_actual_now.return_value = MOCK_NOW
+    await coordinator._async_setup()
+
+    known_until = coordinator.guide_known_until
+    assert known_until == MOCK_PRIMETIME + timedelta(minutes=45)
+    assert coordinator._get_next_refetch_time() == known_until - timedelta(hours=6)
+
+    await coordinator.async_shutdown()
+
+
+async def test_coordinator_progressive_loading(
+    hass,
+    bypass_integration_setup,
+    mock_xmltv_client_get_data,
+    mock_actual_now,
+):
+    """Test the first refresh completes once the channels are loaded, while the programs continue loading."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        entry_id="test",
+        data={},
+    )
+
+    coordinator = XMLTVDataUpdateCoordinator(
+        hass,
+        config_entry=entry,
+        client=XMLTVClient(
+            session=async_get_clientsession(hass),
+            url=MOCK_TV_GUIDE_URL,
+        ),
+        update_interval=1,
+        lookahead=15,
+        enable_current_sensor=True,
+        enable_upcoming_sensor=True,
+        enable_primetime_sensor=True,
+        enable_channel_icon=True,
+        enable_program_image=True,
+        primetime_time="20:00:00",
+        progressive_loading=True,
+    )
+
+    # publish the channels, then block loading the programs until released
+    release = asyncio.Event()
+    channels_guide = TVGuide()
+
+    async def progressive_get_data(on_channels=None):
+        assert on_channels is not None
+        on_channels(channels_guide)
+        await release.wait()
+        return MOCK_TV_GUIDE
+
+    mock_xmltv_client_get_data.side_effect = progressive_get_data
+
+    # setup completes with the channels-only guide
+    await coordinator._async_setup()
+    assert coordinator.guide_partial
+    assert await coordinator._async_update_data() is channels_guide
+    assert mock_xmltv_client_get_data.call_count == 1
+
+    # once the programs are loaded, the complete guide is published
+    release.set()
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert not coordinator.guide_partial
+    assert coordinator.data == MOCK_TV_GUIDE
+    assert coordinator._last_refetch_time == MOCK_NOW
+
+    # later refetches are not progressive, the complete guide is swapped in at once
+    mock_xmltv_client_get_data.side_effect = None
+    mock_actual_now.return_value = MOCK_NOW + timedelta(hours=2)
+    assert await coordinator._async_update_data() == MOCK_TV_GUIDE
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert mock_xmltv_client_get_data.call_count == 2
+    assert mock_xmltv_client_get_data.call_args.kwargs["on_channels"] is None
+
+    await coordinator.async_shutdown()
+
+
+async def test_coordinator_priority_window_parse(
+    hass,
+    bypass_integration_setup,
+    mock_xmltv_client_get_data,
+    mock_actual_now,
+):
+    """Test the programs in the priority window are published before the full guide is parsed."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        entry_id="test",
+        data={},
+    )
+
+    coordinator = XMLTVDataUpdateCoordinator(
+        hass,
+        config_entry=entry,
+        client=XMLTVClient(
+            session=async_get_clientsession(hass),
+            url=MOCK_TV_GUIDE_URL,
+        ),
+        update_interval=1,
+        lookahead=15,
+        enable_current_sensor=True,
+        enable_upcoming_sensor=True,
+        enable_primetime_sensor=True,
+        enable_channel_icon=True,
+        enable_program_image=True,
+        primetime_time="20:00:00",
+        priority_window_parse=True,
+    )
+
+    # window covers the current programs and lasts until the end of the day
+    window_start, window_end = coordinator._get_priority_window()
+    assert window_start < MOCK_NOW
+    assert window_end == datetime.combine(MOCK_NOW.date() + timedelta(days=1), time.min)
+
+    # publish the priority guide, then block parsing the full guide until released
+    release = asyncio.Event()
+    priority_guide = TVGuide()
+
+    async def prioritized_get_data(
+        on_channels=None, priority_window=None, on_priority_guide=None
+    ):
+        assert priority_window == (window_start, window_end)
+        assert on_priority_guide is not None
+        on_priority_guide(priority_guide)
+        await release.wait()
+        return MOCK_TV_GUIDE
+
+    mock_xmltv_client_get_data.side_effect = prioritized_get_data
+
+    refetch = hass.async_create_task(coordinator._refetch_tv_guide())
+    await asyncio.sleep(0)
+    assert coordinator.guide_partial
+    assert coordinator.data is priority_guide
+
+    # once the full guide is parsed, it replaces the priority guide
+    release.set()
+    await refetch
+    assert not coordinator.guide_partial
+    assert await coordinator._async_update_data() == MOCK_TV_GUIDE
+
+    # if parsing the full guide fails, the previous guide is restored
+    async def failing_get_data(
+        on_channels=None, priority_window=None, on_priority_guide=None
+    ):
+        on_priority_guide(priority_guide)
+        raise XMLTVClientError("parse failed")
+
+    mock_xmltv_client_get_data.side_effect = failing_get_data
+    with pytest.raises(UpdateFailed):
+        await coordinator._refetch_tv_guide()
+    assert not coordinator.guide_partial
+    assert await coordinator._async_update_data() == MOCK_TV_GUIDE
+
+    await coordinator.async_shutdown()
+
+
+async def test_coordinator_priority_window_parse_failure(
+    hass,
+    bypass_integration_setup,
+    mock_xmltv_client_get_data,
+    mock_actual_now,
+):
+    """Test listeners are notified with the previous guide, if parsing the full guide fails after the priority guide was published."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        entry_id="test",
+        data={},
+    )
+
+    coordinator = XMLTVDataUpdateCoordinator(
+        hass,
+        config_entry=entry,
+        client=XMLTVClient(
+            session=async_get_clientsession(hass),
+            url=MOCK_TV_GUIDE_URL,
+        ),
+        update_interval=1,
+        lookahead=15,
+        enable_current_sensor=True,
+        enable_upcoming_sensor=True,
+        enable_primetime_sensor=True,
+        enable_channel_icon=True,
+        enable_program_image=True,
+        primetime_time="20:00:00",
+        priority_window_parse=True,
+    )
+    await coordinator._async_setup()
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert coordinator.data is MOCK_TV_GUIDE
+
+    published = []
+    unsub = coordinator.async_add_listener(lambda: published.append(coordinator.data))
+
+    priority_guide = TVGuide()
+
+    async def failing_get_data(
+        on_channels=None, priority_window=None, on_priority_guide=None
+    ):
+        on_priority_guide(priority_guide)
+        raise XMLTVClientError("parse failed")
+
+    mock_xmltv_client_get_data.side_effect = failing_get_data
+    await coordinator._async_background_refetch()
+
+    # the priority guide was published, then replaced by the previous guide again
+    assert published == [priority_guide, MOCK_TV_GUIDE]
+    assert coordinator.data is MOCK_TV_GUIDE
+    assert not coordinator.guide_partial
+
+    unsub()
+    await coordinator.async_shutdown()
+
+
+async def test_coordinator_watch_source_file(
+    hass,
+    bypass_integration_setup,
+    mock_xmltv_client_get_data,
+    mock_actual_now,
+    tmp_path,
+):
+    """Test a changed local guide file is re-fetched right away, instead of waiting for the refetch interval."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        entry_id="test",
+        data={},
+    )
+
+    coordinator = XMLTVDataUpdateCoordinator(
+        hass,
+        config_entry=entry,
+        client=XMLTVClient(
+            session=async_get_clientsession(hass),
+            url=(tmp_path / "guide.xml").as_uri(),
+        ),
+        update_interval=12,
+        lookahead=15,
+        enable_current_sensor=True,
+        enable_upcoming_sensor=True,
+        enable_primetime_sensor=True,
+        enable_channel_icon=True,
+        enable_program_image=True,
+        primetime_time="20:00:00",
+        watch_source_file=True,
+    )
+
+    await coordinator._async_setup()
+    assert mock_xmltv_client_get_data.call_count == 1
+
+    with patch.object(
+        XMLTVClient, "async_check_source_changed", return_value=False
+    ) as mock_check:
+        # unchanged file is not re-fetched
+        await coordinator._async_on_source_file_watch(MOCK_NOW)
+        await hass.async_block_till_done(wait_background_tasks=True)
+        assert mock_check.call_count == 1
+        assert mock_xmltv_client_get_data.call_count == 1
+
+        # changed file is re-fetched, although the refetch interval did not pass
+        mock_check.return_value = True
+        await coordinator._async_on_source_file_watch(MOCK_NOW)
+        await hass.async_block_till_done(wait_background_tasks=True)
+        assert mock_xmltv_client_get_data.call_count == 2
+
+    await coordinator.async_shutdown()
+
 
 async def test_coordinator_primetime_parsing(
     hass,
@@ -1,6 +1,13 @@
 """Test cases for the helper module."""
 
-from custom_components.xmltv_epg.helper import normalize_for_entity_id
+import json
+from datetime import datetime, timedelta
+
+from custom_components.xmltv_epg.helper import (
+    normalize_for_entity_id,
+    program_list_to_attribute,
+)
+from custom_components.xmltv_epg.model import TVProgram
 
 
 def test_normalize_for_entity_id():
@@ -27,3 +34,36 @@ def test_normalize_for_entity_id():
     # test special replacement rules
     # required because both "Sport1" and "Sport1+" are channels that exists in the wild...
     assert normalize_for_entity_id("A+B-C") == "a_plus_b_c"
+
+
+def test_program_list_to_attribute():
+    """Test the program_list_to_attribute function."""
+    start = datetime(2020, 1, 1, 0, 0)
+    programs = [
+        TVProgram(
+            channel_id="CH1",
+            start=start + timedelta(hours=i),
+            end=start + timedelta(hours=i + 1),
+            title=f"Program {i}" if i != 1 else "A very long title " * 10,
+        )
+        for i in range(10)
+    ]
+
+    # all programs fit
+    items = program_list_to_attribute(programs, 16 * 1024, 100)
+    assert len(items) == 10
+    assert items[0] == {
+        "start": programs[0].start.isoformat(),
+        "end": programs[0].end.isoformat(),
+        "title": "Program 0",
+    }
+
+    # long titles are truncated
+    assert len(items[1]["title"]) == 100
+    assert items[1]["title"].endswith("…")
+
+    # payload size is limited, trailing programs are dropped
+    items = program_list_to_attribute(programs, 512, 100)
+    assert 0 < len(items) < 10
+    assert len(json.dumps(items, ensure_ascii=False).encode()) <= 512
+    assert items[0]["title"] == "Program 0"
@@ -0,0 +1,44 @@
+"""Test xmltv_epg http session."""
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+
+from custom_components.xmltv_epg.http_client import (
+    CONNECT_TIMEOUT,
+    DNS_CACHE_TTL,
+    LIMIT_PER_HOST,
+    async_get_limiter,
+    async_get_session,
+    get_timeout,
+)
+
+
+async def test_get_session(hass):
+    """Test the session is shared, tuned for repeated requests, and closed when Home Assistant stops."""
+    session = async_get_session(hass)
+    assert async_get_session(hass) is session
+
+    assert "gzip" in session.headers["Accept-Encoding"]
+    assert session.connector is not None
+    assert session.connector.limit_per_host == LIMIT_PER_HOST
+    assert session.connector._ttl_dns_cache == DNS_CACHE_TTL  # type: ignore[attr-defined]
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_CLOSE)
+    await hass.async_block_till_done()
+    assert session.closed
+
+
+def test_get_timeout():
+    """Test 0 disables a timeout."""
+    timeout = get_timeout(total=300, read=60)
+    assert timeout.total == 300
+    assert timeout.sock_read == 60
+    assert timeout.sock_connect == CONNECT_TIMEOUT
+
+    timeout = get_timeout(total=0, read=0)
+    assert timeout.total is None
+    assert timeout.sock_read is None
+
+
+async def test_get_limiter(hass):
+    """Test the limiter is shared by all users of the integration."""
+    assert async_get_limiter(hass) is async_get_limiter(hass)
@@ -1,10 +1,10 @@
 """Test xmltv_epg setup process."""
 
 from http import HTTPStatus
-from unittest.mock import PropertyMock, patch
+from unittest.mock import AsyncMock, MagicMock, PropertyMock, patch
 
+import aiohttp
 import pytest
-import respx
 from homeassistant.const import CONF_HOST
 from homeassistant.helpers import device_registry, entity_registry
 from pytest_homeassistant_custom_component.common import MockConfigEntry
@@ -20,6 +20,7 @@ from custom_components.xmltv_epg.const import (
     ChannelSensorMode,
 )
 from custom_components.xmltv_epg.helper import program_get_normalized_identification
+from custom_components.xmltv_epg.image import XMLTVImageEntity
 from custom_components.xmltv_epg.model import TVChannel
 
 from .const import MOCK_NOW, MOCK_TV_GUIDE_URL
@@ -47,7 +48,9 @@ def mock_coordinator_last_update_time():
         yield mock
 
 
-async def assert_has_image_entity_with_url(hass, client, entity_id: str, url: str):
+async def assert_has_image_entity_with_url(
+    hass, client, aioclient_mock, entity_id: str, url: str
+):
     """Test if the hass instance contains a image entity with the given url."""
     state = hass.states.get(entity_id)
     assert state
@@ -56,8 +59,11 @@ async def assert_has_image_entity_with_url(hass, client, entity_id: str, url: st
     assert picture_url.startswith(f"/api/image_proxy/{entity_id}")
 
     mock_content = str.encode(url)
-    respx.get(url).respond(
-        status_code=HTTPStatus.OK, content_type="image/jpg", content=mock_content
+    aioclient_mock.get(
+        url,
+        status=HTTPStatus.OK,
+        content=mock_content,
+        headers={"Content-Type": "image/jpg"},
     )
 
     resp = await client.get(picture_url)
@@ -67,10 +73,10 @@ async def assert_has_image_entity_with_url(hass, client, entity_id: str, url: st
     assert body == mock_content
 
 
-@respx.mock
 async def test_images_basic(
     hass,
     hass_client,
+    mock_http_session,
     mock_xmltv_client_get_data,
     mock_coordinator_actual_now,
     mock_coordinator_last_update_time,
@@ -116,54 +122,63 @@ async def test_images_basic(
     await assert_has_image_entity_with_url(
         hass,
         client,
+        mock_http_session,
         "image.mock_1_program_image_current",
         "http://example.com/pr/ch1_cur.jpg",
     )
     await assert_has_image_entity_with_url(
         hass,
         client,
+        mock_http_session,
         "image.mock_1_program_image_upcoming",
         "http://example.com/pr/ch1_upc.jpg",
     )
     await assert_has_image_entity_with_url(
         hass,
         client,
+        mock_http_session,
         "image.mock_1_program_image_primetime",
         "http://example.com/pr/ch1_prime.jpg",
     )
     await assert_has_image_entity_with_url(
         hass,
         client,
+        mock_http_session,
         "image.mock_2_program_image_current",
         "http://example.com/pr/ch2_cur.jpg",
     )
     await assert_has_image_entity_with_url(
         hass,
         client,
+        mock_http_session,
         "image.mock_2_program_image_upcoming",
         "http://example.com/pr/ch2_upc.jpg",
     )
     await assert_has_image_entity_with_url(
         hass,
         client,
+        mock_http_session,
         "image.mock_2_program_image_primetime",
         "http://example.com/pr/ch2_prime.jpg",
     )
     await assert_has_image_entity_with_url(
         hass,
         client,
+        mock_http_session,
         "image.mock_3_program_image_current",
         "http://example.com/pr/ch3_cur.jpg",
     )
     await assert_has_image_entity_with_url(
         hass,
         client,
+        mock_http_session,
         "image.mock_3_program_image_upcoming",
         "http://example.com/pr/ch3_upc.jpg",
     )
     await assert_has_image_entity_with_url(
         hass,
         client,
+        mock_http_session,
         "image.mock_3_program_image_primetime",
         "http://example.com/pr/ch3_prime.jpg",
     )
@@ -174,13 +189,25 @@ async def test_images_basic(
     # - image.mock_2_icon : "http://example.com/ch/mock2.jpg"
     # - image.mock_3_icon : "http://example.com/ch/mock3.jpg"
     await assert_has_image_entity_with_url(
-        hass, client, "image.mock_1_icon", "http://example.com/ch/mock1.jpg"
+        hass,
+        client,
+        mock_http_session,
+        "image.mock_1_icon",
+        "http://example.com/ch/mock1.jpg",
     )
     await assert_has_image_entity_with_url(
-        hass, client, "image.mock_2_icon", "http://example.com/ch/mock2.jpg"
+        hass,
+        client,
+        mock_http_session,
+        "image.mock_2_icon",
+        "http://example.com/ch/mock2.jpg",
     )
     await assert_has_image_entity_with_url(
-        hass, client, "image.mock_3_icon", "http://example.com/ch/mock3.jpg"
+        hass,
+        client,
+        mock_http_session,
+        "image.mock_3_icon",
+        "http://example.com/ch/mock3.jpg",
     )
 
 
@@ -267,3 +294,28 @@ def test_sensor_entity_ids():
 
     assert translation_key == "channel_icon"
     assert entity_id == "image.ch_1_icon"
+
+
+async def test_image_error_response_released(hass):
+    """Test the response of a failed image fetch is released, returning its connection to the pool."""
+    response = MagicMock()
+    response.raise_for_status.side_effect = aiohttp.ClientResponseError(
+        MagicMock(), (), status=HTTPStatus.NOT_FOUND
+    )
+    request = MagicMock()
+    request.__aenter__ = AsyncMock(return_value=response)
+    request.__aexit__ = AsyncMock(return_value=False)
+    session = MagicMock()
+    session.get.return_value = request
+
+    entity = XMLTVImageEntity(hass)
+    with patch(
+        "custom_components.xmltv_epg.image.async_get_session", return_value=session
+    ):
+        image = await entity._async_load_image_from_url(
+            "http://example.com/ch/mock1.jpg"
+        )
+
+    assert image is None
+    request.__aexit__.assert_awaited_once()
+    response.read.assert_not_called()
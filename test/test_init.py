@@ -1,5 +1,6 @@
 """Test xmltv_epg setup process."""
 
+from homeassistant.config_entries import ConfigEntryState
 from homeassistant.const import CONF_HOST
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
@@ -53,3 +54,35 @@ async def test_setup_unload_and_reload_entry(hass, mock_xmltv_client_get_data):
 
     # coordinator was NOT updated again, re-fetch count did not change
     assert mock_xmltv_client_get_data.call_count == 2
+
+
+async def test_setup_entry_command_not_allowed(hass, mock_xmltv_client_get_data):
+    """Test entries running commands that are not listed in configuration.yaml are not set up."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_HOST: "exec:tv_grab_fi --days 3"},
+        entry_id="MOCK",
+    )
+    config_entry.add_to_hass(hass)
+
+    await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert config_entry.state is ConfigEntryState.SETUP_ERROR
+    mock_xmltv_client_get_data.assert_not_called()
+
+
+async def test_setup_entry_file_not_allowed(hass, tmp_path, mock_xmltv_client_get_data):
+    """Test entries reading files outside of allowlist_external_dirs are not set up."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_HOST: (tmp_path / "guide.xml").as_uri()},
+        entry_id="MOCK",
+    )
+    config_entry.add_to_hass(hass)
+
+    await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert config_entry.state is ConfigEntryState.SETUP_ERROR
+    mock_xmltv_client_get_data.assert_not_called()
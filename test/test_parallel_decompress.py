@@ -0,0 +1,151 @@
+"""Test cases for the parallel decompressor."""
+
+import gzip
+import lzma
+import shutil
+import subprocess
+
+import pytest
+
+from custom_components.xmltv_epg.parallel_decompress import (
+    decompress_parallel,
+    split_gzip_members,
+    split_xz_blocks,
+)
+from test.benchmark.generator import GuideProfile, generate_guide_xml
+
+XML = generate_guide_xml(GuideProfile(channels=4, days=1, programs_per_day=24))
+
+XZ = shutil.which("xz")
+
+
+def split_parts(data: bytes, count: int) -> list[bytes]:
+    """Split data into count parts of similar size."""
+    size = -(-len(data) // count)
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+def compress_xz_multi_block(data: bytes, block_size: int) -> bytes:
+    """Compress data into a single xz stream with multiple blocks, like `xz -T` does."""
+    return subprocess.run(  # noqa: S603 - fixed arguments
+        [str(XZ), "--stdout", "--threads=2", f"--block-size={block_size}"],
+        input=data,
+        capture_output=True,
+        check=True,
+    ).stdout
+
+
+def test_split_gzip_members():
+    """Test splitting gzip content at member boundaries."""
+    members = [gzip.compress(part) for part in split_parts(XML, 4)]
+    data = b"".join(members)
+
+    segments = split_gzip_members(data, 4)
+    assert segments == members
+
+    # segments consist of whole members
+    segments = split_gzip_members(data, 2)
+    assert segments is not None
+    assert b"".join(segments) == data
+    assert [gzip.decompress(s) for s in segments] == [
+        b"".join(split_parts(XML, 4)[:2]),
+        b"".join(split_parts(XML, 4)[2:]),
+    ]
+
+    # a single member is never split at a member boundary
+    assert split_gzip_members(lzma.compress(XML), 4) is None
+
+
+def test_split_xz_blocks():
+    """Test splitting concatenated xz streams into segments of whole blocks."""
+    parts = split_parts(XML, 4)
+    data = b"".join(lzma.compress(part) for part in parts) + b"\x00" * 8
+
+    segments = split_xz_blocks(data, 4)
+    assert segments is not None
+    assert len(segments) == 4
+    assert [lzma.decompress(s) for s in segments] == parts
+
+    segments = split_xz_blocks(data, 2)
+    assert segments is not None
+    assert len(segments) == 2
+    assert b"".join(lzma.decompress(s) for s in segments) == XML
+
+    # a single block cannot be split
+    assert split_xz_blocks(lzma.compress(XML), 4) is None
+    assert split_xz_blocks(gzip.compress(XML), 4) is None
+
+    # corrupt content cannot be split
+    assert split_xz_blocks(data[:-20], 4) is None
+
+
+@pytest.mark.skipif(XZ is None, reason="xz is not installed")
+def test_split_xz_blocks_multi_block():
+    """Test splitting a single xz stream with multiple blocks, as written by multi-threaded compressors."""
+    data = compress_xz_multi_block(XML, len(XML) // 3 + 1)
+
+    segments = split_xz_blocks(data, 3)
+    assert segments is not None
+    assert len(segments) == 3
+    assert b"".join(lzma.decompress(s) for s in segments) == XML
+
+
+@pytest.mark.parametrize("content_format", ["gzip", "xz"])
+def test_decompress_parallel(content_format: str):
+    """Test parallel decompression produces the same output as serial decompression."""
+    compress = gzip.compress if content_format == "gzip" else lzma.compress
+    data = b"".join(compress(part) for part in split_parts(XML, 3))
+
+    parts = decompress_parallel(data, content_format, workers=3, min_size=0)
+    assert len(parts) == 3
+    assert b"".join(parts) == XML
+
+
+@pytest.mark.parametrize("content_format", ["gzip", "xz"])
+def test_decompress_parallel_serial_fallback(content_format: str):
+    """Test content that cannot be split is decompressed serially."""
+    compress = gzip.compress if content_format == "gzip" else lzma.compress
+
+    # single member or block
+    assert decompress_parallel(
+        compress(XML), content_format, workers=3, min_size=0
+    ) == [XML]
+
+    # too small
+    data = b"".join(compress(part) for part in split_parts(XML, 3))
+    assert decompress_parallel(data, content_format, workers=3) == [XML]
+
+
+def test_decompress_parallel_false_member_header():
+    """Test gzip member headers found inside compressed data are not split at."""
+    # stored (uncompressed) deflate blocks contain the data as is, including a fake member header
+    fake = XML + b"\x1f\x8b\x08\x00" + XML
+    members = [gzip.compress(fake, compresslevel=0), gzip.compress(XML)]
+    data = b"".join(members)
+
+    assert split_gzip_members(data, 4) == members
+    assert decompress_parallel(data, "gzip", workers=4, min_size=0) == [fake, XML]
+
+
+def test_decompress_parallel_false_member_header_passing_check():
+    """Test gzip member headers passing the check by chance fall back to serial decompression."""
+    # fake member headers followed by the header of the next stored block inflate without errors
+    fake = b"\x1f\x8b\x08\x00" * len(XML)
+    members = [gzip.compress(fake + XML, compresslevel=0), gzip.compress(XML)]
+    data = b"".join(members)
+
+    segments = split_gzip_members(data, 4)
+    assert segments is not None
+    assert segments != members
+    assert decompress_parallel(data, "gzip", workers=4, min_size=0) == [
+        fake + XML + XML
+    ]
+
+
+def test_decompress_parallel_corrupt():
+    """Test errors in corrupt content are reported like serial decompression does."""
+    members = [gzip.compress(part) for part in split_parts(XML, 2)]
+    data = members[0] + members[1][:-8] + b"\x00" * 8
+
+    with pytest.raises(gzip.BadGzipFile):
+        decompress_parallel(data, "gzip", workers=2, min_size=0)
@@ -0,0 +1,49 @@
+"""Test xmltv_epg profiling instrumentation."""
+
+import logging
+import pstats
+
+from custom_components.xmltv_epg.profiling import XMLTVProfiler
+
+
+def test_profiler_span(caplog):
+    """Test spans are only logged when the profiler is enabled."""
+    logger = logging.getLogger("test_profiler")
+
+    with caplog.at_level(logging.DEBUG, logger="test_profiler"):
+        profiler = XMLTVProfiler(logger)
+        with profiler.span("disabled span"):
+            pass
+
+        profiler.enabled = True
+        with profiler.span("enabled span"):
+            pass
+
+    assert "disabled span" not in caplog.text
+    assert "enabled span" in caplog.text
+
+
+async def test_profiler_session_dump(tmp_path):
+    """Test profiling sessions write cProfile statistics when dumping is enabled."""
+    profiler = XMLTVProfiler(
+        logging.getLogger("test_profiler"),
+        enabled=True,
+        dump_stats=True,
+        dump_dir=str(tmp_path / "profiles"),
+    )
+
+    async with profiler.session("refetch"):
+        sum(range(1000))
+
+    files = list((tmp_path / "profiles").glob("refetch_*.pstats"))
+    assert len(files) == 1
+
+    # dump is a valid pstats file
+    assert pstats.Stats(str(files[0])).total_calls > 0
+
+    # no dump when dumping is disabled
+    profiler.dump_stats = False
+    async with profiler.session("other"):
+        pass
+
+    assert not list((tmp_path / "profiles").glob("other_*.pstats"))
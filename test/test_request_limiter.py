@@ -0,0 +1,140 @@
+"""Test cases for the request limiter."""
+
+import asyncio
+
+import pytest
+
+from custom_components.xmltv_epg.request_limiter import RequestLimiter, TokenBucket
+
+
+class FakeClock:
+    """Clock advanced manually."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Get the current time."""
+        return self.now
+
+
+def test_token_bucket():
+    """Test a burst is allowed, followed by the sustained rate."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=3, clock=clock)
+
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+
+    # reservations are served in order
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+
+    # refilled, but not beyond the capacity
+    clock.now = 100
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+    assert bucket.reserve() == pytest.approx(0.5)
+
+
+async def test_request_limiter_rate():
+    """Test requests to a host beyond the burst are delayed."""
+    limiter = RequestLimiter(rate=20, burst=2, concurrency=10)
+    loop = asyncio.get_running_loop()
+
+    async def request() -> float:
+        async with limiter.async_slot("http://example.com/guide.xml"):
+            return loop.time()
+
+    start = loop.time()
+    times = await asyncio.gather(*(request() for _ in range(4)))
+    assert times[1] - start < 0.04
+    assert times[3] - start >= 0.09
+
+
+async def test_request_limiter_concurrency():
+    """Test the number of requests in progress is limited per host, independently of other hosts."""
+    limiter = RequestLimiter(rate=1000, burst=100, concurrency=2)
+    active: dict[str, int] = {}
+    peak: dict[str, int] = {}
+
+    async def request(host: str) -> None:
+        async with limiter.async_slot(f"http://{host}/image.png"):
+            active[host] = active.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), active[host])
+            await asyncio.sleep(0.01)
+            active[host] -= 1
+
+    await asyncio.gather(
+        *(
+            request(host)
+            for host in ("a.example.com", "B.example.com")
+            for _ in range(5)
+        )
+    )
+    assert peak == {"a.example.com": 2, "B.example.com": 2}
+
+    # host names are case insensitive
+    async with limiter.async_slot("http://A.EXAMPLE.COM/image.png"):
+        async with limiter.async_slot("http://a.example.com/image.png"):
+            with pytest.raises(TimeoutError):
+                async with asyncio.timeout(0.05):
+                    async with limiter.async_slot("http://a.example.com/other.png"):
+                        pass
+
+
+async def test_request_limiter_coalesce():
+    """Test fetches of the same url queued or in progress share a single request."""
+    limiter = RequestLimiter(rate=1000, burst=100, concurrency=1)
+    calls: list[str] = []
+    release = asyncio.Event()
+
+    def create_fetch(url: str):
+        async def fetch() -> bytes:
+            calls.append(url)
+            await release.wait()
+            return url.encode()
+
+        return fetch
+
+    url = "http://example.com/a.png"
+    other_url = "http://example.com/b.png"
+    tasks = [
+        asyncio.create_task(limiter.async_fetch(u, create_fetch(u)))
+        for u in (url, url, other_url, url)
+    ]
+    await asyncio.sleep(0)
+
+    # a cancelled caller does not cancel the fetch for the others
+    tasks[0].cancel()
+    release.set()
+
+    results = await asyncio.gather(*tasks[1:])
+    assert results == [url.encode(), other_url.encode(), url.encode()]
+    assert calls == [url, other_url]
+    with pytest.raises(asyncio.CancelledError):
+        await tasks[0]
+
+    # completed fetches are not cached
+    assert await limiter.async_fetch(url, create_fetch(url)) == url.encode()
+    assert calls == [url, other_url, url]
+
+
+async def test_request_limiter_coalesce_error():
+    """Test errors of a coalesced fetch are raised to all callers."""
+    limiter = RequestLimiter(rate=1000, burst=100, concurrency=1)
+    calls = 0
+
+    async def fetch() -> bytes:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        raise ConnectionError
+
+    url = "http://example.com/a.png"
+    results = await asyncio.gather(
+        limiter.async_fetch(url, fetch),
+        limiter.async_fetch(url, fetch),
+        return_exceptions=True,
+    )
+    assert [type(r) for r in results] == [ConnectionError, ConnectionError]
+    assert calls == 1
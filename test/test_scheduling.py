@@ -0,0 +1,109 @@
+"""Test xmltv_epg scheduling helpers."""
+
+import random
+from datetime import datetime, time, timedelta
+
+import pytest
+
+from custom_components.xmltv_epg.scheduling import (
+    ExponentialBackoff,
+    PublishTimeEstimator,
+    get_next_publish_time,
+    parse_time_of_day,
+)
+
+
+def test_backoff_doubles_up_to_max_delay():
+    """Test the delay doubles with every failure, up to the maximum delay."""
+    backoff = ExponentialBackoff(
+        initial_delay=timedelta(minutes=5),
+        max_delay=timedelta(minutes=30),
+        jitter=0,
+    )
+
+    assert backoff.failures == 0
+    assert backoff.next_delay() == timedelta(minutes=5)
+    assert backoff.next_delay() == timedelta(minutes=10)
+    assert backoff.next_delay() == timedelta(minutes=20)
+    assert backoff.next_delay() == timedelta(minutes=30)
+    assert backoff.next_delay() == timedelta(minutes=30)
+    assert backoff.failures == 5
+
+    # many consecutive failures do not overflow
+    for _ in range(100):
+        assert backoff.next_delay() == timedelta(minutes=30)
+
+    # a success resets the delay
+    backoff.reset()
+    assert backoff.failures == 0
+    assert backoff.next_delay() == timedelta(minutes=5)
+
+
+def test_backoff_jitter():
+    """Test the jitter reduces the delay by up to the jitter fraction."""
+    backoff = ExponentialBackoff(
+        initial_delay=timedelta(minutes=10),
+        max_delay=timedelta(minutes=10),
+        jitter=0.5,
+        rng=random.Random(42),  # noqa: S311
+    )
+
+    delays = [backoff.next_delay() for _ in range(50)]
+    assert all(timedelta(minutes=5) <= d <= timedelta(minutes=10) for d in delays)
+    assert len(set(delays)) > 1
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("06:30:15", time(6, 30, 15)),
+        ("06:30", time(6, 30)),
+        ("6:30", time(6, 30)),
+        ("OUTATIME", None),
+        ("25:00", None),
+    ],
+)
+def test_parse_time_of_day(value: str, expected: time | None):
+    """Test parsing times of day."""
+    assert parse_time_of_day(value) == expected
+
+
+def test_publish_time_estimator():
+    """Test the publish time is estimated from the Last-Modified history."""
+    estimator = PublishTimeEstimator(history_size=3)
+    assert estimator.publish_time is None
+
+    estimator.record(datetime(2024, 5, 1, 6, 0))
+    assert estimator.publish_time == time(6, 0)
+
+    # the same publication is only recorded once
+    estimator.record(datetime(2024, 5, 1, 6, 0))
+    estimator.record(datetime(2024, 5, 2, 6, 20))
+    assert estimator.publish_time == time(6, 10)
+
+    # only the most recent publications are considered
+    estimator.record(datetime(2024, 5, 3, 7, 0))
+    estimator.record(datetime(2024, 5, 4, 7, 0))
+    estimator.record(datetime(2024, 5, 5, 7, 0))
+    assert estimator.publish_time == time(7, 0)
+
+
+def test_publish_time_estimator_around_midnight():
+    """Test publications around midnight average to midnight, not noon."""
+    estimator = PublishTimeEstimator()
+    estimator.record(datetime(2024, 5, 1, 23, 50))
+    estimator.record(datetime(2024, 5, 3, 0, 10))
+    assert estimator.publish_time == time(0, 0)
+
+
+def test_get_next_publish_time():
+    """Test the next publication is the next occurrence of the publish time."""
+    assert get_next_publish_time(datetime(2024, 5, 1, 5, 0), time(6, 0)) == datetime(
+        2024, 5, 1, 6, 0
+    )
+    assert get_next_publish_time(datetime(2024, 5, 1, 6, 0), time(6, 0)) == datetime(
+        2024, 5, 2, 6, 0
+    )
+    assert get_next_publish_time(datetime(2024, 5, 1, 7, 0), time(6, 0)) == datetime(
+        2024, 5, 2, 6, 0
+    )
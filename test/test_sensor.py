@@ -4,7 +4,7 @@ from datetime import date, timedelta
 from unittest.mock import PropertyMock, patch
 
 import pytest
-from homeassistant.const import CONF_HOST
+from homeassistant.const import CONF_HOST, EntityCategory
 from homeassistant.helpers import device_registry, entity_registry
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
@@ -12,13 +12,21 @@ from custom_components.xmltv_epg.const import (
     DOMAIN,
     OPT_ENABLE_CURRENT_SENSOR,
     OPT_ENABLE_PRIMETIME_SENSOR,
+    OPT_ENABLE_PROGRAM_LIST_SENSOR,
     OPT_ENABLE_UPCOMING_SENSOR,
+    OPT_PROGRAM_LIST_SIZE,
     OPT_PROGRAM_LOOKAHEAD,
+    PROGRAM_SENSOR_UNRECORDED_ATTRIBUTES,
     ChannelSensorMode,
 )
 from custom_components.xmltv_epg.helper import program_get_normalized_identification
 from custom_components.xmltv_epg.model import TVChannel, TVGuide
-from custom_components.xmltv_epg.sensor import XMLTVStatusSensor
+from custom_components.xmltv_epg.sensor import (
+    XMLTVChannelProgramListSensor,
+    XMLTVChannelRecordedSensor,
+    XMLTVChannelSensor,
+    XMLTVStatusSensor,
+)
 
 from .const import MOCK_NOW, MOCK_TV_GUIDE_NAME, MOCK_TV_GUIDE_URL
 
@@ -160,6 +168,40 @@ async def test_program_sensor_attributes(
     assert state.attributes["language"] == "English"
 
 
+async def test_program_list_sensor(
+    hass,
+    mock_xmltv_client_get_data,
+    mock_coordinator_actual_now,
+    mock_coordinator_last_update_time,
+):
+    """Test program list sensor state and attributes."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_HOST: MOCK_TV_GUIDE_URL},
+        options={
+            OPT_PROGRAM_LOOKAHEAD: 0,  # 0 Minutes lookahead
+            OPT_ENABLE_PROGRAM_LIST_SENSOR: True,  # Enable program list sensor
+            OPT_PROGRAM_LIST_SIZE: 5,
+        },
+        entry_id="MOCK",
+    )
+    config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    # program list starts with the upcoming program
+    state = hass.states.get("sensor.mock_3_program_list")
+    assert state
+    assert state.state == "CH 3 Upcoming - Subtitle (S1E2)"
+
+    programs = state.attributes["programs"]
+    assert [p["title"] for p in programs] == [
+        "CH 3 Upcoming - Subtitle (S1E2)",
+        "CH 3 Primetime - Subtitle (S1E3)",
+    ]
+    assert programs[0]["start"] == (MOCK_NOW + timedelta(minutes=15)).isoformat()
+
+
 async def test_program_sensor_device(
     hass,
     mock_xmltv_client_get_data,
@@ -277,3 +319,51 @@ def test_sensor_entity_ids():
 
     assert translation_key == "program_current"
     assert entity_id == "sensor.de_wdr_muenster_program_current"
+
+
+def test_channel_sensor_unrecorded_attributes():
+    """Test bulky program sensor attributes are excluded from the recorder."""
+    # by default, all bulky attributes are unrecorded
+    assert (
+        XMLTVChannelSensor._unrecorded_attributes
+        == PROGRAM_SENSOR_UNRECORDED_ATTRIBUTES
+    )
+    assert "description" in XMLTVChannelSensor._unrecorded_attributes
+    assert "title" not in XMLTVChannelSensor._unrecorded_attributes
+
+    # unless enabled to record them anyway
+    assert issubclass(XMLTVChannelRecordedSensor, XMLTVChannelSensor)
+    assert not XMLTVChannelRecordedSensor._unrecorded_attributes
+
+
+def test_program_list_sensor_unrecorded_attributes():
+    """Test the program list is excluded from the recorder."""
+    assert "programs" in XMLTVChannelProgramListSensor._unrecorded_attributes
+
+
+async def test_fetch_stat_sensors(
+    hass,
+    mock_xmltv_client_get_data,
+    mock_coordinator_actual_now,
+    mock_coordinator_last_update_time,
+):
+    """Test fetch diagnostics sensors are created."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_HOST: MOCK_TV_GUIDE_URL},
+        entry_id="MOCK",
+    )
+    config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    er = entity_registry.async_get(hass)
+    for key in ("download_time", "parse_time", "program_count"):
+        entity = er.async_get(f"sensor.mock_xmltv_{key}")
+        assert entity is not None
+        assert entity.entity_category == EntityCategory.DIAGNOSTIC
+
+    # client is mocked, so there are no fetch statistics
+    state = hass.states.get("sensor.mock_xmltv_program_count")
+    assert state
+    assert state.state == "unavailable"
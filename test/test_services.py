@@ -0,0 +1,62 @@
+"""Test xmltv_epg services."""
+
+from datetime import timedelta
+
+import pytest
+from homeassistant.const import CONF_HOST
+from homeassistant.exceptions import ServiceValidationError
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.xmltv_epg.const import DOMAIN
+from custom_components.xmltv_epg.services import SERVICE_GET_PROGRAMS
+
+from .const import MOCK_NOW, MOCK_TV_GUIDE_URL
+
+
+async def test_get_programs(hass, mock_xmltv_client_get_data):
+    """Test the get_programs service."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_HOST: MOCK_TV_GUIDE_URL},
+        entry_id="MOCK",
+    )
+    config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    # window covering current and upcoming programs of channels 1 and 3
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_GET_PROGRAMS,
+        {
+            "config_entry_id": "MOCK",
+            "channels": ["mock 1", "mock 3"],
+            "start": MOCK_NOW.astimezone(),
+            "end": (MOCK_NOW + timedelta(minutes=30)).astimezone(),
+        },
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response is not None
+    channels = response["channels"]
+    assert list(channels.keys()) == ["mock 1", "mock 3"]
+    assert [p["title"] for p in channels["mock 1"]] == [
+        "CH 1 Current",
+        "CH 1 Upcoming",
+    ]
+    assert channels["mock 3"][0]["episode"] == "S1E1"
+    assert channels["mock 3"][0]["category"] == ["Drama", "Action"]
+
+    # start must be before end
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_GET_PROGRAMS,
+            {
+                "start": MOCK_NOW.astimezone(),
+                "end": MOCK_NOW.astimezone(),
+            },
+            blocking=True,
+            return_response=True,
+        )